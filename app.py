@@ -2,14 +2,25 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from streamlit_lottie import st_lottie  # type: ignore
-import requests
-import time
-import html
+from functools import partial
 import json
+import os
+import shutil
+import tempfile
 from streamlit_mic_recorder import mic_recorder
 
-from src.analyzer import MindReader
-from src.utils import get_api_key
+from src.chatlog import analyze_chat, iter_messages
+from src.components import (
+    BRAIN_LOTTIE, accept_media, accept_text, audio_result_card, can_call_api, file_size_ok, get_result,
+    init_session, load_lottie, mark_api_call, poll_pending, release_media, run_flow, safe, show_error,
+    show_provisional, store_result,
+)
+from src.media import MediaPayload
+from src.profiling import start_rerun_profile
+from src.provisional import (
+    provisional_audio, provisional_image, provisional_suggestions, provisional_text, remember_result,
+)
+from src.video import video_supported
 
 # =========================================
 # PAGE CONFIG
@@ -21,80 +32,59 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Opt-in: MINDREADER_PROFILE=app or ?profile=1 (None and no overhead otherwise)
+_profiler = start_rerun_profile(__file__, st.query_params.get("profile") == "1")
+
 # =========================================
 # CONSTANTS
 # =========================================
-MAX_FILE_MB = 5
-API_COOLDOWN = 10  # seconds
+MAX_VIDEO_MB = 100
+VIDEO_TYPES = ["mp4", "mov", "webm", "avi", "mkv"]
+MAX_CHAT_MB = 20
 
 # =========================================
 # SESSION STATE
 # =========================================
-if "history" not in st.session_state:
-    st.session_state["history"] = []
-
-if "text_result" not in st.session_state:
-    st.session_state["text_result"] = None
-
-if "mood_result" not in st.session_state:
-    st.session_state["mood_result"] = None
-
-if "image_result" not in st.session_state:
-    st.session_state["image_result"] = None
-
-if "audio_result" not in st.session_state:
-    st.session_state["audio_result"] = None
-
-if "last_call" not in st.session_state:
-    st.session_state["last_call"] = 0
-
-if "mind_reader" not in st.session_state:
-    try:
-        api_key = get_api_key()
-        st.session_state["mind_reader"] = MindReader(api_key)
-    except Exception as e:
-        st.error(f"Failed to initialize Mind Reader: {e}")
-        st.stop()
+# Shared with pages/: one engine per process, results visible on every page
+init_session()
 
 
 # =========================================
 # HELPERS
 # =========================================
-def can_call_api():
-    return time.time() - st.session_state["last_call"] > API_COOLDOWN
-
+def text_job(mr, text):
+    return (
+        remember_result("text", text, mr.analyze_text(text)),
+        remember_result("suggestions", text, mr.get_suggestions(text)),
+    )
 
-def mark_api_call():
-    st.session_state["last_call"] = time.time()
 
+def text_estimate(text):
+    return provisional_text(text), provisional_suggestions(text)
 
-def load_lottieurl(url):
-    try:
-        r = requests.get(url, timeout=2)
-        if r.status_code != 200:
-            return None
-        return r.json()
-    except:
-        return None
 
+def is_video(uploaded_file):
+    return uploaded_file.name.rsplit(".", 1)[-1].lower() in VIDEO_TYPES
 
-def file_size_ok(uploaded_file):
-    if uploaded_file.size > MAX_FILE_MB * 1024 * 1024:
-        st.error(f"❌ File too large. Max allowed size is {MAX_FILE_MB} MB.")
-        return False
-    return True
 
-
-def safe(text):
-    return html.escape(str(text))
+def analyze_uploaded_video(mr, uploaded_file):
+    """
+    Stream the upload to a temp file (OpenCV/ffmpeg need a path) and scan it.
+    """
+    suffix = "." + uploaded_file.name.rsplit(".", 1)[-1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        uploaded_file.seek(0)
+        shutil.copyfileobj(uploaded_file, tmp, length=1024 * 1024)
+    try:
+        return mr.analyze_video(tmp.name)
+    finally:
+        os.unlink(tmp.name)
 
 
 # =========================================
 # ASSETS
 # =========================================
-lottie_brain = load_lottieurl(
-    "https://lottie.host/6a56c3b8-9366-4f48-a006-218456f338d4/S8y8l9kS4w.json"
-)
+lottie_brain = load_lottie(BRAIN_LOTTIE)
 
 # =========================================
 # CSS WITH ANIMATIONS
@@ -280,11 +270,17 @@ with c2:
         unsafe_allow_html=True,
     )
 
+# =========================================
+# PENDING RESULTS
+# =========================================
+if st.session_state["pending"]:
+    poll_pending()
+
 # =========================================
 # TABS
 # =========================================
-tab1, tab2, tab3 = st.tabs(
-    ["📝 Text Analysis", "📸 Visual Scanner", "🎙️ Voice Stress"]
+tab1, tab2, tab3, tab4 = st.tabs(
+    ["📝 Text Analysis", "📸 Visual Scanner", "🎙️ Voice Stress", "💬 Chat Logs"]
 )
 
 # =========================================
@@ -314,26 +310,21 @@ with tab1:
                 mark_api_call()
                 with st.spinner("🧠 Reading Mind & Generating Solutions..."):
                     mr = st.session_state["mind_reader"]
-                    res_text = mr.analyze_text(txt_input)
-                    res_mood = mr.get_suggestions(txt_input)
-
-                    if "error" not in res_text and "error" not in res_mood:
-                        st.session_state["text_result"] = res_text
-                        st.session_state["mood_result"] = res_mood
-
-                        # History tracking
-                        st.session_state["history"].append(
-                            {
-                                "snippet": txt_input[:50],
-                                "truth": res_text["lie_detection"][
-                                    "truthfulness_score"
-                                ],
-                                "mood": res_mood["mood_analysis"],
-                            }
-                        )
+                    res = run_flow(
+                        "text", "text_result", partial(text_job, mr, txt_input),
+                        partial(text_estimate, txt_input),
+                        arg=txt_input,
+                    )
+
+                    err_msg = accept_text(txt_input, res)
+                    res_text, res_mood = res
+                    if err_msg is None:
                         st.rerun()
+                    elif res_text.get("short_circuit") or res_mood.get("short_circuit"):
+                        st.warning(err_msg)  # rejected locally, no API call was made
+                    elif res_text.get("overloaded") or res_mood.get("overloaded"):
+                        st.warning(f"⏳ {err_msg}")  # shed by the request scheduler
                     else:
-                        err_msg = res_text.get("error") or res_mood.get("error") or "Unknown Error"
                         st.error(f"❌ Analysis Failed: {err_msg}")
                         st.error("Check your API Key in .env and internet connection.")
 
@@ -341,10 +332,23 @@ with tab1:
 
     with col_out:
         if st.session_state["text_result"]:
-            r = st.session_state["text_result"]
+            r = get_result("text_result")
+            show_provisional("text_result", r)
 
             hidden_meaning = safe(r.get("hidden_meaning", ""))
 
+            if r.get("language", "en") != "en":
+                st.caption(f"🌐 Detected language: {safe(r['language'])} — rule checks ran on the English translation")
+            if r.get("chunks"):
+                st.caption(f"📄 Long text: analyzed in {r['chunks']['scored']}/{r['chunks']['total']} parts")
+            if r.get("incremental"):
+                inc = r["incremental"]
+                st.caption(
+                    f"✏️ Edit: re-scored {inc['rescored']} of {inc['sentences']} sentences; "
+                    + ("meaning and replies re-read for the edited text" if inc.get("readings") == "fresh"
+                       else "meaning and replies are not available for this edit — run a new analysis for them")
+                )
+
             st.markdown(
                 f"""
             <div class='glass-card hidden-meaning-card' style='background:#fff3cd; border-left:5px solid #ffc107;'>
@@ -406,7 +410,7 @@ with tab1:
             st.markdown("</div>", unsafe_allow_html=True)
 
         if st.session_state["mood_result"]:
-            m = st.session_state["mood_result"]
+            m = get_result("mood_result")
 
             st.markdown("---")
             st.markdown(f"### 💊 AI Prescription (Detected: {safe(m['mood_analysis'])})")
@@ -463,10 +467,33 @@ with tab2:
     with c_img:
         st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
         uploaded_file = st.file_uploader(
-            "Upload Subject Image", type=["jpg", "jpeg", "png"]
+            "Upload Subject Image or Video",
+            type=["jpg", "jpeg", "png"] + (VIDEO_TYPES if video_supported() else []),
+            key=f"visual_upload_{st.session_state['upload_gen']}",
         )
 
-        if uploaded_file and file_size_ok(uploaded_file):
+        if uploaded_file and is_video(uploaded_file):
+            if file_size_ok(uploaded_file, MAX_VIDEO_MB):
+                st.video(uploaded_file)
+                st.write("")
+
+                if st.button("🎬 Scan Video Now", use_container_width=True):
+                    if not can_call_api():
+                        st.warning("⏳ Please wait before scanning again.")
+                    else:
+                        mark_api_call()
+                        with st.spinner("🎬 Sampling keyframes & reading expressions..."):
+                            mr = st.session_state["mind_reader"]
+                            res = analyze_uploaded_video(mr, uploaded_file)
+                            if "error" not in res:
+                                st.session_state["pending"].pop("image", None)  # a newer result for this pane
+                                store_result("image_result", "video", res)
+                                release_media()
+                                st.rerun()
+                            else:
+                                show_error(res)
+
+        elif uploaded_file and file_size_ok(uploaded_file):
             st.image(uploaded_file, use_column_width=True)
             st.write("")
 
@@ -477,18 +504,23 @@ with tab2:
                     mark_api_call()
                     with st.spinner("🧠 Analyzing facial muscles & cues..."):
                         mr = st.session_state["mind_reader"]
-                        res = mr.analyze_image(uploaded_file.getvalue())
-                        if "error" not in res:
-                            st.session_state["image_result"] = res
+                        media = MediaPayload.from_file(uploaded_file, uploaded_file.type)
+                        res = run_flow(
+                            "image", "image_result", partial(mr.analyze_image, media),
+                            partial(provisional_image, media),
+                        )
+                        if accept_media("image_result", "image", res) is None:
+                            release_media()
                             st.rerun()
                         else:
-                            st.error(res["error"])
+                            show_error(res)
 
         st.markdown("</div>", unsafe_allow_html=True)
 
     with c_res:
         if st.session_state["image_result"]:
-            ir = st.session_state["image_result"]
+            ir = get_result("image_result")
+            show_provisional("image_result", ir)
 
             status = ir["truthfulness_indicator"]["status"]
             color = "#27ae60" if "Truth" in status else "#c0392b"
@@ -514,8 +546,54 @@ with tab2:
             """,
                 unsafe_allow_html=True,
             )
+
+            if ir.get("cache", {}).get("hit"):
+                st.caption(
+                    f"⚡ Near-duplicate of a previous scan ({ir['cache']['distance']} bits apart) — "
+                    f"served from cache. Cache hit rate: {ir['cache']['hit_rate']:.0%}"
+                )
+
+            if ir.get("timeline"):
+                tl = ir["timeline"]
+                fig = go.Figure(
+                    go.Scatter(
+                        x=[f["t"] for f in tl],
+                        y=[f["score"] for f in tl],
+                        mode="lines+markers+text",
+                        text=[f["primary_emotion"] for f in tl],
+                        textposition="top center",
+                        line=dict(color="#00fff0", width=3),
+                        marker=dict(color="#bc00dd", size=10),
+                    )
+                )
+                fig.update_layout(
+                    xaxis_title="Time (s)",
+                    yaxis=dict(title="Credibility", range=[0, 105]),
+                    paper_bgcolor="rgba(0,0,0,0)",
+                    plot_bgcolor="rgba(0,0,0,0)",
+                    height=260,
+                    margin=dict(t=10, b=10),
+                )
+                st.markdown("<div class='glass-card'><h4>🎬 Expression Timeline</h4>", unsafe_allow_html=True)
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption(f"{len(tl)} keyframes selected from {ir['frames_scanned']} sampled frames")
+                st.markdown("</div>", unsafe_allow_html=True)
+
+            if ir.get("audio_result"):
+                va = ir["audio_result"]
+                st.markdown(
+                    f"""
+                <div class='glass-card'>
+                    <h4>🎙️ Voice Track</h4>
+                    <p><strong>Tone:</strong> {safe(va['emotional_tone'])} —
+                    Voice Integrity: <strong>{va['truthfulness_indicator']['score']}/100</strong></p>
+                    <p><em>"{safe(va['transcript'])}"</em></p>
+                </div>
+                """,
+                    unsafe_allow_html=True,
+                )
         else:
-            st.info("👈 Upload an image to start the visual scan.")
+            st.info("👈 Upload an image or video to start the visual scan.")
 
 # =========================================
 # TAB 3: AUDIO WITH VOICE RECORDING
@@ -549,13 +627,14 @@ with tab3:
                     stop_prompt="⏹️ Stop Recording",
                     just_once=True,
                     use_container_width=True,
-                    key="recorder"
+                    format="wav",
+                    key=f"recorder_{st.session_state['upload_gen']}"
                 )
                 
                 if audio_info:
-                    audio_bytes = audio_info['bytes']
-                else:
-                    audio_bytes = None
+                    # just_once: keep the take ourselves until it is analyzed
+                    st.session_state["recording"] = audio_info['bytes']
+                audio_bytes = st.session_state["recording"]
             except Exception as e:
                 st.error(f"Microphone Error: {e}")
                 st.warning("Ensure you have a microphone connected and allowed permission.")
@@ -574,19 +653,23 @@ with tab3:
                         mark_api_call()
                         with st.spinner("🎧 Listening to vocal patterns..."):
                             mr = st.session_state["mind_reader"]
-                            res = mr.analyze_audio(audio_bytes)
-                            if "error" not in res:
-                                st.session_state["audio_result"] = res
+                            res = run_flow(
+                                "audio", "audio_result", partial(mr.analyze_audio, audio_bytes),
+                                partial(provisional_audio, audio_bytes),
+                            )
+                            if accept_media("audio_result", "audio", res) is None:
+                                release_media()
                                 st.rerun()
                             else:
-                                st.error(res["error"])
+                                show_error(res)
         
         else:  # Upload Mode
-            audio_file = st.file_uploader("Upload Audio (MP3/WAV)", type=["mp3", "wav"])
+            audio_file = st.file_uploader(
+                "Upload Audio (MP3/WAV)", type=["mp3", "wav"], key=f"audio_upload_{st.session_state['upload_gen']}"
+            )
 
             if audio_file and file_size_ok(audio_file):
                 st.audio(audio_file)
-                audio_data = audio_file.getvalue()
 
                 if st.button("🎙️ Analyze Uploaded Audio", use_container_width=True):
                     if not can_call_api():
@@ -595,39 +678,122 @@ with tab3:
                         mark_api_call()
                         with st.spinner("🎧 Listening to vocal patterns..."):
                             mr = st.session_state["mind_reader"]
-                            res = mr.analyze_audio(audio_data)
-                            if "error" not in res:
-                                st.session_state["audio_result"] = res
+                            # Wraps the upload's own buffer: no copy per scan
+                            audio_data = MediaPayload.from_file(audio_file, audio_file.type)
+                            res = run_flow(
+                                "audio", "audio_result", partial(mr.analyze_audio, audio_data),
+                                partial(provisional_audio, audio_data),
+                            )
+                            if accept_media("audio_result", "audio", res) is None:
+                                release_media()
                                 st.rerun()
                             else:
-                                st.error(res["error"])
+                                show_error(res)
 
         st.markdown("</div>", unsafe_allow_html=True)
 
     with c_aud_res:
         if st.session_state["audio_result"]:
-            ar = st.session_state["audio_result"]
+            ar = get_result("audio_result")
+            show_provisional("audio_result", ar)
+            audio_result_card(ar)
+        else:
+            st.info("👈 Record or upload audio to start voice analysis.")
 
-            status = ar["truthfulness_indicator"]["status"]
-            color = "#27ae60" if "Truth" in status else "#c0392b"
+# =========================================
+# TAB 4: CHAT LOG IMPORT
+# =========================================
+with tab4:
+    c_chat, c_chat_res = st.columns([1, 1.5])
 
-            st.markdown(
-                f"""
-            <div class='glass-card glow-effect' style='border-left: 5px solid {color};'>
-                <h3 style='margin:0; color:{color} !important;'>{safe(status)}</h3>
-                <p>Voice Integrity: <strong>{ar['truthfulness_indicator']['score']}/100</strong></p>
-                <p><em>"{safe(ar['truthfulness_indicator']['reason'])}"</em></p>
-            </div>
+    with c_chat:
+        st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+        chat_file = st.file_uploader(
+            "Upload Chat Export (WhatsApp TXT, Slack/Discord JSON, CSV)",
+            type=["txt", "json", "csv"],
+            key=f"chat_upload_{st.session_state['upload_gen']}",
+        )
+        window_minutes = st.select_slider(
+            "Time window", options=[15, 30, 60, 180, 1440], value=60,
+            format_func=lambda m: f"{m // 60} h" if m >= 60 else f"{m} min",
+        )
 
-            <div class='glass-card'>
-                <h4>🗣️ Tone Analysis</h4>
-                <p><strong>Tone:</strong> {safe(ar['emotional_tone'])}</p>
-                <p><strong>Patterns:</strong> {safe(ar['speech_patterns'])}</p>
-                <hr>
-                <p><strong>Transcript:</strong> <em>"{safe(ar['transcript'])}"</em></p>
-            </div>
-            """,
-                unsafe_allow_html=True,
+        if chat_file and file_size_ok(chat_file, MAX_CHAT_MB):
+            if st.button("💬 Analyze Conversation", use_container_width=True):
+                if not can_call_api():
+                    st.warning("⏳ Please wait before analyzing again.")
+                else:
+                    mark_api_call()
+                    with st.spinner("💬 Scoring messages in batches..."):
+                        mr = st.session_state["mind_reader"]
+                        chat_file.seek(0)
+                        res = analyze_chat(mr, iter_messages(chat_file, chat_file.name), window_minutes)
+                        if res["messages"]:
+                            store_result("chat_result", "chat", res)
+                            release_media()
+                            st.rerun()
+                        elif res["failed_messages"]:
+                            st.error("❌ Analysis Failed. Check your API Key in .env and internet connection.")
+                        else:
+                            st.error("❌ No messages found. Is this a supported chat export?")
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with c_chat_res:
+        if st.session_state["chat_result"]:
+            cr = get_result("chat_result")
+
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Messages", cr["messages"])
+            m2.metric("LLM Calls", cr["batches"])
+            m3.metric("Throughput", f"{cr['messages_per_s']} msg/s")
+            if cr["failed_messages"]:
+                st.warning(f"⚠️ {cr['failed_messages']} messages could not be scored.")
+
+            st.markdown("#### 👥 Per Speaker")
+            st.dataframe(
+                pd.DataFrame(
+                    [
+                        {
+                            "Speaker": name,
+                            "Messages": sp["messages"],
+                            "Avg Truth": sp["avg_truthfulness"],
+                            "Min Truth": sp["min_truthfulness"],
+                            "Dominant Emotion": sp["dominant_emotion"],
+                            "Flags": sp["flags"],
+                        }
+                        for name, sp in cr["speakers"].items()
+                    ]
+                ),
+                use_container_width=True,
+                hide_index=True,
             )
+
+            if cr["windows"]:
+                st.markdown("#### 🕒 Over Time")
+                if cr.get("window_minutes", window_minutes) != window_minutes:
+                    st.caption(f"Windows widened to {cr['window_minutes']} min to keep the timeline compact")
+                fig = go.Figure(
+                    go.Scatter(
+                        x=[w["start"] for w in cr["windows"]],
+                        y=[w["avg_truthfulness"] for w in cr["windows"]],
+                        mode="lines+markers",
+                        text=[w["dominant_emotion"] for w in cr["windows"]],
+                        line=dict(color="#00fff0", width=3),
+                        marker=dict(color="#bc00dd", size=8),
+                    )
+                )
+                fig.update_layout(
+                    yaxis=dict(title="Avg Truth", range=[0, 105]),
+                    paper_bgcolor="rgba(0,0,0,0)",
+                    plot_bgcolor="rgba(0,0,0,0)",
+                    height=260,
+                    margin=dict(t=10, b=10),
+                )
+                st.plotly_chart(fig, use_container_width=True)
         else:
-            st.info("👈 Record or upload audio to start voice analysis.")
\ No newline at end of file
+            st.info("👈 Upload a chat export to see per-speaker insights.")
+
+if _profiler:
+    _paths = _profiler.stop()
+    st.caption(f"⏱️ Rerun profile: {_paths.get('top', 'not written')}")
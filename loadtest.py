@@ -0,0 +1,605 @@
+"""
+Load test: N simulated users running mixed text/image/audio flows against
+the offline stub model, swept over concurrency levels.
+
+    python loadtest.py --users 1,4,8,16 --duration 30
+    python loadtest.py --target app --users 1,2,4 --duration 30
+    python loadtest.py --compare .cache/loadtest/<previous>.json
+
+"reader" drives MindReader directly: one worker process, one shared client
+and a fork per user, as the API server does. "app" drives app.py through
+Streamlit's AppTest, widgets included, one worker process per user.
+Reports (JSON) go to .cache/loadtest/ unless --out is given.
+"""
+import argparse
+import io
+import json
+import math
+import multiprocessing as mp
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# =========================================
+# CONSTANTS
+# =========================================
+DEFAULT_USERS = "1,2,4,8,16"
+DEFAULT_MIX = "text=0.55,long_text=0.05,image=0.2,audio=0.2"
+DEFAULT_SLO_P95_MS = 3000
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORT_DIR = os.path.join(REPO_DIR, ".cache", "loadtest")
+RSS_SAMPLE_S = 0.25
+APP_FILE = os.path.join(REPO_DIR, "app.py")
+APP_TIMEOUT_S = 120
+
+# Outcomes that answered, but without the full reading
+PROVISIONAL = "provisional"   # past the latency budget, a local estimate was shown
+OVERLOADED = "overloaded"     # shed by the request scheduler
+DEGRADED = (PROVISIONAL, OVERLOADED)
+
+WORDS = (
+    "honestly really never always maybe actually just think feel know said told work home team friend "
+    "manager meeting deadline report money trust sorry late tired happy angry worried fine okay great "
+    "yesterday tomorrow tonight weekend promise forgot finished started called texted waited left stayed"
+).split()
+
+
+# =========================================
+# INPUTS
+# =========================================
+def make_text(rng: random.Random, long: bool = False) -> str:
+    """
+    Distinct sentences per call, so preflight and singleflight never dedupe them.
+    """
+    n_sentences = rng.randint(120, 160) if long else rng.randint(2, 4)
+    sentences = []
+    for _ in range(n_sentences):
+        words = rng.choices(WORDS, k=rng.randint(6, 14))
+        sentences.append(" ".join(words).capitalize() + rng.choice([".", ".", "!", "?"]))
+    return " ".join(sentences) + f" (#{rng.getrandbits(32):08x})"
+
+
+def make_image(rng: random.Random) -> bytes:
+    """
+    Random blocky JPEG: a new perceptual hash each time (no image-cache hits).
+    """
+    import cv2
+
+    blocks = np.random.default_rng(rng.getrandbits(32)).integers(0, 256, (9, 9, 3), dtype=np.uint8)
+    img = cv2.resize(blocks, (192, 192), interpolation=cv2.INTER_NEAREST)
+    ok, buf = cv2.imencode(".jpg", img)
+    return buf.tobytes()
+
+
+def make_audio(rng: random.Random, sr: int = 16000) -> bytes:
+    """
+    ~2 s voiced WAV with syllable-rate energy and pitch movement (passes VAD).
+    """
+    duration = rng.uniform(1.5, 2.5)
+    t = np.arange(int(sr * duration)) / sr
+    pitch = rng.uniform(110, 240) * (1 + 0.05 * np.sin(2 * math.pi * rng.uniform(0.5, 2) * t))
+    phase = 2 * math.pi * np.cumsum(pitch) / sr
+    envelope = 0.5 + 0.5 * np.sin(2 * math.pi * rng.uniform(3, 5) * t)
+    samples = 0.4 * envelope * np.sin(phase)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+# =========================================
+# DRIVERS
+# =========================================
+def failed(result) -> Optional[str]:
+    if isinstance(result, dict) and "error" in result:
+        return OVERLOADED if result.get("overloaded") else str(result["error"])
+    return None
+
+
+class ReaderUser:
+    """
+    One session on the shared client, like a server request stream.
+    """
+
+    def __init__(self, base):
+        self.reader = base.fork()
+
+    def run(self, flow: str, rng: random.Random) -> Optional[str]:
+        if flow in ("text", "long_text"):
+            text = make_text(rng, long=flow == "long_text")
+            return failed(self.reader.analyze_text(text)) or failed(self.reader.get_suggestions(text))
+        if flow == "image":
+            return failed(self.reader.analyze_image(make_image(rng)))
+        if flow == "audio":
+            return failed(self.reader.analyze_audio(make_audio(rng)))
+        raise ValueError(f"Unknown flow: {flow}")
+
+    def close(self):
+        pass
+
+
+class AppUser:
+    """
+    One browser session on app.py: reruns, widgets and session state included.
+    The app's 10 s per-session cooldown is reset before each action, since a
+    simulated user acts faster than the UI allows.
+    """
+
+    def __init__(self, base=None):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(APP_FILE, default_timeout=APP_TIMEOUT_S)
+        self.at.run()
+
+    def _button(self, prefix: str):
+        return next(b for b in self.at.button if b.label.startswith(prefix))
+
+    def _uploader(self, prefix: str):
+        return next(u for u in self.at.file_uploader if u.label.startswith(prefix))
+
+    def _outcome(self, flow: str) -> Optional[str]:
+        if len(self.at.exception):
+            return self.at.exception[0].value
+        errors = [e.value for e in self.at.error]
+        if errors:
+            return errors[0]
+        if any(w.value.startswith("⏳") for w in self.at.warning):
+            return OVERLOADED
+        if ("text" if flow == "long_text" else flow) in self.at.session_state["pending"]:
+            return PROVISIONAL  # the full reading is still running past the budget
+        return None
+
+    def run(self, flow: str, rng: random.Random) -> Optional[str]:
+        at = self.at
+        at.session_state["last_call"] = 0
+        if flow in ("text", "long_text"):
+            at.text_area[0].input(make_text(rng, long=flow == "long_text"))
+            self._button("🚀").click().run()
+        elif flow == "image":
+            self._uploader("Upload Subject Image").upload("face.jpg", make_image(rng), "image/jpeg").run()
+            self._button("📸").click().run()
+        elif flow == "audio":
+            at.radio[0].set_value("📤 Upload Audio").run()
+            self._uploader("Upload Audio").upload("voice.wav", make_audio(rng), "audio/wav").run()
+            self._button("🎙️ Analyze Uploaded").click().run()
+        else:
+            raise ValueError(f"Unknown flow: {flow}")
+        return self._outcome(flow)
+
+    def close(self):
+        self.at = None
+
+
+# =========================================
+# MEASUREMENT
+# =========================================
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        import resource  # peak, not current, where /proc is unavailable
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (2 ** 20 if sys.platform == "darwin" else 1024)
+
+
+class RssSampler:
+    def __init__(self):
+        self.samples: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            self.samples.append(rss_mb())
+            if self._stop.wait(RSS_SAMPLE_S):
+                break
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile (q in 0–100).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    ms = [v * 1000 for v in latencies]
+    return {
+        "p50": round(percentile(ms, 50), 1),
+        "p95": round(percentile(ms, 95), 1),
+        "p99": round(percentile(ms, 99), 1),
+        "mean": round(sum(ms) / len(ms), 1) if ms else 0.0,
+        "max": round(max(ms), 1) if ms else 0.0,
+    }
+
+
+# =========================================
+# RUN
+# =========================================
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {"text", "long_text", "image", "audio"}
+    if unknown:
+        raise SystemExit(f"Unknown flows in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def user_seed(seed: int, users: int, i: int) -> int:
+    return seed * 1_000_003 + users * 1009 + i
+
+
+def user_loop(session, rng: random.Random, deadline: float, mix: Dict[str, float], think_ms: float):
+    """
+    Closed loop until `deadline`: pick a flow, run it, pause. Returns
+    ({flow: [latency_s]}, {flow: [error]}, {flow: {"provisional"|"overloaded": count}}).
+    """
+    samples, errors = defaultdict(list), defaultdict(list)
+    degraded = defaultdict(lambda: dict.fromkeys(DEGRADED, 0))
+    flows, weights = list(mix), list(mix.values())
+    while time.time() < deadline:
+        flow = rng.choices(flows, weights)[0]
+        started = time.perf_counter()
+        try:
+            error = session.run(flow, rng)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        samples[flow].append(time.perf_counter() - started)
+        if error in DEGRADED:
+            degraded[flow][error] += 1
+        elif error:
+            errors[flow].append(error)
+        if think_ms:
+            time.sleep(think_ms / 1000 * rng.uniform(0.5, 1.5))
+    return dict(samples), dict(errors), dict(degraded)
+
+
+def run_threads(base, users: int, duration: float, mix: Dict[str, float], think_ms: float, seed: int):
+    """
+    Every user a thread on one shared client: one worker process.
+    """
+    results = []
+    lock = threading.Lock()
+    deadline = [0.0]
+
+    def start_clock():  # runs once every session is set up, before any is released
+        deadline[0] = time.time() + duration
+
+    start_barrier = threading.Barrier(users + 1, action=start_clock)
+
+    def user(i: int):
+        try:
+            session = ReaderUser(base)
+        except Exception as e:
+            with lock:
+                results.append(({}, {"session": [str(e)]}, {}))
+            start_barrier.wait()
+            return
+        start_barrier.wait()
+        result = user_loop(session, random.Random(user_seed(seed, users, i)), deadline[0], mix, think_ms)
+        session.close()
+        with lock:
+            results.append(result)
+
+    rss_before = rss_mb()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)]
+    with RssSampler() as rss:
+        for t in threads:
+            t.start()
+        start_barrier.wait()
+        started = deadline[0] - duration
+        for t in threads:
+            t.join()
+        wall = time.time() - started
+    peak = max(rss.samples)
+    memory = {
+        "workers": 1,
+        "worker_rss_peak_mb": round(peak, 1),
+        "worker_rss_mean_peak_mb": round(peak, 1),
+        "per_user_mb": round(max(0.0, peak - rss_before) / users, 2),
+    }
+    return results, wall, memory
+
+
+def _app_worker(index: int, users: int, seed: int, mix, think_ms: float, ready, start, deadline, out):
+    """
+    One simulated browser session per process: AppTest sessions cannot run
+    side by side in one interpreter (they share Streamlit's Runtime).
+    """
+    sys.path.insert(0, REPO_DIR)
+    import src.analyzer  # noqa: F401  imports are per worker, not per user
+    from streamlit.testing.v1 import AppTest  # noqa: F401
+
+    rss_before = rss_mb()
+    try:
+        session = AppUser()
+        for flow in mix:  # warm-up: first-run costs are not measured
+            session.run(flow, random.Random(-1 - index))
+    except Exception as e:
+        ready.put(index)
+        out.put(({}, {"session": [f"{type(e).__name__}: {e}"]}, {}, 0.0))
+        return
+    with RssSampler() as rss:
+        ready.put(index)
+        start.wait()
+        result = user_loop(session, random.Random(user_seed(seed, users, index)), deadline.value, mix, think_ms)
+    session.close()
+    out.put((*result, max(0.0, max(rss.samples) - rss_before), max(rss.samples)))
+
+
+def run_processes(users: int, duration: float, mix: Dict[str, float], think_ms: float, seed: int):
+    """
+    Every user an AppTest session in its own worker process.
+    """
+    ctx = mp.get_context("spawn")
+    ready, out, start = ctx.Queue(), ctx.Queue(), ctx.Event()
+    deadline = ctx.Value("d", 0.0)
+    procs = [ctx.Process(target=_app_worker, args=(i, users, seed, mix, think_ms, ready, start, deadline, out),
+                         daemon=True) for i in range(users)]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.get()
+    started = time.time()
+    deadline.value = started + duration
+    start.set()
+
+    results, peaks, per_user = [], [], []
+    for _ in procs:
+        samples, errors, degraded, *memory = out.get()
+        results.append((samples, errors, degraded))
+        if len(memory) == 2:
+            per_user.append(memory[0])
+            peaks.append(memory[1])
+    wall = time.time() - started
+    for p in procs:
+        p.join()
+    memory = {
+        "workers": users,
+        "worker_rss_peak_mb": round(max(peaks), 1) if peaks else 0.0,
+        "worker_rss_mean_peak_mb": round(sum(peaks) / len(peaks), 1) if peaks else 0.0,
+        "per_user_mb": round(sum(per_user) / len(per_user), 2) if per_user else 0.0,
+    }
+    return results, wall, memory
+
+
+def run_level(target: str, base, users: int, duration: float, mix: Dict[str, float], think_ms: float,
+              seed: int) -> Dict:
+    if target == "app":
+        results, wall, memory = run_processes(users, duration, mix, think_ms, seed)
+    else:
+        results, wall, memory = run_threads(base, users, duration, mix, think_ms, seed)
+
+    samples, errors = defaultdict(list), defaultdict(list)
+    degraded = defaultdict(lambda: dict.fromkeys(DEGRADED, 0))
+    for flow_samples, flow_errors, flow_degraded in results:
+        for flow, values in flow_samples.items():
+            samples[flow] += values
+        for flow, values in flow_errors.items():
+            errors[flow] += values
+        for flow, counts in flow_degraded.items():
+            for kind, n in counts.items():
+                degraded[flow][kind] += n
+
+    all_latencies = [v for flow in samples.values() for v in flow]
+    n_errors = sum(len(v) for v in errors.values())
+    totals = {kind: sum(c[kind] for c in degraded.values()) for kind in DEGRADED}
+    n_degraded = sum(totals.values())
+    return {
+        "users": users,
+        "wall_s": round(wall, 2),
+        "requests": len(all_latencies),
+        "errors": n_errors,
+        "error_rate": round(n_errors / len(all_latencies), 4) if all_latencies else 0.0,
+        **totals,
+        "degraded_rate": round(n_degraded / len(all_latencies), 4) if all_latencies else 0.0,
+        "throughput_rps": round(len(all_latencies) / wall, 3) if wall else 0.0,
+        "latency_ms": latency_summary(all_latencies),
+        "flows": {
+            flow: {
+                "requests": len(lat),
+                "errors": len(errors.get(flow, [])),
+                **degraded.get(flow, dict.fromkeys(DEGRADED, 0)),
+                "latency_ms": latency_summary(lat),
+            }
+            for flow, lat in sorted(samples.items())
+        },
+        "memory": memory,
+        "sample_errors": {flow: sorted(set(msgs))[:3] for flow, msgs in errors.items()},
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+                             cwd=REPO_DIR)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def capacity(levels: List[Dict], slo_p95_ms: float, max_error_rate: float, max_degraded_rate: float) -> Dict:
+    """
+    Largest concurrency whose p95, error rate and degraded (provisional or
+    shed) rate stay within the SLO.
+    """
+    within = [lv["users"] for lv in levels
+              if lv["requests"] and lv["latency_ms"]["p95"] <= slo_p95_ms and lv["error_rate"] <= max_error_rate
+              and lv["degraded_rate"] <= max_degraded_rate]
+    return {
+        "slo_p95_ms": slo_p95_ms,
+        "max_error_rate": max_error_rate,
+        "max_degraded_rate": max_degraded_rate,
+        "max_users_within_slo": max(within) if within else 0,
+    }
+
+
+# =========================================
+# OUTPUT
+# =========================================
+def print_report(report: Dict):
+    cfg = report["config"]
+    print(f"\ntarget={cfg['target']}  stub latency={cfg['stub_latency_ms']} ms  think={cfg['think_ms']} ms  "
+          f"duration={cfg['duration_s']} s  mix={cfg['mix']}")
+    print(f"{'users':>5} {'req':>6} {'err%':>6} {'prov%':>6} {'shed%':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'workers':>7} {'rss peak':>9} {'MB/user':>8}")
+    for lv in report["levels"]:
+        lat = lv["latency_ms"]
+        share = {kind: 100 * lv[kind] / lv["requests"] if lv["requests"] else 0.0 for kind in DEGRADED}
+        print(f"{lv['users']:>5} {lv['requests']:>6} {100 * lv['error_rate']:>5.1f}% {share[PROVISIONAL]:>5.1f}% "
+              f"{share[OVERLOADED]:>5.1f}% {lv['throughput_rps']:>7.2f} "
+              f"{lat['p50']:>8.0f} {lat['p95']:>8.0f} {lat['p99']:>8.0f} {lv['memory']['workers']:>7} "
+              f"{lv['memory']['worker_rss_peak_mb']:>9.1f} {lv['memory']['per_user_mb']:>8.2f}")
+        for flow, msgs in lv["sample_errors"].items():
+            print(f"      {flow} errors: {'; '.join(m[:80] for m in msgs)}")
+    cap = report["capacity"]
+    print(f"capacity: {cap['max_users_within_slo']} users within p95 <= {cap['slo_p95_ms']:.0f} ms "
+          f"and errors <= {100 * cap['max_error_rate']:.0f}% "
+          f"and provisional/shed <= {100 * cap['max_degraded_rate']:.0f}%")
+
+
+def compare(current: Dict, baseline: Dict):
+    """
+    Per-level changes against a previous report (same concurrency levels only).
+    """
+    def pct(new, old):
+        return f"{100 * (new - old) / old:+6.1f}%" if old else "    n/a"
+
+    old_levels = {lv["users"]: lv for lv in baseline["levels"]}
+    if baseline["config"] != {**current["config"], "users": baseline["config"]["users"]}:
+        print("\nnote: configurations differ (target, mix, think time or stub latency); deltas are indicative")
+    print(f"\nvs {baseline['meta'].get('revision') or '?'} ({baseline['meta']['created']}, "
+          f"target={baseline['config']['target']}):")
+    print(f"{'users':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'rss peak':>9}")
+    for lv in current["levels"]:
+        old = old_levels.get(lv["users"])
+        if old is None:
+            continue
+        print(f"{lv['users']:>5} {pct(lv['throughput_rps'], old['throughput_rps']):>8} "
+              f"{pct(lv['latency_ms']['p50'], old['latency_ms']['p50']):>8} "
+              f"{pct(lv['latency_ms']['p95'], old['latency_ms']['p95']):>8} "
+              f"{pct(lv['latency_ms']['p99'], old['latency_ms']['p99']):>8} "
+              f"{pct(lv['memory']['worker_rss_peak_mb'], old['memory']['worker_rss_peak_mb']):>9}")
+    old_cap = baseline["capacity"]["max_users_within_slo"]
+    print(f"capacity: {old_cap} -> {current['capacity']['max_users_within_slo']} users")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("reader", "app"), default="reader")
+    parser.add_argument("--users", default=DEFAULT_USERS, help="comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="flow weights, e.g. text=0.6,image=0.2,audio=0.2")
+    parser.add_argument("--think-ms", type=float, default=1000, help="mean pause between a user's actions")
+    parser.add_argument("--latency-ms", type=int, default=300, help="stub model latency per call")
+    parser.add_argument("--slo-p95-ms", type=float, default=DEFAULT_SLO_P95_MS)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-degraded-rate", type=float, default=0.05,
+                        help="share of provisional or overloaded (shed) answers allowed within the SLO")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="report path (default: .cache/loadtest/<time>-<target>.json)")
+    parser.add_argument("--compare", help="previous report to diff against")
+    args = parser.parse_args(argv)
+
+    out = os.path.abspath(args.out or os.path.join(
+        REPORT_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{args.target}.json"
+    ))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    # Before importing src: the backend and its latency are read at import time
+    os.environ["MINDREADER_BACKEND"] = "stub"
+    os.environ["MINDREADER_STUB_LATENCY_MS"] = str(args.latency_ms)
+    sys.path.insert(0, REPO_DIR)
+    # Fresh .cache (image scans, singleflight, translations) so reruns start cold
+    workdir = tempfile.mkdtemp(prefix="mindreader-loadtest-")
+    os.chdir(workdir)
+    try:
+        report = run(args)
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    if baseline is not None:
+        compare(report, baseline)
+    print(f"\nreport: {out}")
+
+
+def run(args) -> Dict:
+    from src.analyzer import create_reader
+
+    levels_spec = [int(u) for u in args.users.split(",") if u.strip()]
+    mix = parse_mix(args.mix)
+    base = None
+    if args.target == "reader":
+        base = create_reader()
+        # Warm-up: imports, model construction and first-run caches are not measured
+        warm = ReaderUser(base)
+        for flow in mix:
+            warm.run(flow, random.Random(-1))
+
+    levels = []
+    for users in levels_spec:
+        print(f"running {users} user(s) for {args.duration:g} s...", flush=True)
+        levels.append(run_level(args.target, base, users, args.duration, mix, args.think_ms, args.seed))
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "target": args.target,
+            "users": levels_spec,
+            "duration_s": args.duration,
+            "mix": mix,
+            "think_ms": args.think_ms,
+            "stub_latency_ms": args.latency_ms,
+            "seed": args.seed,
+        },
+        "levels": levels,
+        "capacity": capacity(levels, args.slo_p95_ms, args.max_error_rate, args.max_degraded_rate),
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,24 @@
+from functools import partial
+
 import streamlit as st
-import pandas as pd
-import requests
-from src.utils import analyze_audio_tone
-from streamlit_lottie import st_lottie
+from streamlit_lottie import st_lottie  # type: ignore
+
+from src.components import (
+    WAVE_LOTTIE, accept_media, audio_result_card, can_call_api, file_size_ok, get_result, init_session,
+    load_lottie, mark_api_call, poll_pending, release_media, run_flow, show_error, show_provisional,
+)
+from src.media import MediaPayload
+from src.provisional import provisional_audio
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Voice Scanner", page_icon="🎙️", layout="wide")
 
-# --- ASSETS ---
-def load_lottieurl(url):
-    try:
-        r = requests.get(url)
-        return r.json()
-    except: return None
+# Same engine, history and results as the main page
+init_session()
 
-# Sound Wave Animation
-lottie_audio = load_lottieurl("https://lottie.host/9f6d4822-4418-4a5d-a006-218456f338d4/S8y8l9kS4w.json") # Placeholder link
-# Note: Using same brain animation for now or find a waveform Lottie if you prefer
+# --- ASSETS ---
+# Sound Wave Animation (cached per process, like the main page's)
+lottie_audio = load_lottie(WAVE_LOTTIE)
 
 # --- CSS (Wahi Premium Theme) ---
 st.markdown("""
@@ -34,90 +36,67 @@ st.markdown("""
         margin-bottom: 20px;
     }
     .score-num { font-size: 3rem; font-weight: 800; color: #6C5CE7; }
-    
+
     /* Audio Player Style */
     .stAudio { width: 100%; }
     </style>
 """, unsafe_allow_html=True)
 
 # --- HEADER ---
-st.markdown("# 🎙️ Voice Stress & Lie Detector")
-st.markdown("<p style='opacity:0.7'>Analyze vocal patterns, pitch, and hesitation to detect deception.</p>", unsafe_allow_html=True)
+h1, h2 = st.columns([1, 8])
+with h1:
+    if lottie_audio:
+        st_lottie(lottie_audio, height=80, key="voice_anim")
+with h2:
+    st.markdown("# 🎙️ Voice Stress & Lie Detector")
+    st.markdown("<p style='opacity:0.7'>Analyze vocal patterns, pitch, and hesitation to detect deception.</p>", unsafe_allow_html=True)
 st.markdown("---")
 
+# --- PENDING RESULTS ---
+# Calls past their budget (from either page) swap in their full result here too
+if st.session_state["pending"]:
+    poll_pending()
+
 # --- MAIN LAYOUT ---
 col1, col2 = st.columns([1, 1.5])
 
 with col1:
     st.markdown("### 📤 Input Audio")
     st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
-    
-    # 1. File Uploader
-    audio_file = st.file_uploader("Upload Audio (MP3/WAV)", type=['mp3', 'wav'])
-    
-    # OR 2. Audio Input (New Streamlit Feature)
-    # st.audio_input is available in newer streamlit versions
-    # mic_input = st.audio_input("Or Record Voice") 
-    
-    final_audio = audio_file # Add mic_input logic if you update streamlit
-    
-    if final_audio:
-        st.audio(final_audio, format="audio/mp3")
+
+    audio_file = st.file_uploader(
+        "Upload Audio (MP3/WAV)", type=['mp3', 'wav'], key=f"voice_page_upload_{st.session_state['upload_gen']}"
+    )
+
+    if audio_file and file_size_ok(audio_file):
+        st.audio(audio_file)
         st.write("")
         if st.button("🎙️ Analyze Voice Tone", use_container_width=True):
-            with st.spinner("🎧 Listening to vocal cues..."):
-                bytes_data = final_audio.getvalue()
-                res = analyze_audio_tone(bytes_data)
-                
-                if "error" not in res:
-                    st.session_state['audio_result'] = res
-                else:
-                    st.error(res['error'])
+            if not can_call_api():
+                st.warning("⏳ Please wait before analyzing again.")
+            else:
+                mark_api_call()
+                with st.spinner("🎧 Listening to vocal cues..."):
+                    mr = st.session_state["mind_reader"]
+                    audio_data = MediaPayload.from_file(audio_file, audio_file.type)
+                    res = run_flow(
+                        "audio", "audio_result", partial(mr.analyze_audio, audio_data),
+                        partial(provisional_audio, audio_data),
+                    )
+                    if accept_media("audio_result", "audio", res) is None:
+                        release_media()
+                        st.rerun()
+                    else:
+                        show_error(res)
     else:
         st.info("Upload an audio recording of the subject talking.")
-        
+
     st.markdown("</div>", unsafe_allow_html=True)
 
 with col2:
-    if 'audio_result' in st.session_state:
-        r = st.session_state['audio_result']
-        
-        # Color Logic
-        status = r['truthfulness_indicator']['status']
-        color = "#27ae60" if "Truth" in status or "Calm" in status else "#c0392b"
-        
-        st.markdown(f"""
-        <div class='glass-card' style='border-left: 5px solid {color};'>
-            <h2 style='margin:0; color:{color} !important;'>{status}</h2>
-            <p>Vocal Integrity Score: <strong>{r['truthfulness_indicator']['score']}/100</strong></p>
-            <p><em>"{r['truthfulness_indicator']['reason']}"</em></p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        c_a, c_b = st.columns(2)
-        with c_a:
-            st.markdown(f"""
-            <div class='glass-card'>
-                <h4>🗣️ Tone Analysis</h4>
-                <p>{r['emotional_tone']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        with c_b:
-            st.markdown(f"""
-            <div class='glass-card'>
-                <h4>📉 Patterns</h4>
-                <p>{r['speech_patterns']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        st.markdown(f"""
-        <div class='glass-card'>
-            <h4>📝 Transcript</h4>
-            <p style='background:rgba(0,0,0,0.05); padding:10px; border-radius:10px; font-style:italic;'>
-                "{r['transcript']}"
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
-        
+    if st.session_state["audio_result"]:
+        ar = get_result("audio_result")
+        show_provisional("audio_result", ar)
+        audio_result_card(ar)
     else:
-        st.info("👈 Upload audio to detect voice stress.")
\ No newline at end of file
+        st.info("👈 Upload audio to detect voice stress.")
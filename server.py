@@ -0,0 +1,237 @@
+"""
+Headless HTTP API for MindReader.
+
+    uvicorn server:app --workers 4 --port 8000
+
+Each worker process builds one shared client (model + connections) and
+hands every caller a lightweight session fork keyed by the X-Session-Id
+header. Those sessions live in the worker's memory: with several workers,
+conversational memory only holds if the load balancer routes a session id
+to the same worker every time (sticky routing). /healthz and /metrics
+describe the worker that answers them, identified by its pid.
+Set MINDREADER_BACKEND=stub to serve from the offline stand-in
+model for load tests.
+"""
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import List
+
+from fastapi import FastAPI, File, Header, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from src.analyzer import MindReader, create_reader
+from src.singleflight import get_singleflight
+from src.media import MediaPayload, MediaTooLarge
+from src.incremental import incremental_stats
+from src.preflight import preflight_stats
+from src.prompts import prompt_stats
+from src.scheduler import get_scheduler
+
+# =========================================
+# CONSTANTS
+# =========================================
+MAX_TEXT_CHARS = 50_000
+MAX_BATCH_MESSAGES = 200
+MAX_BODY_MB = int(os.getenv("MINDREADER_MAX_BODY_MB", "25"))
+MAX_VIDEO_MB = int(os.getenv("MINDREADER_MAX_VIDEO_MB", "200"))
+MAX_SESSIONS = 10_000
+UPLOAD_CHUNK = 1024 * 1024
+RETRY_AFTER_S = 5
+
+app = FastAPI(title="Mind Reader AI", version="1.0")
+
+_base_reader = None
+_base_lock = threading.Lock()
+_sessions: "OrderedDict[str, MindReader]" = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+# =========================================
+# SHARED CLIENT & SESSIONS
+# =========================================
+def base_reader() -> MindReader:
+    global _base_reader
+    with _base_lock:
+        if _base_reader is None:
+            _base_reader = create_reader()
+        return _base_reader
+
+
+def session_reader(session_id) -> MindReader:
+    """
+    Per-caller MindReader (own memory) sharing the worker's client. LRU-bounded
+    and local to this worker process.
+    """
+    if not session_id:
+        return base_reader().fork()
+    with _sessions_lock:
+        reader = _sessions.pop(session_id, None)
+        if reader is None:
+            reader = base_reader().fork(session_id=session_id)
+        _sessions[session_id] = reader
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+        return reader
+
+
+@app.on_event("startup")
+def _warm_up():
+    base_reader()
+
+
+# =========================================
+# LIMITS
+# =========================================
+@app.middleware("http")
+async def limit_body_size(request: Request, call_next):
+    limit_mb = MAX_VIDEO_MB if request.url.path == "/v1/video" else MAX_BODY_MB
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > limit_mb * 1024 * 1024:
+        return JSONResponse({"error": f"Request too large. Max {limit_mb} MB."}, status_code=413)
+    return await call_next(request)
+
+
+def copy_upload(upload: UploadFile, dst, limit_mb: int) -> int:
+    """
+    Copy an upload in chunks, aborting as soon as it passes the size limit
+    (covers chunked requests without a Content-Length).
+    """
+    total = 0
+    while True:
+        chunk = upload.file.read(UPLOAD_CHUNK)
+        if not chunk:
+            return total
+        total += len(chunk)
+        if total > limit_mb * 1024 * 1024:
+            raise HTTPException(status_code=413, detail=f"Upload too large. Max {limit_mb} MB.")
+        dst.write(chunk)
+
+
+def read_upload(upload: UploadFile, default_mime: str) -> MediaPayload:
+    """
+    Hash and spool an upload in one pass; past the limit it is rejected.
+    """
+    try:
+        return MediaPayload.from_file(upload.file, upload.content_type or default_mime, MAX_BODY_MB * 1024 * 1024)
+    except MediaTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+# =========================================
+# ENDPOINTS
+# =========================================
+class TextRequest(BaseModel):
+    text: str
+    style: str = "calm"
+
+
+def _check_text(req: TextRequest):
+    if len(req.text) > MAX_TEXT_CHARS:
+        raise HTTPException(status_code=413, detail=f"Text too long. Max {MAX_TEXT_CHARS} characters.")
+
+
+class ChatLine(BaseModel):
+    speaker: str
+    text: str
+
+
+class MessagesRequest(BaseModel):
+    messages: List[ChatLine]
+
+
+def respond(result):
+    """
+    Scheduler rejections become 503 + Retry-After so clients back off.
+    """
+    # analyze_messages reports a failed batch as a one-item list
+    first = result[0] if isinstance(result, list) and len(result) == 1 else result
+    if isinstance(first, dict) and first.get("overloaded"):
+        return JSONResponse(first, status_code=503, headers={"Retry-After": str(RETRY_AFTER_S)})
+    return result
+
+
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok", "worker": os.getpid(), "sessions": len(_sessions)}
+
+
+@app.get("/metrics")
+def metrics():
+    return {
+        "worker": os.getpid(),
+        "singleflight": get_singleflight().stats(),
+        "models": base_reader().router.stats(),
+        "preflight": preflight_stats(),
+        "prompts": prompt_stats(),
+        "scheduler": get_scheduler().stats(),
+        "incremental": incremental_stats(),
+    }
+
+
+# Sync handlers: FastAPI runs them on its thread pool, so blocking
+# Gemini calls never stall the event loop.
+@app.post("/v1/text")
+def analyze_text(req: TextRequest, x_session_id: str = Header(None)):
+    _check_text(req)
+    return respond(session_reader(x_session_id).analyze_text(req.text, style=req.style))
+
+
+@app.post("/v1/suggestions")
+def get_suggestions(req: TextRequest, x_session_id: str = Header(None)):
+    _check_text(req)
+    return respond(session_reader(x_session_id).get_suggestions(req.text, style=req.style))
+
+
+@app.post("/v1/messages")
+def analyze_messages(req: MessagesRequest, x_session_id: str = Header(None)):
+    if len(req.messages) > MAX_BATCH_MESSAGES or sum(len(m.text) for m in req.messages) > MAX_TEXT_CHARS:
+        raise HTTPException(status_code=413, detail=f"Batch too large. Max {MAX_BATCH_MESSAGES} messages.")
+    return respond(session_reader(x_session_id).analyze_messages(req.messages))
+
+
+@app.post("/v1/image")
+def analyze_image(file: UploadFile = File(...), x_session_id: str = Header(None)):
+    media = read_upload(file, "image/jpeg")
+    try:
+        return respond(session_reader(x_session_id).analyze_image(media))
+    finally:
+        media.close()
+
+
+@app.post("/v1/audio")
+def analyze_audio(file: UploadFile = File(...), x_session_id: str = Header(None)):
+    media = read_upload(file, "audio/wav")
+    try:
+        return respond(session_reader(x_session_id).analyze_audio(media))
+    finally:
+        media.close()
+
+
+@app.post("/v1/video")
+def analyze_video(file: UploadFile = File(...), x_session_id: str = Header(None)):
+    suffix = os.path.splitext(file.filename or "")[1] or ".mp4"
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        try:
+            copy_upload(file, tmp, MAX_VIDEO_MB)
+        except HTTPException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    try:
+        return respond(session_reader(x_session_id).analyze_video(tmp.name))
+    finally:
+        os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "server:app",
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+    )
@@ -1,101 +1,186 @@
 import google.generativeai as genai
+import itertools
+import os
 import time
-from collections import deque
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
-from .utils import safe_json_load, clamp, rule_based_flags, is_crisis, explain_score, therapist_style_prompt
+from .audio import decode_wav, extract_features, feature_hints, offline_audio_result
+from .utils import safe_json_load, clamp, rule_based_flags, explain_score, get_api_key, estimate_tokens
+from .video import select_keyframes, extract_audio_track
+from .hashing import image_dhash, get_image_cache
+from .media import as_payload, resolve_parts
+from .profiling import profiled
+from .records import MemoryEntry, deep_sizeof
+from .prompts import system_instruction, STATS as PROMPT_STATS
+from .language import normalize_text
+from .preflight import Preflight, CRISIS_ANALYSIS, CRISIS_SUGGESTIONS, MIN_IMAGE_BYTES, MIN_AUDIO_BYTES
+from .chunking import chunk_text
+from .incremental import Draft, STATS as INCREMENTAL_STATS
+from .singleflight import request_key, get_singleflight
+from .router import ModelRouter, request_profile
+from .scheduler import Overloaded, get_scheduler
+
+VIDEO_BATCH_SIZE = 4   # keyframes per Gemini call
+VIDEO_WORKERS = 3      # batches analyzed in parallel
+LONG_TEXT_TOKENS = 1500  # above this, analyze_text maps over chunks
+LONG_TEXT_WORKERS = 4    # chunks scored in parallel
+NORMALIZE_WORKERS = 4    # texts translated for the rule engine alongside their LLM call
+
+# Scheduler class per prompt kind (a reader's own `priority` overrides it)
+KIND_PRIORITY = {
+    "text": "interactive",
+    "text_chunk": "interactive",
+    "text_sentences": "interactive",
+    "text_readings": "interactive",
+    "text_synthesis": "interactive",
+    "suggestions": "interactive",
+    "image": "media",
+    "audio": "media",
+    "video_frames": "media",
+    "messages": "bulk",
+}
+_session_ids = itertools.count(1)
+_normalize_pool = ThreadPoolExecutor(max_workers=NORMALIZE_WORKERS, thread_name_prefix="mindreader-normalize")
 
 class MindReader:
-    def __init__(self, api_key: str):
-        if not api_key:
-            raise ValueError("API Key is required")
-        genai.configure(api_key=api_key)
-        self.model = self._get_model()
+    def __init__(self, api_key: str = None, model=None, router: ModelRouter = None, scheduler=None,
+                 priority: str = None, session_id: str = None):
+        if router is None:
+            if model is not None:
+                router = ModelRouter.single(model)
+            else:
+                if not api_key:
+                    raise ValueError("API Key is required")
+                genai.configure(api_key=api_key)
+                router = ModelRouter.from_genai()
+        self.router = router
+        self.scheduler = scheduler or get_scheduler()
+        self.priority = priority
+        self.session_id = session_id or f"s{next(_session_ids)}"
+        self.model = router.default_model()
         self.memory = deque(maxlen=5)
-
-    def _get_model_name(self):
-        try:
-            for m in genai.list_models():
-                if "generateContent" in m.supported_generation_methods:
-                    if "flash" in m.name.lower() or "pro" in m.name.lower():
-                        return m.name
-        except:
-            pass
-        return "models/gemini-1.5-flash"
-
-    def _get_model(self):
-        return genai.GenerativeModel(self._get_model_name())
-
-    def remember(self, user_text: str, mood: str = "Unknown"):
-        self.memory.append({
-            "time": time.strftime("%H:%M:%S"),
-            "text": user_text[:80],
-            "mood": mood
-        })
+        self.preflight = Preflight()
+        self.draft = None  # last analyzed text, for sentence-level re-analysis
+
+    def fork(self, priority: str = None, session_id: str = None) -> "MindReader":
+        """
+        New session sharing this client (models, routing stats, caches,
+        scheduler) but with its own conversational memory. `priority` pins
+        every call to one scheduler class, e.g. "bulk" for offline scoring.
+        """
+        return MindReader(router=self.router, scheduler=self.scheduler, priority=priority, session_id=session_id)
+
+    def remember(self, user_text: str, mood: str = "Unknown", summary: str = None):
+        # Long inputs keep a gist (opening + synthesized meaning) instead of a bare prefix
+        text = f"{user_text[:60]}… [{summary[:160]}]" if summary else user_text[:80]
+        self.memory.append(MemoryEntry(text, mood))
 
     def get_context(self) -> List[Dict]:
-        return list(self.memory)
+        return [m.to_dict() for m in self.memory]
+
+    def cache_size(self) -> int:
+        """
+        Bytes of this session's own caches: the last draft and the preflight memo.
+        """
+        return deep_sizeof(self.draft) + deep_sizeof(self.preflight._last)
+
+    def drop_caches(self):
+        """
+        Free the session caches; the next edit runs a full pass, the next repeat is re-analyzed.
+        """
+        self.draft = None
+        self.preflight.forget()
+
+    def _call_gemini(self, kind: str, prompt, parts=None, style: str = "calm"):
+        """
+        `prompt` is only the variable part; the static instructions for `kind`
+        live on the (cached) model as its system instruction.
+        """
+        system = system_instruction(kind, style)
+        priority = self.priority or KIND_PRIORITY.get(kind, "interactive")
+        try:
+            self.scheduler.admit(priority)  # reject early, before anyone waits on us
+        except Overloaded as e:
+            return {"error": str(e), "overloaded": True}
+        # Identical concurrent requests (any session, thread or worker) share one call
+        key = request_key(system + "\n" + prompt, parts)
+        return get_singleflight().do(
+            key, lambda timeout: self._scheduled_call(priority, kind, system, prompt, parts, timeout)
+        )
+
+    def _scheduled_call(self, priority: str, kind: str, system: str, prompt, parts=None, timeout=None):
+        # Only the leader of a coalesced request takes an API slot
+        try:
+            with self.scheduler.slot(priority, self.session_id):
+                return self._routed_call(kind, system, prompt, parts, timeout)
+        except Overloaded as e:
+            return {"error": str(e), "overloaded": True}
+
+    def _routed_call(self, kind: str, system: str, prompt, parts=None, timeout=None):
+        """
+        Try the router's primary model, failing over to its secondary.
+        """
+        modality, size = request_profile(prompt, parts)
+        if parts:
+            try:
+                # Media becomes inline bytes or one Files API upload, shared by both attempts
+                parts = resolve_parts(parts, self.router.uploader)
+            except Exception as e:
+                return {"error": f"Media upload failed: {e}"}
+        data = {"error": "No model available"}
+        for name in self.router.choose(modality, size):
+            started = time.time()
+            data = self._generate(self.router.model(name, system), kind, system, prompt, parts, timeout)
+            self.router.record(name, time.time() - started, "error" not in data)
+            if "error" not in data:
+                break
+        return data
 
-    def _call_gemini(self, prompt, parts=None):
+    def _generate(self, model, kind, system, prompt, parts=None, timeout=None):
         try:
-            if parts:
-                response = self.model.generate_content(parts)
-            else:
-                response = self.model.generate_content(prompt)
-            
+            options = {"timeout": timeout} if timeout else None
+            request = prompt
+            if not self.router.system_instructions:
+                # Pre-built model without our instructions: send them inline
+                request = f"{system}\n\n{prompt}"
+                parts = [request] + list(parts[1:]) if parts else None
+            response = model.generate_content(parts or request, request_options=options)
+            PROMPT_STATS.record(kind, system, prompt, getattr(response, "usage_metadata", None))
+
             cleaned = response.text.replace("```json", "").replace("```", "").strip()
             return safe_json_load(cleaned)
         except Exception as e:
             return {"error": str(e)}
 
+    @profiled
     def analyze_text(self, text: str, style="calm"):
         try:
-            flags = rule_based_flags(text)
+            triage = self.preflight.check_text("text", text, style, crisis_response=CRISIS_ANALYSIS)
+            if triage.response is not None:
+                return triage.response
+            text = triage.text
+            # Translation for the rule engine overlaps the LLM call
+            norm_future = _normalize_pool.submit(normalize_text, text)
             context = self.get_context()
-
-            prompt = f"""
-You are a forensic psychologist & deception analyst.
-
-Conversation context:
-{context}
-
-Style:
-{therapist_style_prompt(style)}
-
-Rules:
-- Penalize avoidance & defensiveness
-- All scores must be integers 0–100
-- Return valid JSON only. No markdown. No extra text.
-
-Analyze this text:
-"{text}"
-
-Return JSON:
-{{
-    "emotional_spectrum": {{
-        "joy": 0,
-        "sadness": 0,
-        "anger": 0,
-        "fear": 0,
-        "surprise": 0,
-        "love": 0
-    }},
-    "lie_detection": {{
-        "truthfulness_score": 0,
-        "confidence_score": 0
-    }},
-    "personality_profile": {{
-        "type": "Introvert/Extrovert/Ambivert",
-        "summary": "One sentence insight"
-    }},
-    "hidden_meaning": "What do they ACTUALLY mean? (Be direct, not rude)",
-    "suggested_replies": ["Diplomatic", "Direct", "Professional"],
-    "better_version": "Improved professional rewrite"
-}}
-"""
-            data = self._call_gemini(prompt)
-
-            if "error" in data:
-                return data
+            long_text = estimate_tokens(text) > LONG_TEXT_TOKENS
+
+            data = self._reanalyze_edit(text, context, style, long_text)
+            if data is None:
+                if long_text:
+                    data = self._map_reduce_text(text, context, style)
+                else:
+                    data = self._analyze_text_single(text, context, style)
+                if "error" in data:
+                    return data
+                self.draft = Draft.from_full(style, text, data)
+                INCREMENTAL_STATS.count(full=1)
+
+            norm = norm_future.result()
+            crisis = self.preflight.check_translation(norm, CRISIS_ANALYSIS)
+            if crisis is not None:
+                return crisis
+            flags = rule_based_flags(norm.english)
 
             # Post-processing
             for k in data["emotional_spectrum"]:
@@ -111,107 +196,382 @@ Return JSON:
             data["lie_detection"]["confidence_label"] = explain_score(
                 data["lie_detection"]["confidence_score"]
             )
+            data["language"] = norm.language
 
-            self.remember(text, mood=data["personality_profile"]["type"])
+            self.remember(
+                text,
+                mood=data["personality_profile"]["type"],
+                summary=data.get("hidden_meaning") if long_text else None,
+            )
+            self.preflight.remember(triage, "text", data)
             return data
 
         except Exception as e:
             return {"error": str(e)}
 
-    def analyze_image(self, image_bytes: bytes):
-        try:
-            image_part = {"mime_type": "image/jpeg", "data": image_bytes}
-            prompt = """
-You are an expert behavioral psychologist and facial expression analyst.
-
-Rules:
-- Return valid JSON only
-- No markdown, no explanations
-
-Analyze the micro-expressions in this image.
-
-Return JSON:
-{
-    "primary_emotion": "Dominant emotion",
-    "micro_expressions": "Describe eyes, lips, posture cues",
-    "truthfulness_indicator": {
-        "status": "Likely Truthful / Deceptive / Anxious",
-        "score": 0,
-        "reason": "Why?"
-    },
-    "mental_state_summary": "Psychological summary"
-}
+    def _analyze_text_single(self, text: str, context, style: str):
+        prompt = f"""Conversation context:
+{context}
+
+Analyze this text:
+"{text}"
+"""
+        return self._call_gemini("text", prompt, style=style)
+
+    # -------------------------------------
+    # EDITS (sentence-level re-analysis)
+    # -------------------------------------
+    def _reanalyze_edit(self, text: str, context, style: str, long_text: bool):
+        """
+        When `text` is a small edit of the last analyzed one, score only the
+        new sentences and recompose the rest, while the meaning, replies and
+        rewrite are read again from the new text (long texts: left stale).
+        None means a full pass is due.
+        """
+        edit = self.draft.plan(text, style) if self.draft else None
+        if edit is None:
+            return None
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            readings = None if long_text else pool.submit(self._read_text, text, context, style)
+            scores = self._score_sentences([edit.segments[i].sentence for i in edit.todo]) if edit.todo else []
+            if scores is None:
+                if readings is not None:
+                    readings.cancel()
+                INCREMENTAL_STATS.count(fallbacks=1)
+                return None
+            self.draft, data = self.draft.apply(edit, scores)
+            fresh = readings.result() if readings is not None else {"error": "long text"}
+        if "error" not in fresh:
+            data["hidden_meaning"] = fresh.get("hidden_meaning", "")
+            data["personality_profile"]["summary"] = fresh.get("personality_summary", "")
+            data["suggested_replies"] = fresh.get("suggested_replies", [])
+            data["better_version"] = fresh.get("better_version", "")
+            data["incremental"]["readings"] = "fresh"
+        return data
+
+    def _read_text(self, text: str, context, style: str):
+        prompt = f"""Conversation context:
+{context}
+
+Edited text:
+"{text}"
 """
-            return self._call_gemini(prompt, [prompt, image_part])
+        return self._call_gemini("text_readings", prompt, style=style)
+
+    def _score_sentences(self, sentences: List[str]):
+        lines = "\n".join(f"[{i}] {' '.join(s.split())}" for i, s in enumerate(sentences))
+        data = self._call_gemini("text_sentences", f"Sentences:\n{lines}\n")
+        if "error" in data:
+            return None
+        by_n = {}
+        for i, item in enumerate(data.get("sentences", [])):
+            try:
+                by_n[int(item.get("n", i))] = item
+            except (TypeError, ValueError, AttributeError):
+                continue
+        scores = [by_n.get(i) for i in range(len(sentences))]
+        # A sentence the model skipped would skew the document score
+        if any(s is None or "emotional_spectrum" not in s or "truthfulness_score" not in s for s in scores):
+            return None
+        return scores
+
+    # -------------------------------------
+    # LONG TEXT (map-reduce)
+    # -------------------------------------
+    def _analyze_chunk(self, chunk: str, index: int, total: int):
+        prompt = f"""This is part {index + 1} of {total}.
+
+Analyze this part:
+"{chunk}"
+"""
+        return self._call_gemini("text_chunk", prompt)
+
+    def _map_reduce_text(self, text: str, context, style: str):
+        """
+        Score token-bounded chunks in parallel, fold the scores locally and
+        make one small call to synthesize the overall meaning and replies.
+        """
+        chunks = chunk_text(text)
+        with ThreadPoolExecutor(max_workers=LONG_TEXT_WORKERS) as pool:
+            results = list(pool.map(lambda ic: self._analyze_chunk(ic[1], ic[0], len(chunks)), enumerate(chunks)))
+
+        scored = [(estimate_tokens(c), r) for c, r in zip(chunks, results) if "error" not in r]
+        if not scored:
+            return results[0]
+
+        weight = sum(w for w, _ in scored)
+        spectrum = Counter()
+        confidence = 0
+        for w, r in scored:
+            for k, v in r.get("emotional_spectrum", {}).items():
+                spectrum[k] += clamp(v) * w
+            confidence += clamp(r["lie_detection"]["confidence_score"]) * w
+        # Coverage lowers confidence when some chunks could not be scored
+        coverage = len(scored) / len(chunks)
+        types = Counter(r.get("personality_type", "Ambivert") for _, r in scored)
+        meanings = [r.get("hidden_meaning", "") for _, r in scored]
+
+        data = {
+            "emotional_spectrum": {k: round(v / weight) for k, v in spectrum.items()},
+            "lie_detection": {
+                # One evasive passage is enough to make the whole text suspect
+                "truthfulness_score": min(clamp(r["lie_detection"]["truthfulness_score"]) for _, r in scored),
+                "confidence_score": round(confidence / weight * coverage),
+            },
+            "personality_profile": {"type": types.most_common(1)[0][0], "summary": ""},
+            "hidden_meaning": " ".join(m for m in meanings if m),
+            "suggested_replies": [],
+            "better_version": "",
+            "chunks": {"total": len(chunks), "scored": len(scored)},
+        }
+
+        synthesis = self._synthesize_text(meanings, context, style)
+        if "error" not in synthesis:
+            data["hidden_meaning"] = synthesis.get("hidden_meaning") or data["hidden_meaning"]
+            data["personality_profile"]["summary"] = synthesis.get("personality_summary", "")
+            data["suggested_replies"] = synthesis.get("suggested_replies", [])
+            data["better_version"] = synthesis.get("better_version", "")
+        return data
+
+    def _synthesize_text(self, meanings: List[str], context, style: str):
+        notes = "\n".join(f"- part {i + 1}: {m}" for i, m in enumerate(meanings))
+        prompt = f"""Per-part readings:
+{notes}
+
+Conversation context:
+{context}
+"""
+        return self._call_gemini("text_synthesis", prompt, style=style)
+
+    @profiled
+    def analyze_image(self, image):
+        """
+        `image` is bytes, a binary file object or a MediaPayload.
+        """
+        try:
+            media = as_payload(image, "image/jpeg")
+            triage = self.preflight.check_media("image", media, MIN_IMAGE_BYTES)
+            if triage.response is not None:
+                return triage.response
+
+            cache = get_image_cache()
+            try:
+                phash = image_dhash(media.open())
+            except Exception:
+                phash = None  # undecodable image: let Gemini report it
+
+            if phash is not None:
+                cached = cache.get(phash)
+                if cached:
+                    distance, result = cached
+                    data = {
+                        **result,
+                        "cache": {"hit": True, "distance": distance, "hit_rate": round(cache.hit_rate, 3)},
+                    }
+                    self.preflight.remember(triage, "image", data)
+                    return data
+
+            prompt = "Analyze the micro-expressions in this image."
+            data = self._call_gemini("image", prompt, [prompt, media])
+            if "error" not in data and phash is not None:
+                cache.put(phash, data)
+                data = {**data, "cache": {"hit": False, "distance": None, "hit_rate": round(cache.hit_rate, 3)}}
+            self.preflight.remember(triage, "image", data)
+            return data
         except Exception as e:
             return {"error": f"Visual Scan Failed: {str(e)}"}
 
-    def analyze_audio(self, audio_bytes: bytes):
+    @profiled
+    def analyze_audio(self, audio):
+        """
+        `audio` is bytes, a binary file object or a MediaPayload.
+        """
         try:
-            audio_part = {"mime_type": "audio/wav", "data": audio_bytes}
-            prompt = """
-You are a voice stress analyst and behavioral psychologist.
-
-Rules:
-- Return valid JSON only
-- No markdown, no extra text
-
-Analyze tone, pitch, speed, and pauses.
-
-Return JSON:
-{
-    "emotional_tone": "e.g., Nervous, Aggressive, Calm, Deceptive",
-    "speech_patterns": "Describe pauses, stuttering, speed",
-    "truthfulness_indicator": {
-        "status": "Likely Truthful / High Stress Detected / Deceptive",
-        "score": 0,
-        "reason": "Why?"
-    },
-    "transcript": "Accurate transcription"
-}
-"""
-            return self._call_gemini(prompt, [prompt, audio_part])
+            media = as_payload(audio, "audio/wav")
+            triage = self.preflight.check_media("audio", media, MIN_AUDIO_BYTES)
+            if triage.response is not None:
+                return triage.response
+
+            features = None
+            try:
+                samples, sr = decode_wav(media.open())
+                features = extract_features(samples, sr)
+            except ValueError:
+                pass  # mp3/webm: leave the acoustics to the model
+            if features:
+                silent = self.preflight.check_audio_features(features)
+                if silent is not None:
+                    return silent
+
+            hints = f"\nMeasured acoustics (use as evidence):\n{feature_hints(features)}\n" if features else ""
+            prompt = f"Analyze tone, pitch, speed, and pauses.\n{hints}"
+            data = self._call_gemini("audio", prompt, [prompt, media])
+
+            if "error" in data:
+                # API unavailable: fall back to the local acoustic score
+                return offline_audio_result(features) if features else data
+
+            if features:
+                data["acoustic_features"] = features
+            self.preflight.remember(triage, "audio", data)
+            return data
         except Exception as e:
             return {"error": f"Audio Analysis Failed: {str(e)}"}
 
-    def get_suggestions(self, text: str, style="calm"):
-        if is_crisis(text):
-            return {
-                "mood_analysis": "Crisis",
-                "music": "—",
-                "activity": "Please reach out to someone you trust right now.",
-                "food": "—",
-                "quote": "You matter more than you know.",
-                "support": "If you're in India: AASRA 24/7 Helpline: +91-9820466726",
+    @profiled
+    def analyze_messages(self, messages) -> List[Dict]:
+        """
+        Score a packed batch of chat messages in one call. Returns one entry
+        per message with the same post-processing as analyze_text; messages
+        the model skipped come back as {"unscored": True, "flags": [...]}.
+        """
+        try:
+            lines = "\n".join(f"[{i}] {m.speaker}: {' '.join(m.text.split())}" for i, m in enumerate(messages))
+            prompt = f"Messages:\n{lines}\n"
+            data = self._call_gemini("messages", prompt)
+            if "error" in data:
+                return [data]
+
+            by_n = {}
+            for i, item in enumerate(data.get("messages", [])):
+                try:
+                    by_n[int(item.get("n", i))] = item
+                except (TypeError, ValueError):
+                    by_n[i] = item
+
+            results = []
+            for i, m in enumerate(messages):
+                item = by_n.get(i)
+                flags = rule_based_flags(m.text)
+                if item is None or "truthfulness_score" not in item:
+                    # No made-up neutral score: it would skew the aggregates
+                    results.append({"unscored": True, "flags": flags})
+                    continue
+                spectrum = {k: clamp(v) for k, v in item.get("emotional_spectrum", {}).items()}
+                results.append({
+                    "emotional_spectrum": spectrum,
+                    "truthfulness_score": clamp(item.get("truthfulness_score", 50) - len(flags) * 5),
+                    "flags": flags,
+                })
+            return results
+        except Exception as e:
+            return [{"error": str(e)}]
+
+    def _analyze_frame_batch(self, batch: List[Dict]) -> List[Dict]:
+        stamps = ", ".join(f"{k['t']}s" for k in batch)
+        prompt = f"""These are {len(batch)} keyframes from one interview video, in order, at: {stamps}.
+Analyze the micro-expressions in each frame.
+"""
+        parts = [prompt] + [{"mime_type": "image/jpeg", "data": k["jpeg"]} for k in batch]
+        data = self._call_gemini("video_frames", prompt, parts)
+        if "error" in data:
+            return [{"t": k["t"], "error": data["error"]} for k in batch]
+
+        frames = data.get("frames", [])
+        summary = data.get("summary", "")
+        results = []
+        for k, f in zip(batch, frames):
+            results.append({
+                "t": k["t"],
+                "primary_emotion": f.get("primary_emotion", "Unknown"),
+                "micro_expressions": f.get("micro_expressions", ""),
+                "score": clamp(f.get("truthfulness_score", 0)),
+                "summary": summary,
+            })
+        return results
+
+    def _analyze_video_audio(self, video_path: str):
+        audio_bytes = extract_audio_track(video_path)
+        return self.analyze_audio(audio_bytes) if audio_bytes else None
+
+    @profiled
+    def analyze_video(self, video_path: str):
+        """
+        Keyframe-sampled video analysis: representative frames are scored in
+        parallel batches and aggregated onto a timeline; the audio track
+        (when ffmpeg is available) goes through analyze_audio.
+        """
+        try:
+            triage = self.preflight.check_file("video", video_path)
+            if triage.response is not None:
+                return triage.response
+
+            selection = select_keyframes(video_path)
+            keyframes = selection["keyframes"]
+            if not keyframes:
+                return {"error": "No frames could be decoded from this video."}
+
+            batches = [keyframes[i:i + VIDEO_BATCH_SIZE] for i in range(0, len(keyframes), VIDEO_BATCH_SIZE)]
+            with ThreadPoolExecutor(max_workers=VIDEO_WORKERS + 1) as pool:
+                audio_future = pool.submit(self._analyze_video_audio, video_path)
+                batch_results = list(pool.map(self._analyze_frame_batch, batches))
+                audio_result = audio_future.result()
+
+            timeline = [f for batch in batch_results for f in batch if "error" not in f]
+            if not timeline:
+                return {"error": batch_results[0][0]["error"]}
+
+            emotions = Counter(f["primary_emotion"] for f in timeline)
+            avg = clamp(round(sum(f["score"] for f in timeline) / len(timeline)))
+            lowest = min(timeline, key=lambda f: f["score"])
+            summaries = list(dict.fromkeys(f["summary"] for f in timeline if f["summary"]))
+
+            if avg >= 60:
+                status = "Likely Truthful"
+            elif lowest["score"] < 40:
+                status = "Deceptive"
+            else:
+                status = "Anxious"
+
+            data = {
+                "primary_emotion": emotions.most_common(1)[0][0],
+                "micro_expressions": f"Strongest cue at {lowest['t']}s: {lowest['micro_expressions']}",
+                "truthfulness_indicator": {
+                    "status": status,
+                    "score": avg,
+                    "reason": f"Average over {len(timeline)} keyframes; lowest {lowest['score']} at {lowest['t']}s.",
+                },
+                "mental_state_summary": " ".join(summaries),
+                "timeline": [{k: f[k] for k in ("t", "primary_emotion", "score")} for f in timeline],
+                "frames_scanned": selection["frames_scanned"],
+                "audio_result": audio_result if audio_result and "error" not in audio_result else None,
             }
+            self.preflight.remember(triage, "video", data)
+            return data
+        except Exception as e:
+            return {"error": f"Video Scan Failed: {str(e)}"}
 
-        context = self.get_context()
-        prompt = f"""
-You are a psychological therapist & AI companion.
+    @profiled
+    def get_suggestions(self, text: str, style="calm"):
+        triage = self.preflight.check_text("suggestions", text, style, crisis_response=CRISIS_SUGGESTIONS)
+        if triage.response is not None:
+            return triage.response
+        text = triage.text
+        norm_future = _normalize_pool.submit(normalize_text, text)
 
-Conversation context:
+        context = self.get_context()
+        prompt = f"""Conversation context:
 {context}
 
-Style:
-{therapist_style_prompt(style)}
-
-Rules:
-- Return valid JSON only
-- No markdown, no explanations
-
 User said:
 "{text}"
-
-Return JSON:
-{{
-    "mood_analysis": "One-word mood",
-    "music": "Song Name - Artist (matches mood)",
-    "activity": "A 2-minute action they can do now",
-    "food": "Comfort food recommendation",
-    "quote": "Short powerful motivation"
-}}
 """
-        data = self._call_gemini(prompt)
+        data = self._call_gemini("suggestions", prompt, style=style)
+        crisis = self.preflight.check_translation(norm_future.result(), CRISIS_SUGGESTIONS)
+        if crisis is not None:
+            return crisis
         # Avoid double remembering if called after analyze_text, but safe to update mood
         # self.remember(text, mood=data.get("mood_analysis", "Unknown"))
+        self.preflight.remember(triage, "suggestions", data)
         return data
+
+
+def create_reader(api_key: str = None) -> MindReader:
+    """
+    MindReader for this process. MINDREADER_BACKEND=stub swaps Gemini for
+    the offline StubModel (load tests, demos without a key).
+    """
+    if os.getenv("MINDREADER_BACKEND", "gemini").lower() == "stub":
+        from .stub import StubModel, STUB_TIERS
+        return MindReader(router=ModelRouter(STUB_TIERS, StubModel))
+    return MindReader(api_key or get_api_key())
@@ -0,0 +1,283 @@
+import io
+import wave
+import numpy as np
+from typing import Any, Dict, List, Tuple
+
+# =========================================
+# CONSTANTS
+# =========================================
+VAD_FRAME_MS = 30
+VAD_HANGOVER_MS = 300   # keep speech "open" across short gaps
+VAD_MIN_SPEECH_MS = 250
+VAD_FLOOR_PERCENTILE = 10
+VAD_THRESHOLD_DB = 9.0  # speech must sit this far above the noise floor
+
+
+# =========================================
+# WAV I/O
+# =========================================
+def decode_wav(audio) -> Tuple[np.ndarray, int]:
+    """
+    Decode PCM WAV (bytes or a binary file object) into mono float32
+    samples in [-1, 1].
+    Raises ValueError for anything that is not plain PCM WAV (mp3, webm...).
+    """
+    try:
+        with wave.open(audio if hasattr(audio, "read") else io.BytesIO(audio), "rb") as wf:
+            sr = wf.getframerate()
+            channels = wf.getnchannels()
+            width = wf.getsampwidth()
+            raw = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Unsupported audio format: {e}")
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported sample width: {width * 8} bit")
+
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels]
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, sr
+
+
+# =========================================
+# FRAMING
+# =========================================
+def frame_signal(samples: np.ndarray, frame_len: int, hop: int) -> np.ndarray:
+    """
+    Strided (copy-free) view of overlapping frames, shape (n_frames, frame_len).
+    """
+    if len(samples) < frame_len:
+        return np.empty((0, frame_len), dtype=samples.dtype)
+    n = 1 + (len(samples) - frame_len) // hop
+    return np.lib.stride_tricks.as_strided(
+        samples,
+        shape=(n, frame_len),
+        strides=(samples.strides[0] * hop, samples.strides[0]),
+        writeable=False,
+    )
+
+
+def frame_energy_db(samples: np.ndarray, sr: int, frame_ms: int = VAD_FRAME_MS) -> np.ndarray:
+    frame_len = max(1, int(sr * frame_ms / 1000))
+    frames = frame_signal(samples, frame_len, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+# =========================================
+# VOICE ACTIVITY DETECTION
+# =========================================
+def speech_mask(samples: np.ndarray, sr: int, frame_ms: int = VAD_FRAME_MS,
+                hangover: bool = True) -> np.ndarray:
+    """
+    Per-frame boolean speech mask from an adaptive energy threshold
+    with (optional) hangover smoothing.
+    """
+    db = frame_energy_db(samples, sr, frame_ms)
+    if not len(db):
+        return np.zeros(0, dtype=bool)
+
+    floor = np.percentile(db, VAD_FLOOR_PERCENTILE)
+    # Cap at 3 dB under the peak so clips with no silence still register as speech
+    threshold = min(floor + VAD_THRESHOLD_DB, db.max() - 3.0)
+    mask = db > max(threshold, -50.0)
+    if not hangover:
+        return mask
+
+    # Hangover: a frame stays speech if any speech frame happened within the window
+    hang = max(1, VAD_HANGOVER_MS // frame_ms)
+    if mask.any():
+        idx = np.where(mask, np.arange(len(mask)), -hang - 1)
+        last_speech = np.maximum.accumulate(idx)
+        mask = (np.arange(len(mask)) - last_speech) <= hang
+    return mask
+
+
+def detect_speech(samples: np.ndarray, sr: int, frame_ms: int = VAD_FRAME_MS) -> List[Tuple[int, int]]:
+    """
+    Return speech segments as (start_sample, end_sample) pairs.
+    """
+    mask = speech_mask(samples, sr, frame_ms)
+    if not mask.any():
+        return []
+
+    frame_len = max(1, int(sr * frame_ms / 1000))
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    min_frames = max(1, VAD_MIN_SPEECH_MS // frame_ms)
+    return [
+        (int(s * frame_len), int(min(e * frame_len, len(samples))))
+        for s, e in zip(starts, ends)
+        if e - s >= min_frames
+    ]
+
+
+# =========================================
+# ACOUSTIC FEATURES
+# =========================================
+PITCH_FMIN = 75
+PITCH_FMAX = 400
+PITCH_FRAME_MS = 40
+PITCH_HOP_MS = 10
+PITCH_SR = 8000  # pitch is tracked on a decimated copy; F0 < 400 Hz needs nothing more
+VOICING_THRESHOLD = 0.45  # normalized autocorrelation peak
+MIN_PAUSE_MS = 200
+
+
+def pitch_track(samples: np.ndarray, sr: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Frame-wise F0 (Hz, 0 when unvoiced) and peak amplitude via
+    FFT autocorrelation over all frames at once.
+    """
+    factor = sr // PITCH_SR
+    if factor > 1:
+        # Box-filter decimation keeps this a handful of vector ops
+        usable = len(samples) - len(samples) % factor
+        samples = samples[:usable].reshape(-1, factor).mean(axis=1)
+        sr = sr // factor
+
+    frame_len = int(sr * PITCH_FRAME_MS / 1000)
+    hop = int(sr * PITCH_HOP_MS / 1000)
+    frames = frame_signal(samples, frame_len, hop)
+    if not len(frames):
+        return np.zeros(0), np.zeros(0)
+
+    peaks = np.abs(frames).max(axis=1)
+    x = (frames - frames.mean(axis=1, keepdims=True)) * np.hanning(frame_len)
+    spec = np.fft.rfft(x.astype(np.float32), n=2 * frame_len, axis=1)
+    ac = np.fft.irfft(np.abs(spec) ** 2, axis=1)[:, :frame_len]
+    ac /= ac[:, :1] + 1e-10
+
+    lo = max(1, int(sr / PITCH_FMAX))
+    hi = min(frame_len - 1, int(sr / PITCH_FMIN))
+    lag = lo + np.argmax(ac[:, lo:hi], axis=1)
+    strength = ac[np.arange(len(ac)), lag]
+
+    voiced = (strength > VOICING_THRESHOLD) & (peaks > 0.01)
+    f0 = np.where(voiced, sr / lag, 0.0)
+    return f0, peaks
+
+
+def _relative_perturbation(values: np.ndarray, voiced: np.ndarray) -> float:
+    """
+    Mean absolute difference between consecutive voiced frames relative to
+    the mean (the frame-level analogue of local jitter / shimmer).
+    """
+    pairs = voiced[1:] & voiced[:-1]
+    if not pairs.any():
+        return 0.0
+    diffs = np.abs(np.diff(values))[pairs]
+    return float(diffs.mean() / (values[voiced].mean() + 1e-10))
+
+
+def extract_features(samples: np.ndarray, sr: int) -> Dict[str, Any]:
+    """
+    Local acoustic stress markers: pitch, jitter, shimmer, energy,
+    pauses and speech rate.
+    """
+    duration = len(samples) / sr if sr else 0.0
+    f0, peaks = pitch_track(samples, sr)
+    voiced = f0 > 0
+    periods = np.where(voiced, 1.0 / np.maximum(f0, 1e-10), 0.0)
+
+    segments = detect_speech(samples, sr)
+    speech_s = sum(e - s for s, e in segments) / sr
+    gaps = [(b[0] - a[1]) / sr for a, b in zip(segments, segments[1:])]
+    pauses = [g for g in gaps if g * 1000 >= MIN_PAUSE_MS]
+
+    db = frame_energy_db(samples, sr)
+    mask = speech_mask(samples, sr, hangover=False)
+    speech_db = db[mask] if mask.any() else db
+
+    # Syllable nuclei ~ local maxima of the smoothed speech envelope
+    syllables = 0
+    if mask.any():
+        env = np.convolve(db, np.ones(3) / 3, mode="same")
+        is_peak = (env[1:-1] > env[:-2]) & (env[1:-1] >= env[2:]) & mask[1:-1]
+        is_peak &= env[1:-1] > np.median(speech_db) - 3
+        syllables = int(is_peak.sum())
+
+    return {
+        "duration_s": round(duration, 2),
+        "pitch_mean_hz": round(float(f0[voiced].mean()), 1) if voiced.any() else 0.0,
+        "pitch_std_hz": round(float(f0[voiced].std()), 1) if voiced.any() else 0.0,
+        "jitter_pct": round(100 * _relative_perturbation(periods, voiced), 2),
+        "shimmer_pct": round(100 * _relative_perturbation(peaks, voiced), 2),
+        "energy_db": round(float(speech_db.mean()), 1) if len(speech_db) else -100.0,
+        "energy_std_db": round(float(speech_db.std()), 1) if len(speech_db) else 0.0,
+        "pause_ratio": round(1 - speech_s / duration, 2) if duration else 0.0,
+        "pause_count": len(pauses),
+        "speech_rate_sps": round(syllables / speech_s, 2) if speech_s else 0.0,
+    }
+
+
+def feature_hints(features: Dict[str, Any]) -> str:
+    """
+    Compact one-line summary of the measured features for the prompt.
+    """
+    f = features
+    return (
+        f"pitch {f['pitch_mean_hz']}Hz (sd {f['pitch_std_hz']}), "
+        f"jitter {f['jitter_pct']}%, shimmer {f['shimmer_pct']}%, "
+        f"energy {f['energy_db']}dB (sd {f['energy_std_db']}), "
+        f"pause ratio {f['pause_ratio']} ({f['pause_count']} pauses), "
+        f"speech rate {f['speech_rate_sps']} syll/s over {f['duration_s']}s"
+    )
+
+
+def stress_score(features: Dict[str, Any]) -> Tuple[int, List[str]]:
+    """
+    Offline voice integrity score (100 = calm/steady) and the markers that lowered it.
+    """
+    f = features
+    penalties = [
+        ("Unstable pitch (high jitter)", f["jitter_pct"], 2.0, 6.0, 20),
+        ("Unsteady amplitude (high shimmer)", f["shimmer_pct"], 12.0, 30.0, 15),
+        ("Wide pitch swings", f["pitch_std_hz"], 35.0, 80.0, 15),
+        ("Frequent hesitation pauses", f["pause_ratio"], 0.35, 0.7, 20),
+        ("Rushed speech", f["speech_rate_sps"], 6.0, 9.0, 15),
+        ("Halting speech", -f["speech_rate_sps"], -2.5, -1.0, 15),
+    ]
+    score = 100.0
+    reasons = []
+    for label, value, start, full, weight in penalties:
+        frac = min(1.0, max(0.0, (value - start) / (full - start)))
+        if frac > 0:
+            score -= weight * frac
+            reasons.append(label)
+    return max(0, min(100, int(round(score)))), reasons
+
+
+def offline_audio_result(features: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    analyze_audio-shaped result built from acoustic features alone.
+    """
+    score, reasons = stress_score(features)
+    if score >= 70:
+        status, tone = "Likely Truthful", "Calm"
+    elif score >= 45:
+        status, tone = "High Stress Detected", "Tense"
+    else:
+        status, tone = "High Stress Detected", "Nervous"
+
+    return {
+        "emotional_tone": tone,
+        "speech_patterns": feature_hints(features),
+        "truthfulness_indicator": {
+            "status": status,
+            "score": score,
+            "reason": ("Acoustic markers: " + ", ".join(reasons)) if reasons else "Steady pitch, amplitude and pacing.",
+        },
+        "transcript": "(Transcript unavailable offline)",
+        "acoustic_features": features,
+        "offline": True,
+    }
@@ -0,0 +1,354 @@
+import csv
+import io
+import json
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, TextIO
+
+from .records import EMOTIONS
+from .utils import clamp, estimate_tokens
+
+# =========================================
+# CONSTANTS
+# =========================================
+BATCH_TOKENS = 1500        # input budget per scoring call
+BATCH_MAX_MESSAGES = 40
+MAX_MESSAGE_CHARS = 1000   # longer messages are truncated for scoring
+CHAT_WORKERS = 3
+MAX_CHAT_WINDOWS = 400     # timeline points kept; past this, windows are widened
+DAY_MINUTES = 24 * 60
+READ_CHUNK = 64 * 1024
+
+SPEAKER_KEYS = ("speaker", "author", "user", "username", "user_name", "name", "sender", "from")
+TEXT_KEYS = ("text", "message", "content", "body")
+TIME_KEYS = ("timestamp", "ts", "time", "datetime", "date")
+
+# "12/31/23, 9:15 PM - Name: text"  or  "[31/12/2023, 21:15:02] Name: text"
+WHATSAPP_LINE = re.compile(
+    r"^\[?(?P<date>\d{1,4}[./-]\d{1,2}[./-]\d{1,4}),?\s+(?P<time>\d{1,2}:\d{2}(?::\d{2})?\s*(?:[AaPp]\.?[Mm]\.?)?)\]?"
+    r"\s*(?:-\s*)?(?P<speaker>[^:]{1,60}):\s(?P<text>.*)$"
+)
+
+
+class ChatMessage(NamedTuple):
+    id: int
+    speaker: str
+    text: str
+    ts: Optional[datetime]
+
+
+# =========================================
+# TIMESTAMPS
+# =========================================
+def parse_timestamp(value) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    try:
+        num = float(value)  # Slack "1700000000.000123" / unix seconds
+        return datetime.fromtimestamp(num, tz=timezone.utc)
+    except (TypeError, ValueError):
+        pass
+    text = str(value).strip().replace("Z", "+00:00")
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%m/%d/%y %I:%M %p", "%d/%m/%y %H:%M",
+                "%m/%d/%Y %I:%M %p", "%d.%m.%y %H:%M", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+# =========================================
+# PARSERS (streaming)
+# =========================================
+def iter_whatsapp(fp: TextIO) -> Iterator[ChatMessage]:
+    current = None
+    idx = 0
+    for line in fp:
+        line = line.rstrip("\n").lstrip("﻿")
+        m = WHATSAPP_LINE.match(line)
+        if m:
+            if current:
+                yield current
+            ts = parse_timestamp(f"{m['date']} {m['time'].replace('.', '').upper()}")
+            current = ChatMessage(idx, m["speaker"].strip(), m["text"], ts)
+            idx += 1
+        elif current and line:
+            current = current._replace(text=current.text + "\n" + line)  # multi-line message
+    if current:
+        yield current
+
+
+def iter_json_array(fp: TextIO, key: str = None) -> Iterator[Any]:
+    """
+    Yield the items of a JSON array one at a time without loading the file.
+    With `key`, the array is the value of the first `"key":` found.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+
+    def fill() -> bool:
+        nonlocal buf, pos
+        chunk = fp.read(READ_CHUNK)
+        if not chunk:
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    # Seek to the opening bracket
+    marker = f'"{key}"' if key else None
+    while True:
+        if marker:
+            at = buf.find(marker, pos)
+            if at >= 0:
+                pos = at + len(marker)
+                marker = None
+                continue
+        else:
+            at = buf.find("[", pos)
+            if at >= 0:
+                pos = at + 1
+                break
+        pos = max(pos, len(buf) - 64)
+        if not fill():
+            return
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            if not fill():
+                return
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if not fill():
+                return  # truncated file: stop at the last complete item
+            continue
+        pos = end
+        yield item
+
+
+def _pick(row: Dict[str, Any], keys) -> Any:
+    for k in keys:
+        if row.get(k) not in (None, ""):
+            return row[k]
+    return None
+
+
+def _speaker(item: Dict[str, Any]) -> str:
+    author = item.get("author") or item.get("user_profile")
+    if isinstance(author, dict):
+        return author.get("nickname") or author.get("real_name") or author.get("name") or "Unknown"
+    return str(_pick(item, SPEAKER_KEYS) or "Unknown")
+
+
+def iter_json_messages(fp: TextIO) -> Iterator[ChatMessage]:
+    """
+    Slack export (top-level array) or Discord export ({"messages": [...]}).
+    """
+    head = fp.read(1)
+    while head and head.isspace():
+        head = fp.read(1)
+    rest = _Prepend(head, fp)
+    items = iter_json_array(rest) if head == "[" else iter_json_array(rest, key="messages")
+
+    idx = 0
+    for item in items:
+        if not isinstance(item, dict) or item.get("subtype") in ("channel_join", "bot_message"):
+            continue
+        text = _pick(item, TEXT_KEYS)
+        if not text:
+            continue
+        yield ChatMessage(idx, _speaker(item), str(text), parse_timestamp(_pick(item, TIME_KEYS)))
+        idx += 1
+
+
+def iter_csv(fp: TextIO) -> Iterator[ChatMessage]:
+    idx = 0
+    for row in csv.DictReader(fp):
+        row = {(k or "").strip().lower(): v for k, v in row.items()}
+        text = _pick(row, TEXT_KEYS)
+        if not text:
+            continue
+        yield ChatMessage(idx, str(_pick(row, SPEAKER_KEYS) or "Unknown"), text, parse_timestamp(_pick(row, TIME_KEYS)))
+        idx += 1
+
+
+class _Prepend:
+    """
+    File-like wrapper that puts back characters already read for sniffing.
+    """
+
+    def __init__(self, prefix: str, fp: TextIO):
+        self.prefix = prefix
+        self.fp = fp
+
+    def read(self, n: int = -1) -> str:
+        head, self.prefix = self.prefix, ""
+        return head + self.fp.read(n if n < 0 else max(0, n - len(head)))
+
+
+def iter_messages(fileobj, filename: str) -> Iterator[ChatMessage]:
+    """
+    Stream messages from a chat export, picking the parser from the extension.
+    Accepts binary (e.g. a Streamlit upload) or text file objects.
+    """
+    fp = fileobj if isinstance(fileobj, io.TextIOBase) else io.TextIOWrapper(fileobj, encoding="utf-8", errors="replace")
+    ext = filename.rsplit(".", 1)[-1].lower()
+    if ext == "json":
+        return iter_json_messages(fp)
+    if ext == "csv":
+        return iter_csv(fp)
+    return iter_whatsapp(fp)
+
+
+# =========================================
+# PACKING
+# =========================================
+def pack_messages(messages, max_tokens: int = BATCH_TOKENS,
+                  max_messages: int = BATCH_MAX_MESSAGES) -> Iterator[List[ChatMessage]]:
+    """
+    Group messages into token-bounded batches (one LLM call each).
+    """
+    batch: List[ChatMessage] = []
+    used = 0
+    for msg in messages:
+        if len(msg.text) > MAX_MESSAGE_CHARS:
+            msg = msg._replace(text=msg.text[:MAX_MESSAGE_CHARS] + "…")
+        cost = estimate_tokens(msg.speaker) + estimate_tokens(msg.text) + 4
+        if batch and (used + cost > max_tokens or len(batch) >= max_messages):
+            yield batch
+            batch, used = [], 0
+        batch.append(msg)
+        used += cost
+    if batch:
+        yield batch
+
+
+# =========================================
+# AGGREGATION
+# =========================================
+class _Aggregate:
+    __slots__ = ("messages", "emotions", "truth_sum", "truth_min", "flags")
+
+    def __init__(self):
+        self.messages = 0
+        self.emotions = [0] * len(EMOTIONS)
+        self.truth_sum = 0
+        self.truth_min = 100
+        self.flags = 0
+
+    def add(self, scored: Dict[str, Any]):
+        self.messages += 1
+        for i, e in enumerate(EMOTIONS):
+            self.emotions[i] += scored["emotional_spectrum"].get(e, 0)
+        self.truth_sum += scored["truthfulness_score"]
+        self.truth_min = min(self.truth_min, scored["truthfulness_score"])
+        self.flags += len(scored["flags"])
+
+    def merge(self, other: "_Aggregate"):
+        self.messages += other.messages
+        self.emotions = [a + b for a, b in zip(self.emotions, other.emotions)]
+        self.truth_sum += other.truth_sum
+        self.truth_min = min(self.truth_min, other.truth_min)
+        self.flags += other.flags
+
+    def summary(self) -> Dict[str, Any]:
+        n = max(1, self.messages)
+        spectrum = {e: clamp(round(v / n)) for e, v in zip(EMOTIONS, self.emotions)}
+        return {
+            "messages": self.messages,
+            "emotional_spectrum": spectrum,
+            "dominant_emotion": max(spectrum, key=spectrum.get),
+            "avg_truthfulness": clamp(round(self.truth_sum / n)),
+            "min_truthfulness": self.truth_min if self.messages else 0,
+            "flags": self.flags,
+        }
+
+
+def window_start(ts: Optional[datetime], window_minutes: int) -> Optional[str]:
+    if ts is None:
+        return None
+    minutes = ts.hour * 60 + ts.minute
+    floored = minutes - minutes % window_minutes
+    return ts.replace(hour=floored // 60, minute=floored % 60, second=0, microsecond=0).isoformat()
+
+
+def widen_windows(windows: Dict[str, _Aggregate], window_minutes: int,
+                  max_windows: int = MAX_CHAT_WINDOWS):
+    """
+    Double the window size (up to a day) until the timeline fits in
+    `max_windows` points, so long exports stay within the session budget.
+    Returns the merged windows and the window size actually used.
+    """
+    while len(windows) > max_windows and window_minutes < DAY_MINUTES:
+        window_minutes = min(DAY_MINUTES, window_minutes * 2)
+        merged: Dict[str, _Aggregate] = {}
+        for key, agg in windows.items():
+            merged.setdefault(window_start(datetime.fromisoformat(key), window_minutes), _Aggregate()).merge(agg)
+        windows = merged
+    return windows, window_minutes
+
+
+def analyze_chat(reader, messages, window_minutes: int = 60, workers: int = CHAT_WORKERS) -> Dict[str, Any]:
+    """
+    Score a message stream in packed batches (at most `workers` calls in flight)
+    and fold the results into per-speaker and per-time-window aggregates.
+    """
+    started = time.time()
+    speakers: Dict[str, _Aggregate] = {}
+    windows: Dict[str, _Aggregate] = {}
+    total = batches = failed = 0
+
+    def fold(batch, scored):
+        nonlocal total, failed
+        if scored and "error" in scored[0]:
+            failed += len(batch)
+            return
+        for msg, s in zip(batch, scored):
+            if s.get("unscored"):
+                failed += 1
+                continue
+            total += 1
+            speakers.setdefault(msg.speaker, _Aggregate()).add(s)
+            key = window_start(msg.ts, window_minutes)
+            if key:
+                windows.setdefault(key, _Aggregate()).add(s)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        inflight = deque()
+        for batch in pack_messages(messages):
+            batches += 1
+            inflight.append((batch, pool.submit(reader.analyze_messages, batch)))
+            if len(inflight) >= workers * 2:  # bound memory on huge exports
+                b, fut = inflight.popleft()
+                fold(b, fut.result())
+        while inflight:
+            b, fut = inflight.popleft()
+            fold(b, fut.result())
+
+    windows, used_minutes = widen_windows(windows, window_minutes)
+    elapsed = time.time() - started
+    return {
+        "messages": total,
+        "failed_messages": failed,
+        "batches": batches,
+        "elapsed_s": round(elapsed, 2),
+        "messages_per_s": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "speakers": {name: agg.summary() for name, agg in sorted(speakers.items(), key=lambda kv: -kv[1].messages)},
+        "windows": [{"start": k, **windows[k].summary()} for k in sorted(windows)],
+        "window_minutes": used_minutes,
+    }
@@ -0,0 +1,57 @@
+import re
+from typing import List
+
+from .language import split_sentences
+from .utils import estimate_tokens
+
+# =========================================
+# CONSTANTS
+# =========================================
+CHUNK_TOKENS = 800
+PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+
+
+def _split_long(sentence: str, max_tokens: int) -> List[str]:
+    """
+    Hard-wrap a single over-long sentence on word boundaries.
+    """
+    words = sentence.split()
+    pieces, current = [], []
+    for w in words:
+        if current and estimate_tokens(" ".join(current + [w])) > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+        current.append(w)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """
+    Split text into chunks of at most ~max_tokens, cutting only between
+    sentences and preferring paragraph ends once a chunk is half full.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+
+    def flush():
+        nonlocal current, used
+        if current:
+            chunks.append(" ".join(current))
+        current, used = [], 0
+
+    for paragraph in PARAGRAPH_SPLIT.split(text):
+        for sentence in split_sentences(paragraph):
+            pieces = _split_long(sentence, max_tokens) if estimate_tokens(sentence) > max_tokens else [sentence]
+            for piece in pieces:
+                cost = estimate_tokens(piece)
+                if current and used + cost > max_tokens:
+                    flush()
+                current.append(piece)
+                used += cost
+        if used >= max_tokens // 2:
+            flush()
+    flush()
+    return chunks
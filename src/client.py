@@ -0,0 +1,86 @@
+import uuid
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, List
+
+from .media import as_payload
+
+# =========================================
+# CONSTANTS
+# =========================================
+CLIENT_TIMEOUT = 120  # seconds; media analysis can be slow
+POOL_SIZE = 8
+
+
+class RemoteMindReader:
+    """
+    Thin HTTP client for server.py with the same analyze_* interface as
+    MindReader, so app.py can use either. Keeps one pooled keep-alive
+    session and a stable X-Session-Id for server-side memory.
+    """
+
+    def __init__(self, base_url: str, session_id: str = None, timeout: int = CLIENT_TIMEOUT,
+                 http: requests.Session = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session_id = session_id or uuid.uuid4().hex
+        if http is None:
+            http = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            http.mount("http://", adapter)
+            http.mount("https://", adapter)
+        self.http = http
+
+    def fork(self, priority: str = None, session_id: str = None) -> "RemoteMindReader":
+        """
+        New session on the same connection pool. Priorities are assigned by the server.
+        """
+        return RemoteMindReader(self.base_url, session_id, self.timeout, http=self.http)
+
+    def cache_size(self) -> int:
+        return 0  # drafts and preflight memos live on the server
+
+    def drop_caches(self):
+        pass
+
+    def _post(self, path: str, **kwargs) -> Dict[str, Any]:
+        try:
+            r = self.http.post(
+                f"{self.base_url}{path}", timeout=self.timeout, headers={"X-Session-Id": self.session_id}, **kwargs
+            )
+            data = r.json()
+            if r.status_code != 200:
+                error = {"error": data.get("detail") or data.get("error") or f"HTTP {r.status_code}"}
+                if data.get("overloaded"):
+                    # Scheduler rejection: a busy server, not a failure
+                    error["overloaded"] = True
+                    retry = r.headers.get("Retry-After", "")
+                    error["retry_after"] = int(retry) if retry.isdigit() else None
+                return error
+            return data
+        except (requests.RequestException, ValueError) as e:
+            return {"error": f"Mind Reader API unreachable: {e}"}
+
+    def analyze_text(self, text: str, style="calm"):
+        return self._post("/v1/text", json={"text": text, "style": style})
+
+    def get_suggestions(self, text: str, style="calm"):
+        return self._post("/v1/suggestions", json={"text": text, "style": style})
+
+    def analyze_messages(self, messages) -> List[Dict[str, Any]]:
+        lines = [{"speaker": m.speaker, "text": m.text} for m in messages]
+        data = self._post("/v1/messages", json={"messages": lines})
+        return [data] if isinstance(data, dict) else data
+
+    def analyze_image(self, image):
+        media = as_payload(image, "image/jpeg")
+        return self._post("/v1/image", files={"file": ("image", media.open(), media.mime_type)})
+
+    def analyze_audio(self, audio):
+        media = as_payload(audio, "audio/wav")
+        return self._post("/v1/audio", files={"file": ("audio", media.open(), media.mime_type)})
+
+    def analyze_video(self, video_path: str):
+        # requests streams file objects from disk instead of loading them
+        with open(video_path, "rb") as f:
+            return self._post("/v1/video", files={"file": (video_path.rsplit("/", 1)[-1], f)})
@@ -0,0 +1,262 @@
+import html
+import os
+import time
+from collections import deque
+
+import requests
+import streamlit as st
+
+from .analyzer import create_reader
+from .client import RemoteMindReader
+from .provisional import within_budget
+from .records import MAX_HISTORY, HistoryEntry, Record, enforce_budget, to_record
+
+# =========================================
+# CONSTANTS
+# =========================================
+MAX_FILE_MB = 25  # large media is uploaded in chunks, not inlined
+API_COOLDOWN = 10  # seconds
+LOTTIE_TIMEOUT_S = 2
+LOTTIE_TTL_S = 3600
+PENDING_POLL_S = 1.0  # how often a provisional result checks for the full one
+BRAIN_LOTTIE = "https://lottie.host/6a56c3b8-9366-4f48-a006-218456f338d4/S8y8l9kS4w.json"
+WAVE_LOTTIE = "https://lottie.host/9f6d4822-4418-4a5d-a006-218456f338d4/S8y8l9kS4w.json"
+PROVISIONAL_SOURCES = {
+    "cache": "an earlier reading of the same input",
+    "similar": "a similar earlier photo",
+    "local": "on-device signals",
+    "crisis": "the safety check",
+    "none": "nothing yet",
+}
+
+
+# =========================================
+# ENGINE & ASSETS
+# =========================================
+@st.cache_resource(show_spinner="🧠 Starting Mind Reader...")
+def get_engine():
+    """
+    One client per process (models, routing, caches or the API connection
+    pool), shared by every page and session. Sessions get forks of it.
+    """
+    # Thin client when a headless API server is configured
+    api_url = os.getenv("MINDREADER_API_URL")
+    return RemoteMindReader(api_url) if api_url else create_reader()
+
+
+@st.cache_data(ttl=LOTTIE_TTL_S, show_spinner=False)
+def load_lottie(url):
+    try:
+        r = requests.get(url, timeout=LOTTIE_TIMEOUT_S)
+        return r.json() if r.status_code == 200 else None
+    except (requests.RequestException, ValueError):
+        return None
+
+
+# =========================================
+# SESSION STATE
+# =========================================
+def init_session():
+    """
+    Session defaults shared by every page; pages see each other's results.
+    """
+    defaults = {
+        "history": lambda: deque(maxlen=MAX_HISTORY),
+        "text_result": lambda: None,
+        "mood_result": lambda: None,
+        "image_result": lambda: None,
+        "audio_result": lambda: None,
+        "chat_result": lambda: None,
+        "last_call": lambda: 0,
+        "recording": lambda: None,
+        "upload_gen": lambda: 0,     # bumped to drop uploaded/recorded media
+        "result_order": list,        # least recently stored first
+        "pending": dict,             # flow -> (future, arg) of calls past their latency budget
+        "late_errors": dict,         # result key -> error of a call that finished after its budget
+    }
+    for key, make in defaults.items():
+        if key not in st.session_state:
+            st.session_state[key] = make()
+
+    if "mind_reader" not in st.session_state:
+        try:
+            # Own memory and drafts, shared models and connections
+            st.session_state["mind_reader"] = get_engine().fork()
+        except Exception as e:
+            st.error(f"Failed to initialize Mind Reader: {e}")
+            st.stop()
+
+
+def can_call_api():
+    return time.time() - st.session_state["last_call"] > API_COOLDOWN
+
+
+def mark_api_call():
+    st.session_state["last_call"] = time.time()
+
+
+def store_result(key, kind, res):
+    """
+    Keep a result as a compact record and evict old state past the session budget.
+    """
+    st.session_state[key] = to_record(kind, res)
+    order = st.session_state["result_order"]
+    if key in order:
+        order.remove(key)
+    order.append(key)
+    # Never the key just stored: a result over budget on its own is still shown.
+    # The reader's draft and preflight memo count too and go first.
+    reader = st.session_state.get("mind_reader")
+    enforce_budget(st.session_state, ["recording", "history", *order[:-1]], caches=[reader] if reader else ())
+
+
+def get_result(key):
+    rec = st.session_state[key]
+    return rec.to_dict() if isinstance(rec, Record) else rec
+
+
+def release_media():
+    """
+    Drop uploaded and recorded media once analyzed: new widget keys make
+    Streamlit forget the old files, and the recorder's copies are removed.
+    """
+    gen = st.session_state["upload_gen"]
+    st.session_state.pop(f"recorder_{gen}_output", None)
+    st.session_state["recording"] = None
+    st.session_state["upload_gen"] = gen + 1
+
+
+def file_size_ok(uploaded_file, max_mb=MAX_FILE_MB):
+    if uploaded_file.size > max_mb * 1024 * 1024:
+        st.error(f"❌ File too large. Max allowed size is {max_mb} MB.")
+        return False
+    return True
+
+
+def safe(text):
+    return html.escape(str(text))
+
+
+# =========================================
+# FLOWS & PENDING RESULTS
+# =========================================
+def accept_text(text, res):
+    """
+    Store a text + mood pair; returns the error message when either failed.
+    """
+    res_text, res_mood = res
+    if "error" in res_text or "error" in res_mood:
+        return res_text.get("error") or res_mood.get("error") or "Unknown Error"
+    if not res_text.get("provisional"):
+        st.session_state["history"].append(
+            HistoryEntry(text[:50], res_text["lie_detection"]["truthfulness_score"], res_mood["mood_analysis"])
+        )
+    store_result("text_result", "text", res_text)
+    store_result("mood_result", "mood", res_mood)
+    return None
+
+
+def accept_media(key, kind, res):
+    if "error" in res:
+        return res["error"]
+    store_result(key, kind, res)
+    return None
+
+
+def run_flow(flow, key, job, provisional, arg=None):
+    """
+    Run `job` within the flow's latency budget. Past it, a provisional
+    result is shown now and the full one is swapped in by poll_pending.
+    """
+    res, future = within_budget(flow, job, provisional)
+    st.session_state["late_errors"].pop(key, None)
+    if future is None:
+        st.session_state["pending"].pop(flow, None)
+    else:
+        st.session_state["pending"][flow] = (future, arg)
+    return res
+
+
+def finish_flow(flow, future, arg):
+    key = f"{flow}_result"
+    try:
+        res = future.result()
+        err = accept_text(arg, res) if flow == "text" else accept_media(key, flow, res)
+    except Exception as e:
+        err = str(e)
+    if err:
+        st.session_state["late_errors"][key] = err
+
+
+@st.fragment(run_every=PENDING_POLL_S)
+def poll_pending():
+    """
+    Swap provisional results for the full ones as their calls finish.
+    """
+    pending = st.session_state["pending"]
+    done = [flow for flow, (future, _) in pending.items() if future.done()]
+    for flow in done:
+        finish_flow(flow, *pending.pop(flow))
+    if done:
+        st.rerun()
+
+
+# =========================================
+# WIDGETS
+# =========================================
+def show_error(res):
+    """
+    A failed call's message. Calls shed by the request scheduler only warn.
+    """
+    if res.get("overloaded"):
+        st.warning(f"⏳ {res['error']}")
+    else:
+        st.error(res["error"])
+
+
+def show_provisional(key, r):
+    err = st.session_state["late_errors"].get(key)
+    if err:
+        st.warning(f"⚠️ The full reading failed ({safe(err)}) — showing the provisional result.")
+    elif r.get("provisional"):
+        st.info(
+            f"⏳ Provisional — built from {PROVISIONAL_SOURCES.get(r['provisional'], 'local signals')}. "
+            "The full reading will replace it when it arrives."
+        )
+
+
+def audio_result_card(ar):
+    """
+    Voice stress verdict, tone, transcript and acoustic metrics.
+    """
+    status = ar["truthfulness_indicator"]["status"]
+    color = "#27ae60" if "Truth" in status else "#c0392b"
+
+    st.markdown(
+        f"""
+    <div class='glass-card glow-effect' style='border-left: 5px solid {color};'>
+        <h3 style='margin:0; color:{color} !important;'>{safe(status)}</h3>
+        <p>Voice Integrity: <strong>{ar['truthfulness_indicator']['score']}/100</strong></p>
+        <p><em>"{safe(ar['truthfulness_indicator']['reason'])}"</em></p>
+    </div>
+
+    <div class='glass-card'>
+        <h4>🗣️ Tone Analysis</h4>
+        <p><strong>Tone:</strong> {safe(ar['emotional_tone'])}</p>
+        <p><strong>Patterns:</strong> {safe(ar['speech_patterns'])}</p>
+        <hr>
+        <p><strong>Transcript:</strong> <em>"{safe(ar['transcript'])}"</em></p>
+    </div>
+    """,
+        unsafe_allow_html=True,
+    )
+
+    feats = ar.get("acoustic_features")
+    if feats:
+        if ar.get("offline"):
+            st.warning("⚠️ AI unavailable — score is based on local acoustic analysis only.")
+        f1, f2, f3, f4 = st.columns(4)
+        f1.metric("Pitch", f"{feats['pitch_mean_hz']} Hz", f"±{feats['pitch_std_hz']}", delta_color="off")
+        f2.metric("Jitter / Shimmer", f"{feats['jitter_pct']}% / {feats['shimmer_pct']}%")
+        f3.metric("Pauses", feats["pause_count"], f"{int(feats['pause_ratio'] * 100)}% silent", delta_color="off")
+        f4.metric("Speech Rate", f"{feats['speech_rate_sps']} syl/s")
@@ -0,0 +1,248 @@
+import copy
+import io
+import json
+import os
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# =========================================
+# CONSTANTS
+# =========================================
+HASH_SIZE = 8  # 64-bit hashes
+IMAGE_CACHE_PATH = os.path.join(".cache", "image_scans.jsonl")
+# Max differing bits (of 64) to count as the same photo
+IMAGE_CACHE_DISTANCE = int(os.getenv("MINDREADER_IMAGE_CACHE_DISTANCE", "6"))
+IMAGE_CACHE_MAX_ENTRIES = int(os.getenv("MINDREADER_IMAGE_CACHE_MAX_ENTRIES", "10000"))
+IMAGE_CACHE_TTL_S = int(os.getenv("MINDREADER_IMAGE_CACHE_TTL_S", str(30 * 24 * 3600)))
+EVICT_SHARE = 0.1  # evicting frees this much room at once, so the tree is rebuilt rarely
+
+
+# =========================================
+# PERCEPTUAL HASHES
+# =========================================
+def _block_resize(gray: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """
+    Area-average a 2D array down to (rows, cols) without any imaging library.
+    """
+    h, w = gray.shape
+    ys = np.linspace(0, h, rows + 1).astype(int)
+    xs = np.linspace(0, w, cols + 1).astype(int)
+    sums = np.add.reduceat(np.add.reduceat(gray.astype(np.float64), ys[:-1], axis=0), xs[:-1], axis=1)
+    counts = np.outer(np.maximum(np.diff(ys), 1), np.maximum(np.diff(xs), 1))
+    return sums / counts
+
+
+def dhash(gray: np.ndarray, size: int = HASH_SIZE) -> int:
+    """
+    Difference hash of a grayscale image: one bit per horizontal gradient sign.
+    Robust to rescaling, recompression and small brightness shifts.
+    """
+    small = _block_resize(gray, size, size + 1)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def image_dhash(image) -> int:
+    """
+    dHash of an encoded image (JPEG/PNG...), as bytes or a binary file object.
+    """
+    from PIL import Image  # ships with streamlit
+
+    with Image.open(image if hasattr(image, "read") else io.BytesIO(image)) as img:
+        img.draft("L", (64, 64))  # JPEG: decode at reduced scale
+        gray = np.asarray(img.convert("L").resize((64, 64), Image.BILINEAR))
+    return dhash(gray)
+
+
+# =========================================
+# BK-TREE INDEX
+# =========================================
+class BKTree:
+    """
+    Metric tree over Hamming distance: a radius search only visits children
+    whose edge distance lies within [d - radius, d + radius].
+    """
+
+    def __init__(self):
+        self.root = None  # [hash, value, {distance: child}]
+        self.size = 0
+
+    def add(self, h: int, value):
+        self.size += 1
+        if self.root is None:
+            self.root = [h, value, {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(node[0], h)
+            if d == 0:
+                node[1] = value
+                self.size -= 1
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [h, value, {}]
+                return
+            node = child
+
+    def search(self, h: int, radius: int) -> List[Tuple[int, Any]]:
+        """
+        All (distance, value) pairs within `radius`, closest first.
+        """
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            d = hamming(node[0], h)
+            if d <= radius:
+                found.append((d, node[1]))
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        found.sort(key=lambda x: x[0])
+        return found
+
+
+# =========================================
+# IMAGE SCAN CACHE
+# =========================================
+class ImageScanCache:
+    """
+    Persistent near-duplicate cache of analyze_image results, keyed by dHash.
+    Entries are appended to a JSONL file and re-indexed into a BK-tree on load.
+    Bounded by `max_entries` (oldest evicted first) and `ttl_s`; evicting
+    rebuilds the tree and rewrites the file with the kept entries only.
+    Results go in and come out as deep copies, so callers can mutate them.
+    """
+
+    def __init__(self, path: str = IMAGE_CACHE_PATH, max_distance: int = IMAGE_CACHE_DISTANCE,
+                 max_entries: int = IMAGE_CACHE_MAX_ENTRIES, ttl_s: float = IMAGE_CACHE_TTL_S):
+        self.path = path
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()  # oldest first
+        self.tree = BKTree()
+        self.lookups = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        lines = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                        h = int(entry["hash"], 16)
+                        self.entries.pop(h, None)
+                        self.entries[h] = (float(entry.get("t", time.time())), entry["result"])
+                    except (ValueError, KeyError, TypeError):
+                        continue  # skip a torn / corrupt line
+        except FileNotFoundError:
+            pass
+        self._evict(self.max_entries)
+        self._rebuild()
+        if lines > len(self.entries):
+            self._compact()
+
+    def _expired(self, stored_at: float) -> bool:
+        return time.time() - stored_at > self.ttl_s
+
+    def _evict(self, keep: int):
+        for h in [h for h, (t, _) in self.entries.items() if self._expired(t)]:
+            del self.entries[h]
+        while len(self.entries) > keep:
+            self.entries.popitem(last=False)
+
+    def _rebuild(self):
+        self.tree = BKTree()
+        for h, entry in self.entries.items():
+            self.tree.add(h, entry)
+
+    def _compact(self):
+        """
+        Rewrite the file with the kept entries. Another worker's appends since
+        our load are dropped: it is a cache, they are scanned again.
+        """
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                for h, (t, result) in self.entries.items():
+                    f.write(json.dumps({"hash": f"{h:016x}", "t": round(t, 3), "result": result}) + "\n")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def _closest(self, h: int, radius: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        for d, (t, result) in self.tree.search(h, radius):
+            if not self._expired(t):
+                return d, copy.deepcopy(result)
+        return None
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def get(self, h: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Closest cached (distance, result) within max_distance, or None.
+        """
+        with self._lock:
+            self.lookups += 1
+            match = self._closest(h, self.max_distance)
+            if match is not None:
+                self.hits += 1
+            return match
+
+    def peek(self, h: int, max_distance: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Closest entry within `max_distance`, without counting as a lookup.
+        """
+        with self._lock:
+            return self._closest(h, max_distance)
+
+    def put(self, h: int, result: Dict[str, Any]):
+        entry = (time.time(), copy.deepcopy(result))
+        with self._lock:
+            self.entries.pop(h, None)
+            self.entries[h] = entry
+            if len(self.entries) > self.max_entries:
+                self._evict(int(self.max_entries * (1 - EVICT_SHARE)))
+                self._rebuild()
+                self._compact()
+                return
+            self.tree.add(h, entry)
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"hash": f"{h:016x}", "t": round(entry[0], 3), "result": entry[1]}) + "\n")
+            except OSError:
+                pass  # read-only deployments still get the in-memory cache
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageScanCache:
+    """
+    Process-wide cache so every session shares hits and hit-rate stats.
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ImageScanCache()
+        return _shared_cache
@@ -0,0 +1,193 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .chunking import PARAGRAPH_SPLIT
+from .language import sentence_key, split_sentences
+from .utils import clamp, estimate_tokens
+
+# =========================================
+# CONSTANTS
+# =========================================
+MAX_CHANGED_SHARE = 0.3   # re-score sentences only while edits cover less of the text than this
+MAX_DRIFT_SHARE = 0.5     # past this share of sentences scored on their own, run a full pass again
+SENTENCE_CACHE_SIZE = 4096
+
+
+class Segment(NamedTuple):
+    key: str
+    sentence: str
+    tokens: int
+
+
+class Contribution(NamedTuple):
+    """
+    A sentence's share of the document scores. Sentences from a full pass
+    carry that pass's document scores; edited ones carry their own.
+    """
+    key: str
+    tokens: int
+    spectrum: Dict[str, int]
+    truthfulness: int
+    confidence: int
+    fresh: bool
+
+
+class Edit(NamedTuple):
+    segments: List[Segment]
+    known: Dict[int, Contribution]   # segment index -> reused contribution
+    todo: List[int]                  # segment indices to score
+
+
+# =========================================
+# STATS
+# =========================================
+class IncrementalStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"full": 0, "incremental": 0, "sentences_rescored": 0, "sentences_reused": 0, "fallbacks": 0}
+
+    def count(self, **deltas: int):
+        with self._lock:
+            for k, v in deltas.items():
+                self.counts[k] += v
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+STATS = IncrementalStats()
+
+
+def incremental_stats() -> Dict[str, int]:
+    return STATS.snapshot()
+
+
+# =========================================
+# SENTENCE CACHE
+# =========================================
+class SentenceCache:
+    """
+    Scores of sentences judged on their own, shared across sessions (no
+    conversation context goes into them). Bounded LRU.
+    """
+
+    def __init__(self, size: int = SENTENCE_CACHE_SIZE):
+        self.size = size
+        self._items: "OrderedDict[str, Contribution]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Contribution]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, contribution: Contribution):
+        with self._lock:
+            self._items[contribution.key] = contribution
+            self._items.move_to_end(contribution.key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+
+SENTENCES = SentenceCache()
+
+
+# =========================================
+# DRAFTS
+# =========================================
+def segment_text(text: str) -> List[Segment]:
+    return [
+        Segment(sentence_key(s), s, max(1, estimate_tokens(s)))
+        for paragraph in PARAGRAPH_SPLIT.split(text)
+        for s in split_sentences(paragraph)
+    ]
+
+
+class Draft:
+    """
+    The last text a session analyzed, as per-sentence contributions plus the
+    raw (pre-flag) result they add up to.
+    """
+
+    __slots__ = ("style", "parts", "result")
+
+    def __init__(self, style: str, parts: List[Contribution], result: Dict[str, Any]):
+        self.style = style
+        self.parts = parts
+        self.result = result
+
+    @classmethod
+    def from_full(cls, style: str, text: str, data: Dict[str, Any]) -> "Draft":
+        """
+        Every sentence inherits the document scores of a full pass.
+        """
+        ld = data["lie_detection"]
+        spectrum = {k: clamp(v) for k, v in data["emotional_spectrum"].items()}
+        parts = [
+            Contribution(s.key, s.tokens, spectrum, clamp(ld["truthfulness_score"]), clamp(ld["confidence_score"]), False)
+            for s in segment_text(text)
+        ]
+        return cls(style, parts, copy.deepcopy(data))
+
+    def plan(self, text: str, style: str) -> Optional[Edit]:
+        """
+        Which sentences need scoring, or None when a full pass is due
+        (other style, large edit, or too much drift since the last one).
+        """
+        if style != self.style:
+            return None
+        segments = segment_text(text)
+        mine = {p.key: p for p in self.parts}
+        known, todo = {}, []
+        for i, s in enumerate(segments):
+            part = mine.get(s.key) or SENTENCES.get(s.key)
+            if part is None:
+                todo.append(i)
+            else:
+                known[i] = part._replace(tokens=s.tokens)
+        total = sum(s.tokens for s in segments)
+        changed = sum(segments[i].tokens for i in todo)
+        fresh = changed + sum(p.tokens for p in known.values() if p.fresh)
+        if not total or changed / total > MAX_CHANGED_SHARE or fresh / total > MAX_DRIFT_SHARE:
+            return None
+        return Edit(segments, known, todo)
+
+    def apply(self, edit: Edit, scores: List[Dict[str, Any]]) -> Tuple["Draft", Dict[str, Any]]:
+        """
+        Fold fresh sentence scores into the reused ones. Returns the new
+        draft and a raw result whose text readings (meaning, replies,
+        rewrite) are blank: they described the old text, so callers fill in
+        fresh ones or leave them marked stale.
+        """
+        parts = dict(edit.known)
+        for i, score in zip(edit.todo, scores):
+            s = edit.segments[i]
+            part = Contribution(
+                s.key, s.tokens,
+                {k: clamp(v) for k, v in score["emotional_spectrum"].items()},
+                clamp(score["truthfulness_score"]),
+                clamp(score.get("confidence_score", 50)),
+                True,
+            )
+            SENTENCES.put(part)
+            parts[i] = part
+        ordered = [parts[i] for i in range(len(edit.segments))]
+
+        weight = sum(p.tokens for p in ordered)
+        data = copy.deepcopy(self.result)
+        data["emotional_spectrum"] = {
+            k: round(sum(p.spectrum.get(k, 0) * p.tokens for p in ordered) / weight)
+            for k in self.result["emotional_spectrum"]
+        }
+        data["lie_detection"]["truthfulness_score"] = round(sum(p.truthfulness * p.tokens for p in ordered) / weight)
+        data["lie_detection"]["confidence_score"] = round(sum(p.confidence * p.tokens for p in ordered) / weight)
+        data.update(hidden_meaning="", suggested_replies=[], better_version="")
+        data["personality_profile"]["summary"] = ""
+        data["incremental"] = {"rescored": len(edit.todo), "sentences": len(ordered), "readings": "stale"}
+        STATS.count(incremental=1, sentences_rescored=len(edit.todo), sentences_reused=len(edit.known))
+        return Draft(self.style, ordered, data), copy.deepcopy(data)
@@ -0,0 +1,228 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# =========================================
+# CONSTANTS
+# =========================================
+TRANSLATION_CACHE_PATH = os.path.join(".cache", "translations.sqlite3")
+TRANSLATE_MAX_CHARS = 4500  # per request, under Google Translate's 5000 limit
+MIN_LATIN_HITS = 2          # stopword hits needed before overriding English
+# deep-translator sets no HTTP timeout; past this the original text is used
+TRANSLATE_TIMEOUT_S = float(os.getenv("MINDREADER_TRANSLATE_TIMEOUT_S", "3"))
+TRANSLATE_WORKERS = 2
+
+# Unicode script blocks -> language. First match with most characters wins.
+SCRIPTS = [
+    ("hi", 0x0900, 0x097F),   # Devanagari (Hindi, Marathi)
+    ("bn", 0x0980, 0x09FF),
+    ("pa", 0x0A00, 0x0A7F),   # Gurmukhi
+    ("gu", 0x0A80, 0x0AFF),
+    ("ta", 0x0B80, 0x0BFF),
+    ("te", 0x0C00, 0x0C7F),
+    ("kn", 0x0C80, 0x0CFF),
+    ("ml", 0x0D00, 0x0D7F),
+    ("ar", 0x0600, 0x06FF),
+    ("ru", 0x0400, 0x04FF),
+    ("ja", 0x3040, 0x30FF),   # Hiragana + Katakana
+    ("zh", 0x4E00, 0x9FFF),
+    ("ko", 0xAC00, 0xD7AF),
+]
+
+# Very common function words per Latin-script language (no one-letter words:
+# English "a", "o", "e" would read as Portuguese)
+STOPWORDS = {
+    "en": {"the", "and", "is", "are", "you", "i", "to", "of", "it", "that", "not", "me", "my", "was", "this"},
+    "hi-Latn": {"hai", "hain", "nahi", "nahin", "kya", "mujhe", "main", "mein", "tum", "aap", "ka", "ki", "ke",
+                "ho", "bhi", "yaar", "kuch", "acha", "accha", "bahut", "kar", "raha", "rahi", "tha", "toh", "se"},
+    "es": {"el", "la", "que", "de", "y", "no", "es", "por", "para", "con", "pero", "muy", "estoy", "lo"},
+    "fr": {"le", "la", "les", "et", "est", "je", "pas", "que", "de", "une", "un", "suis", "mais", "tres"},
+    "de": {"der", "die", "und", "ist", "nicht", "ich", "das", "zu", "mit", "ein", "bin", "aber", "sehr"},
+    "pt": {"que", "de", "não", "nao", "eu", "um", "uma", "estou", "mas", "muito", "com", "você", "voce", "isso"},
+    "id": {"saya", "tidak", "yang", "dan", "ini", "itu", "aku", "kamu", "ada", "dengan", "sudah"},
+}
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?।॥。！？])\s+|\n+")
+WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+class NormalizedText(NamedTuple):
+    language: str
+    english: str        # text for the English rule engine / crisis check
+    sentences: List[str]
+
+
+# =========================================
+# LANGUAGE ID
+# =========================================
+def detect_language(text: str) -> Tuple[str, float]:
+    """
+    Script ranges first, then Latin stopword profiles. Returns (code, confidence).
+    """
+    counts: Dict[str, int] = {}
+    letters = 0
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        letters += 1
+        cp = ord(ch)
+        if cp < 0x0250:
+            continue
+        for lang, lo, hi in SCRIPTS:
+            if lo <= cp <= hi:
+                counts[lang] = counts.get(lang, 0) + 1
+                break
+    if not letters:
+        return "en", 0.0
+
+    if counts:
+        lang, n = max(counts.items(), key=lambda kv: kv[1])
+        if n / letters >= 0.3:
+            return lang, round(n / letters, 2)
+
+    words = [w.lower() for w in WORD.findall(text)]
+    if not words:
+        return "en", 0.0
+    scores = {lang: sum(w in sw for w in words) for lang, sw in STOPWORDS.items()}
+    best = max(scores, key=scores.get)
+    if best != "en" and scores[best] >= MIN_LATIN_HITS and scores[best] > scores["en"]:
+        return best, round(scores[best] / len(words), 2)
+    return "en", round(scores["en"] / len(words), 2) if scores["en"] else 0.5
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_SPLIT.split(text) if s and s.strip()]
+
+
+# =========================================
+# TRANSLATION CACHE
+# =========================================
+def sentence_key(sentence: str) -> str:
+    return hashlib.sha1(" ".join(sentence.lower().split()).encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """
+    Persistent sentence -> English cache (SQLite, keyed by sentence hash).
+    Lookups are batched into one query per text.
+    """
+
+    def __init__(self, path: str = TRANSLATION_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, english TEXT NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        if not keys:
+            return {}
+        marks = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT key, english FROM translations WHERE key IN ({marks})", keys).fetchall()
+        return dict(rows)
+
+    def put_many(self, items: Dict[str, str]):
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?)", list(items.items()))
+            self._conn.commit()
+
+
+_translate_pool = ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS, thread_name_prefix="mindreader-translate")
+
+
+def translate_batch(sentences: List[str], timeout: float = TRANSLATE_TIMEOUT_S) -> List[Optional[str]]:
+    """
+    Machine-translate to English, packing sentences into as few requests as
+    possible. None marks a sentence that could not be translated (offline,
+    error, or past `timeout` seconds in total); an unchanged sentence is a
+    real answer.
+    """
+    try:
+        from deep_translator import GoogleTranslator
+        translator = GoogleTranslator(source="auto", target="en")
+    except Exception:
+        return [None] * len(sentences)
+
+    deadline = time.monotonic() + timeout
+    out: List[Optional[str]] = []
+    batch: List[str] = []
+
+    def translate(batch):
+        joined = translator.translate("\n".join(batch)) or ""
+        lines = joined.split("\n")
+        if len(lines) != len(batch):
+            lines = translator.translate_batch(batch)
+        return lines
+
+    def flush():
+        if not batch:
+            return
+        try:
+            # A stalled request is abandoned to the pool, not waited on
+            lines = _translate_pool.submit(translate, list(batch)).result(max(0.0, deadline - time.monotonic()))
+            out.extend((lines[i] or None) if i < len(lines) else None for i in range(len(batch)))
+        except Exception:  # includes the timeout
+            out.extend([None] * len(batch))
+        batch.clear()
+
+    size = 0
+    for s in sentences:
+        if batch and size + len(s) + 1 > TRANSLATE_MAX_CHARS:
+            flush()
+            size = 0
+        batch.append(s)
+        size += len(s) + 1
+    flush()
+    return out
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_translation_cache() -> TranslationCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranslationCache()
+        return _cache
+
+
+# =========================================
+# PIPELINE
+# =========================================
+def normalize_text(text: str) -> NormalizedText:
+    """
+    Detect the language and produce an English rendering for the local rule
+    engine. Every sentence is translated at most once, ever.
+    """
+    lang, _ = detect_language(text)
+    sentences = split_sentences(text)
+    if lang == "en":
+        return NormalizedText(lang, text, sentences)
+
+    cache = get_translation_cache()
+    keys = [sentence_key(s) for s in sentences]
+    known = cache.get_many(list(set(keys)))
+
+    missing = {}
+    for k, s in zip(keys, sentences):
+        if k not in known and k not in missing:
+            missing[k] = s
+    if missing:
+        translated = translate_batch(list(missing.values()))
+        # Identity translations (names, misdetected English) are cached too
+        fresh = {k: t for k, t in zip(missing, translated) if t is not None}
+        cache.put_many(fresh)
+        known.update(fresh)
+
+    english = " ".join(known.get(k, s) for k, s in zip(keys, sentences))
+    return NormalizedText(lang, english, sentences)
@@ -0,0 +1,179 @@
+import hashlib
+import io
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+# =========================================
+# CONSTANTS
+# =========================================
+INLINE_MAX_BYTES = 4 * 1024 * 1024    # larger payloads go through the Files API
+SPOOL_MAX_BYTES = 8 * 1024 * 1024     # spooled uploads move to disk past this
+READ_CHUNK = 1024 * 1024
+UPLOAD_TTL_S = 47 * 3600              # Gemini keeps uploaded files for 48 h
+UPLOAD_POLL_S = 1.0
+UPLOAD_READY_TIMEOUT_S = 120
+
+
+class MediaTooLarge(ValueError):
+    pass
+
+
+class MediaPayload:
+    """
+    One held copy of a media file: caller-owned bytes, an in-memory upload
+    (BytesIO, e.g. a Streamlit UploadedFile), a seekable file (the server's
+    spooled upload) or, for non-seekable streams, our own spooled temp file.
+    The SHA-256 is computed once, in the same pass that reads the data.
+    `mime_type` and `size_bytes` mirror the Files API handle so the router
+    and preflight treat both alike.
+    """
+
+    __slots__ = ("mime_type", "size_bytes", "sha256", "_data", "_file", "_owned")
+
+    def __init__(self, mime_type: str, size_bytes: int, sha256: str,
+                 data: Optional[bytes] = None, file: Optional[BinaryIO] = None, owned: bool = False):
+        self.mime_type = mime_type
+        self.size_bytes = size_bytes
+        self.sha256 = sha256
+        self._data = data
+        self._file = file
+        self._owned = owned  # our spool, not the caller's file
+
+    @classmethod
+    def from_bytes(cls, data: bytes, mime_type: str) -> "MediaPayload":
+        data = bytes(data) if not isinstance(data, bytes) else data
+        return cls(mime_type, len(data), hashlib.sha256(data).hexdigest(), data=data)
+
+    @classmethod
+    def from_file(cls, fileobj: BinaryIO, mime_type: str, max_bytes: int = None) -> "MediaPayload":
+        """
+        Wrap an upload in place when it is in memory or seekable (hashing it in
+        one read pass); only non-seekable streams are copied, into a spool.
+        """
+        if isinstance(fileobj, io.BytesIO):
+            with fileobj.getbuffer() as view:  # released before returning
+                size = view.nbytes
+                _check_size(size, max_bytes)
+                digest = hashlib.sha256(view).hexdigest()
+            return cls(mime_type, size, digest, file=fileobj)
+
+        seekable = getattr(fileobj, "seekable", lambda: False)()
+        if seekable:
+            fileobj.seek(0)
+        spool = None if seekable else tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        h = hashlib.sha256()
+        size = 0
+        buf = bytearray(READ_CHUNK)
+        view = memoryview(buf)
+        try:
+            while True:
+                n = fileobj.readinto(view) if hasattr(fileobj, "readinto") else _read_into(fileobj, view)
+                if not n:
+                    break
+                size += n
+                _check_size(size, max_bytes)
+                h.update(view[:n])
+                if spool is not None:
+                    spool.write(view[:n])
+        except Exception:
+            if spool is not None:
+                spool.close()
+            raise
+        finally:
+            view.release()
+        if spool is None:
+            return cls(mime_type, size, h.hexdigest(), file=fileobj)
+        return cls(mime_type, size, h.hexdigest(), file=spool, owned=True)
+
+    def open(self) -> BinaryIO:
+        """
+        Readable binary stream positioned at the start (no copy).
+        """
+        if self._file is None:
+            return io.BytesIO(self._data)  # shares the immutable bytes buffer
+        self._file.seek(0)
+        return self._file
+
+    def read(self) -> bytes:
+        """
+        The bytes, for inline request parts. With an uploader, `part()` only
+        calls this for payloads up to INLINE_MAX_BYTES.
+        """
+        if self._file is None:
+            return self._data
+        if isinstance(self._file, io.BytesIO):
+            return self._file.getvalue()
+        return self.open().read()
+
+    def part(self, uploader=None) -> Union[Dict[str, Any], Any]:
+        """
+        Request part for generate_content: inline bytes for small payloads,
+        an uploaded file handle for large ones when an uploader is available.
+        """
+        if uploader is not None and self.size_bytes > INLINE_MAX_BYTES:
+            return uploader(self)
+        return {"mime_type": self.mime_type, "data": self.read()}
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+
+
+def _check_size(size: int, max_bytes: Optional[int]):
+    if max_bytes is not None and size > max_bytes:
+        raise MediaTooLarge(f"Upload too large. Max {max_bytes // (1024 * 1024)} MB.")
+
+
+def _read_into(fileobj, view: memoryview) -> int:
+    chunk = fileobj.read(len(view))
+    view[:len(chunk)] = chunk
+    return len(chunk)
+
+
+def as_payload(media, mime_type: str) -> MediaPayload:
+    if isinstance(media, MediaPayload):
+        return media
+    if hasattr(media, "read"):
+        return MediaPayload.from_file(media, getattr(media, "type", None) or mime_type)
+    return MediaPayload.from_bytes(media, mime_type)
+
+
+def resolve_parts(parts, uploader=None):
+    return [p.part(uploader) if isinstance(p, MediaPayload) else p for p in parts]
+
+
+# =========================================
+# FILES API UPLOADS
+# =========================================
+_uploads: Dict[str, tuple] = {}
+_uploads_lock = threading.Lock()
+
+
+def genai_upload(payload: MediaPayload):
+    """
+    Chunked (resumable) upload through the Gemini Files API, reused for
+    identical content until it expires server-side.
+    """
+    import google.generativeai as genai
+
+    now = time.time()
+    with _uploads_lock:
+        cached = _uploads.get(payload.sha256)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    handle = genai.upload_file(payload.open(), mime_type=payload.mime_type, display_name=payload.sha256[:16])
+    deadline = now + UPLOAD_READY_TIMEOUT_S
+    while getattr(handle.state, "name", "ACTIVE") == "PROCESSING" and time.time() < deadline:
+        time.sleep(UPLOAD_POLL_S)
+        handle = genai.get_file(handle.name)
+    if getattr(handle.state, "name", "ACTIVE") == "FAILED":
+        raise RuntimeError("Gemini could not process the uploaded file.")
+
+    with _uploads_lock:
+        _uploads[payload.sha256] = (handle, now + UPLOAD_TTL_S)
+        for key in [k for k, (_, exp) in _uploads.items() if exp <= now]:
+            del _uploads[key]
+    return handle
@@ -0,0 +1,225 @@
+import copy
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Dict, NamedTuple, Optional
+
+from .language import NormalizedText
+from .records import Record, to_record
+from .utils import is_crisis, explain_score
+
+# =========================================
+# CONSTANTS
+# =========================================
+MIN_TEXT_LETTERS = 3       # "ok", "k", "??", "👍" are not worth a call
+MIN_IMAGE_BYTES = 64       # smaller than any real JPEG/PNG
+MIN_AUDIO_BYTES = 45       # a WAV header alone is 44
+MIN_AUDIO_S = 0.3
+SILENCE_DB = -50.0         # VAD floor: below this nothing was said
+MAX_PAUSE_RATIO = 0.98
+VIDEO_SAMPLE_BYTES = 64 * 1024
+
+INVISIBLE = re.compile(r"[\u200b-\u200f\u2060\ufeff\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+SPACES = re.compile(r"[ \t\u00a0\u3000]+")
+BLANK_LINES = re.compile(r"\n\s*\n\s*\n+")
+LETTER = re.compile(r"[^\W\d_]", re.UNICODE)
+WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+SUPPORT_LINE = "If you're in India: AASRA 24/7 Helpline: +91-9820466726"
+
+CRISIS_SUGGESTIONS = {
+    "mood_analysis": "Crisis",
+    "music": "—",
+    "activity": "Please reach out to someone you trust right now.",
+    "food": "—",
+    "quote": "You matter more than you know.",
+    "support": SUPPORT_LINE,
+}
+
+CRISIS_ANALYSIS = {
+    "emotional_spectrum": {"joy": 0, "sadness": 90, "anger": 0, "fear": 70, "surprise": 0, "love": 0},
+    "lie_detection": {
+        "truthfulness_score": 100,
+        "confidence_score": 0,
+        "flags": ["Crisis language detected"],
+        "confidence_label": explain_score(0),
+    },
+    "personality_profile": {"type": "Unknown", "summary": "Not assessed: the message may describe a crisis."},
+    "hidden_meaning": f"This may be a crisis. Please reach out to someone you trust right now. {SUPPORT_LINE}",
+    "suggested_replies": [
+        "I'm really glad you told me. I'm here with you.",
+        "Can we call someone together right now?",
+        "You don't have to go through this alone.",
+    ],
+    "better_version": "",
+}
+
+
+class Triage(NamedTuple):
+    key: str                           # duplicate-check key for this input
+    text: Optional[str] = None         # cleaned text to send on
+    response: Optional[Dict[str, Any]] = None  # set when no LLM call is needed
+
+
+# =========================================
+# STATS
+# =========================================
+class PreflightStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.reasons: Dict[str, int] = {}
+
+    def count(self, reason: Optional[str], new: bool = True):
+        with self._lock:
+            self.checked += new
+            if reason:
+                self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            short = sum(self.reasons.values())
+            return {
+                "checked": self.checked,
+                "short_circuited": short,
+                "passed": self.checked - short,
+                "reasons": dict(self.reasons),
+            }
+
+
+STATS = PreflightStats()
+
+
+def preflight_stats() -> Dict[str, Any]:
+    return STATS.snapshot()
+
+
+# =========================================
+# HELPERS
+# =========================================
+def clean_text(text: str) -> str:
+    """
+    Drop invisible/control characters and collapse runs of spaces and blank
+    lines (paragraph breaks are kept for chunking).
+    """
+    text = INVISIBLE.sub("", text or "").replace("\r\n", "\n").replace("\r", "\n")
+    text = SPACES.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return BLANK_LINES.sub("\n\n", text).strip()
+
+
+def content_key(kind: str, *parts) -> str:
+    h = hashlib.sha1(kind.encode())
+    for p in parts:
+        h.update(b"\0")
+        h.update(p if isinstance(p, (bytes, bytearray, memoryview)) else str(p).encode("utf-8"))
+    return h.hexdigest()
+
+
+def short_circuit(reason: str, response: Dict[str, Any], new: bool = True) -> Dict[str, Any]:
+    STATS.count(reason, new)
+    return {**copy.deepcopy(response), "short_circuit": reason}
+
+
+# =========================================
+# PREFLIGHT
+# =========================================
+class Preflight:
+    """
+    Local checks run before any network I/O. Keeps the last result per
+    request kind so a repeated input is answered from session memory.
+    """
+
+    def __init__(self):
+        self._last: Dict[str, tuple] = {}
+
+    def remember(self, triage: Triage, kind: str, result: Dict[str, Any]):
+        if "error" not in result and "short_circuit" not in result:
+            self._last[kind] = (triage.key, to_record(kind, result))  # compact while idle
+
+    def forget(self):
+        self._last.clear()
+
+    def _duplicate(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        last = self._last.get(kind)
+        if last and last[0] == key:
+            record = last[1]
+            return short_circuit("duplicate", record.to_dict() if isinstance(record, Record) else record)
+        return None
+
+    def check_text(self, kind: str, text: str, style: str = "", crisis_response: Dict = None) -> Triage:
+        cleaned = clean_text(text)
+        # Case/punctuation-insensitive so "Fine." and "fine" count as a repeat
+        key = content_key(kind, style, " ".join(w.lower() for w in WORD.findall(cleaned)))
+
+        if not cleaned:
+            return Triage(key, response=short_circuit("empty", {"error": "Please enter some text first."}))
+        if len(LETTER.findall(cleaned)) < MIN_TEXT_LETTERS:
+            return Triage(key, response=short_circuit(
+                "too_short", {"error": "That's too short to analyze. Write at least a few words."}
+            ))
+        dup = self._duplicate(kind, key)
+        if dup is not None:
+            return Triage(key, response=dup)
+        if crisis_response is not None and is_crisis(cleaned):
+            return Triage(key, response=short_circuit("crisis", crisis_response))
+        STATS.count(None)
+        return Triage(key, text=cleaned)
+
+    def check_translation(self, norm: NormalizedText, crisis_response: Dict) -> Optional[Dict[str, Any]]:
+        """
+        Crisis check on the English rendering of non-English text. Translation
+        can hit the network, so callers run it after check_text, alongside
+        their LLM call. Runs after check_text: not a new request.
+        """
+        if norm.language != "en" and is_crisis(norm.english):
+            return short_circuit("crisis", {**crisis_response, "language": norm.language}, new=False)
+        return None
+
+    def check_media(self, kind: str, media, min_bytes: int) -> Triage:
+        """
+        Checks on a MediaPayload, reusing the hash computed when it was read.
+        """
+        key = content_key(kind, media.sha256)
+        if not media.size_bytes:
+            return Triage(key, response=short_circuit("empty", {"error": "The uploaded file is empty."}))
+        if media.size_bytes < min_bytes:
+            return Triage(key, response=short_circuit("too_short", {"error": "The uploaded file is too small to analyze."}))
+        dup = self._duplicate(kind, key)
+        if dup is not None:
+            return Triage(key, response=dup)
+        STATS.count(None)
+        return Triage(key)
+
+    def check_audio_features(self, features: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Local response for decoded audio with nothing worth sending. Runs
+        after check_media, so it does not count as a new request.
+        """
+        if features["duration_s"] < MIN_AUDIO_S:
+            return short_circuit("too_short", {"error": "The recording is too short to analyze."}, new=False)
+        if features["energy_db"] <= SILENCE_DB or features["pause_ratio"] >= MAX_PAUSE_RATIO:
+            return short_circuit("no_speech", {"error": "No speech detected in the recording."}, new=False)
+        return None
+
+    def check_file(self, kind: str, path: str) -> Triage:
+        """
+        Large media is keyed by size plus head and tail samples, not a full hash.
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return Triage("", response=short_circuit("missing", {"error": "The uploaded file could not be read."}))
+        if size == 0:
+            return Triage("", response=short_circuit("empty", {"error": "The uploaded file is empty."}))
+        with open(path, "rb") as f:
+            head = f.read(VIDEO_SAMPLE_BYTES)
+            f.seek(max(0, size - VIDEO_SAMPLE_BYTES))
+            tail = f.read(VIDEO_SAMPLE_BYTES)
+        key = content_key(kind, size, head, tail)
+        dup = self._duplicate(kind, key)
+        if dup is not None:
+            return Triage(key, response=dup)
+        STATS.count(None)
+        return Triage(key)
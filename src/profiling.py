@@ -0,0 +1,251 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# =========================================
+# CONSTANTS
+# =========================================
+# MINDREADER_PROFILE: "app" (every rerun), "reader" (every MindReader call) or "all".
+# A single rerun can also be profiled with ?profile=1 in the app URL.
+PROFILE_MODE = os.getenv("MINDREADER_PROFILE", "").lower()
+PROFILE_DIR = os.getenv("MINDREADER_PROFILE_DIR", os.path.join(".cache", "profiles"))
+PROFILE_INTERVAL_MS = float(os.getenv("MINDREADER_PROFILE_INTERVAL_MS", "5"))
+TOP_N = 25
+
+# Leaf-frame path fragments -> component, first match wins
+COMPONENTS = [
+    ("network", ("socket.py", "ssl.py", "http/client.py", "urllib3", "requests", "grpc", "httpx", "google/api_core")),
+    ("json", ("json/", "safe_json_load")),
+    ("plotly", ("plotly",)),
+    ("pandas/numpy", ("pandas", "numpy")),
+    ("mindreader", (os.sep + "src" + os.sep,)),
+    ("streamlit", ("streamlit",)),
+    ("threading/wait", ("threading.py", "concurrent/futures", "queue.py")),
+]
+
+# Long-lived pools that run the target thread's calls: always sampled, even
+# when their threads predate the profiler (parked ones are skipped below)
+TRACKED_THREADS = ("mindreader-budget",)
+
+# Parked pool threads: not work, so only sampled on the target thread
+IDLE_LEAVES = {("_worker", "thread.py"), ("wait", "threading.py"), ("get", "queue.py")}
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+
+def profile_enabled(scope: str) -> bool:
+    return PROFILE_MODE in (scope, "all", "1", "true")
+
+
+class SamplingProfiler:
+    """
+    Stdlib sampling profiler: a daemon thread snapshots the target thread's
+    stack (plus any threads started while profiling, e.g. a call's own
+    worker pool, and the shared pools in TRACKED_THREADS) every `interval_ms`. With `root_file`, sampling finishes on
+    its own once that file's frame leaves the stack, which covers Streamlit
+    reruns that end in st.rerun()/st.stop() instead of reaching the bottom.
+    """
+
+    def __init__(self, name: str, interval_ms: float = PROFILE_INTERVAL_MS, root_file: str = None,
+                 directory: str = PROFILE_DIR):
+        self.name = name
+        self.interval = interval_ms / 1000
+        self.root_file = root_file
+        self.directory = directory
+        self.stacks: Counter = Counter()
+        self.paths: Dict[str, str] = {}
+        self._target = threading.get_ident()
+        self._known = set()
+        self._stop = threading.Event()
+        self._done = threading.Event()
+        self._thread = None
+        self.started = self.elapsed = 0.0
+
+    # -------------------------------------
+    # SAMPLING
+    # -------------------------------------
+    def start(self) -> "SamplingProfiler":
+        self._known = {t.ident for t in threading.enumerate() if not t.name.startswith(TRACKED_THREADS)}
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="mindreader-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        me = threading.get_ident()
+        seen_root = False
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == me or (ident != self._target and ident in self._known):
+                    continue
+                stack = self._stack(frame)
+                if ident != self._target and (stack[-1][0], os.path.basename(stack[-1][1])) in IDLE_LEAVES:
+                    continue
+                if ident == self._target and self.root_file:
+                    in_root = any(f[1] == self.root_file for f in stack)
+                    if seen_root and not in_root:
+                        self._stop.set()  # the rerun is over
+                        break
+                    seen_root = seen_root or in_root
+                    if not in_root:
+                        continue
+                self.stacks[stack] += 1
+        self.elapsed = time.perf_counter() - self.started
+        self._write()
+        self._done.set()
+
+    @staticmethod
+    def _stack(frame) -> Tuple[Frame, ...]:
+        out: List[Frame] = []
+        while frame is not None:
+            code = frame.f_code
+            out.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        return tuple(reversed(out))  # root first
+
+    def stop(self) -> Dict[str, str]:
+        """
+        Stop sampling and return the written file paths.
+        """
+        self._stop.set()
+        self._done.wait()
+        return self.paths
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -------------------------------------
+    # OUTPUT
+    # -------------------------------------
+    def _write(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError:
+            return
+        stem = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.name}-{os.getpid()}")
+        for ext, render in (("speedscope.json", self.speedscope), ("folded.txt", self.folded),
+                            ("top.txt", self.summary)):
+            path = f"{stem}.{ext}"
+            try:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(render())
+                self.paths[ext.split(".")[0]] = path
+            except OSError:
+                pass
+
+    def speedscope(self) -> str:
+        """
+        https://www.speedscope.app file (sampled profile, ms weights).
+        """
+        index: Dict[Frame, int] = {}
+        samples, weights = [], []
+        for stack, count in self.stacks.items():
+            samples.append([index.setdefault(f, len(index)) for f in stack])
+            weights.append(round(count * self.interval * 1000, 3))
+        frames = [{"name": fn, "file": file, "line": line} for fn, file, line in index]
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": self.name,
+            "exporter": "mindreader-profiler",
+        })
+
+    def folded(self) -> str:
+        """
+        Brendan Gregg folded stacks (flamegraph.pl / inferno input).
+        """
+        return "\n".join(
+            ";".join(f"{fn} ({os.path.basename(file)}:{line})" for fn, file, line in stack) + f" {count}"
+            for stack, count in self.stacks.most_common()
+        ) + "\n"
+
+    def summary(self, top: int = TOP_N) -> str:
+        total = sum(self.stacks.values())
+        own: Counter = Counter()
+        cumulative: Counter = Counter()
+        components: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for f in set(stack):
+                cumulative[f] += count
+            components[_component(stack)] += count
+
+        def pct(n):
+            return f"{100 * n / total:5.1f}%" if total else "  0.0%"
+
+        def name(f: Frame):
+            return f"{f[0]}  {_short_path(f[1])}:{f[2]}"
+
+        lines = [
+            f"profile: {self.name}",
+            f"wall time: {self.elapsed * 1000:.0f} ms, samples: {total} @ {self.interval * 1000:g} ms",
+            "",
+            "by component (leaf frame):",
+            *(f"  {pct(n)}  {c}" for c, n in components.most_common()),
+            "",
+            f"top {top} self:",
+            *(f"  {pct(n)}  {name(f)}" for f, n in own.most_common(top)),
+            "",
+            f"top {top} cumulative:",
+            *(f"  {pct(n)}  {name(f)}" for f, n in cumulative.most_common(top)),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _component(stack: Tuple[Frame, ...]) -> str:
+    leaf = stack[-1]
+    where = leaf[1].replace(os.sep, "/") + " " + leaf[0]
+    for component, needles in COMPONENTS:
+        if any(n.replace(os.sep, "/") in where for n in needles):
+            return component
+    return "other"
+
+
+def _short_path(path: str) -> str:
+    parts = path.replace(os.sep, "/").split("/")
+    return "/".join(parts[-2:])
+
+
+# =========================================
+# HOOKS
+# =========================================
+def start_rerun_profile(script_file: str, requested: bool = False) -> Optional[SamplingProfiler]:
+    """
+    Profiler for one Streamlit rerun, or None (no cost) when profiling is off.
+    """
+    if not (requested or profile_enabled("app")):
+        return None
+    return SamplingProfiler("rerun", root_file=script_file).start()
+
+
+def profiled(fn):
+    """
+    Profile each call of `fn` when MINDREADER_PROFILE covers the reader.
+    Decided at import time: when off, `fn` is returned untouched.
+    """
+    if not profile_enabled("reader"):
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with SamplingProfiler(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
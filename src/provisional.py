@@ -0,0 +1,225 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .audio import decode_wav, extract_features, offline_audio_result
+from .hashing import IMAGE_CACHE_DISTANCE, image_dhash, get_image_cache
+from .media import as_payload
+from .preflight import CRISIS_ANALYSIS, CRISIS_SUGGESTIONS, WORD, content_key
+from .records import EMOTIONS
+from .utils import clamp, explain_score, is_crisis, rule_based_flags
+
+# =========================================
+# CONSTANTS
+# =========================================
+# Seconds a button press waits for the LLM before showing a provisional result
+FLOW_BUDGETS_S = {
+    "text": float(os.getenv("MINDREADER_BUDGET_TEXT_S", "6")),
+    "image": float(os.getenv("MINDREADER_BUDGET_IMAGE_S", "8")),
+    "audio": float(os.getenv("MINDREADER_BUDGET_AUDIO_S", "8")),
+}
+BUDGET_WORKERS = 8
+RESULT_CACHE_SIZE = 512
+RESULT_CACHE_TTL_S = 3600
+# Looser than the scan cache: a similar photo, not the same one
+PROVISIONAL_IMAGE_DISTANCE = max(12, IMAGE_CACHE_DISTANCE)
+
+EMOTION_LEXICON = {
+    "joy": ("happy", "glad", "great", "excited", "awesome", "fun", "yay", "relieved", "proud", "amazing", "good"),
+    "sadness": ("sad", "tired", "lonely", "miss", "cry", "crying", "down", "hurt", "lost", "empty", "sorry"),
+    "anger": ("angry", "mad", "annoyed", "hate", "furious", "unfair", "stupid", "sick of", "fed up", "whatever"),
+    "fear": ("scared", "afraid", "worried", "nervous", "anxious", "panic", "stress", "stressed", "what if"),
+    "surprise": ("wow", "suddenly", "unexpected", "shocked", "can't believe", "no way", "really?"),
+    "love": ("love", "care", "miss you", "thank you", "grateful", "dear", "sweet", "hug"),
+}
+PENDING_TEXT = "Full reading in progress…"
+
+
+# =========================================
+# RESULT CACHE
+# =========================================
+class ResultCache:
+    """
+    Recent full results by content, shared by every session in the process.
+    Filled by every finished call, including ones that missed their budget.
+    """
+
+    def __init__(self, size: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL_S):
+        self.size = size
+        self.ttl = ttl
+        self._items: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] < time.time():
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._items[key] = (time.time() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+
+RESULTS = ResultCache()
+
+
+def text_key(kind: str, text: str) -> str:
+    return content_key(kind, " ".join(w.lower() for w in WORD.findall(text)))
+
+
+def remember_result(kind: str, text: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Cache a full text/suggestions result for later provisional answers; returns it unchanged.
+    """
+    if isinstance(result, dict) and not ({"error", "short_circuit", "provisional"} & result.keys()):
+        RESULTS.put(text_key(kind, text), result)
+    return result
+
+
+# =========================================
+# LOCAL ESTIMATES
+# =========================================
+def lexicon_emotions(text: str) -> Dict[str, int]:
+    """
+    Six-emotion spectrum from keyword hits, scaled by how many there are.
+    """
+    t = f" {' '.join(WORD.findall(text.lower()))} "
+    hits = {e: sum(t.count(f" {' '.join(WORD.findall(w))} ") for w in words)
+            for e, words in EMOTION_LEXICON.items()}
+    top = max(hits.values())
+    if not top:
+        return {e: 10 for e in EMOTIONS}
+    intensity = min(1.0, sum(hits.values()) / 4)
+    return {e: max(5, clamp(round(100 * hits[e] / top * intensity))) for e in EMOTIONS}
+
+
+def provisional_text(text: str) -> Dict[str, Any]:
+    """
+    analyze_text-shaped result from local signals: crisis check, rule
+    flags and a cached or lexicon emotion estimate.
+    """
+    if is_crisis(text):
+        return {**CRISIS_ANALYSIS, "provisional": "crisis"}
+    flags = rule_based_flags(text)
+    cached = RESULTS.get(text_key("text", text))
+    if cached is not None:
+        spectrum = cached["emotional_spectrum"]
+        truth = cached["lie_detection"]["truthfulness_score"]
+        confidence = cached["lie_detection"]["confidence_score"]
+        source = "cache"
+    else:
+        spectrum = lexicon_emotions(text)
+        # Same flag penalty the full analysis applies
+        truth = clamp(70 - len(flags) * 5)
+        confidence = clamp(60 - len(flags) * 10)
+        source = "local"
+    return {
+        "emotional_spectrum": dict(spectrum),
+        "lie_detection": {
+            "truthfulness_score": truth,
+            "confidence_score": confidence,
+            "flags": flags,
+            "confidence_label": explain_score(confidence),
+        },
+        "personality_profile": {"type": "Unknown", "summary": ""},
+        "hidden_meaning": PENDING_TEXT,
+        "suggested_replies": [],
+        "better_version": "",
+        "provisional": source,
+    }
+
+
+def provisional_suggestions(text: str) -> Dict[str, Any]:
+    if is_crisis(text):
+        return {**CRISIS_SUGGESTIONS, "provisional": "crisis"}
+    cached = RESULTS.get(text_key("suggestions", text))
+    if cached is not None:
+        return {**cached, "provisional": "cache"}
+    spectrum = lexicon_emotions(text)
+    mood = max(spectrum, key=spectrum.get) if max(spectrum.values()) > 10 else "Neutral"
+    return {
+        "mood_analysis": mood.capitalize(),
+        "music": PENDING_TEXT,
+        "activity": "Take three slow breaths while the full reading loads.",
+        "food": PENDING_TEXT,
+        "quote": "One step at a time.",
+        "provisional": "local",
+    }
+
+
+def provisional_image(image) -> Dict[str, Any]:
+    """
+    A similar earlier scan when there is one, else a neutral placeholder.
+    `image` (bytes or MediaPayload) is only read when this runs.
+    """
+    try:
+        near = get_image_cache().peek(image_dhash(as_payload(image, "image/jpeg").read()), PROVISIONAL_IMAGE_DISTANCE)
+    except Exception:
+        near = None
+    if near is not None:
+        return {**near[1], "provisional": "similar"}
+    return {
+        "primary_emotion": "Pending",
+        "micro_expressions": PENDING_TEXT,
+        "truthfulness_indicator": {"status": "Scan in progress", "score": 50, "reason": PENDING_TEXT},
+        "mental_state_summary": PENDING_TEXT,
+        "provisional": "none",
+    }
+
+
+def provisional_audio(audio) -> Dict[str, Any]:
+    """
+    The offline acoustic score for WAV input, else a neutral placeholder.
+    `audio` (bytes or MediaPayload) is only read when this runs.
+    """
+    try:
+        samples, sr = decode_wav(as_payload(audio, "audio/wav").read())
+        res = offline_audio_result(extract_features(samples, sr))
+        res.pop("offline")   # the AI is on its way, not unavailable
+        return {**res, "transcript": PENDING_TEXT, "provisional": "local"}
+    except Exception:
+        return {
+            "emotional_tone": "Pending",
+            "speech_patterns": PENDING_TEXT,
+            "truthfulness_indicator": {"status": "Analysis in progress", "score": 50, "reason": PENDING_TEXT},
+            "transcript": PENDING_TEXT,
+            "provisional": "none",
+        }
+
+
+# =========================================
+# BUDGETS
+# =========================================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=BUDGET_WORKERS, thread_name_prefix="mindreader-budget")
+        return _pool
+
+
+def within_budget(flow: str, fn: Callable[[], Any], provisional: Callable[[], Any],
+                  budget_s: float = None) -> Tuple[Any, Optional[Future]]:
+    """
+    Run `fn` in the background and wait up to the flow's budget. Returns
+    (result, None) in time, else (provisional(), future): the call keeps
+    running, so its result can be collected later and still warms caches.
+    """
+    future = _executor().submit(fn)
+    try:
+        return future.result(timeout=FLOW_BUDGETS_S[flow] if budget_s is None else budget_s), None
+    except FutureTimeout:
+        return provisional(), future
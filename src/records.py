@@ -0,0 +1,359 @@
+import sys
+import time
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+# =========================================
+# CONSTANTS
+# =========================================
+EMOTIONS = ("joy", "sadness", "anger", "fear", "surprise", "love")
+ACOUSTIC_KEYS = ("duration_s", "pitch_mean_hz", "pitch_std_hz", "jitter_pct", "shimmer_pct", "energy_db",
+                 "energy_std_db", "pause_ratio", "pause_count", "speech_rate_sps")
+INTERN_MAX_CHARS = 40   # labels like "Introvert" or "Likely Truthful" are shared across sessions
+SESSION_BUDGET_BYTES = 512 * 1024
+MAX_HISTORY = 50
+
+Path = Tuple[str, ...]
+MISSING = type("Missing", (), {"__slots__": (), "__repr__": lambda self: "MISSING"})()
+
+
+# =========================================
+# VALUE TYPES
+# =========================================
+class EmotionVector:
+    """
+    The six-emotion spectrum as one byte per score (0–100).
+    """
+
+    __slots__ = ("scores",)
+
+    def __init__(self, scores: Iterable[int] = ()):
+        self.scores = array("B", scores or [0] * len(EMOTIONS))
+
+    @classmethod
+    def from_dict(cls, spectrum: Dict[str, Any]) -> "EmotionVector":
+        return cls(int(spectrum[e]) for e in EMOTIONS)
+
+    @staticmethod
+    def fits(spectrum) -> bool:
+        """
+        Exactly the six emotions with integer 0–100 scores (else kept as a dict).
+        """
+        return (isinstance(spectrum, dict) and set(spectrum) == set(EMOTIONS)
+                and all(isinstance(v, int) and 0 <= v <= 100 for v in spectrum.values()))
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(zip(EMOTIONS, self.scores))
+
+
+def _text(value):
+    if isinstance(value, str) and len(value) <= INTERN_MAX_CHARS:
+        return sys.intern(value)
+    return value
+
+
+def _features_in(value):
+    if not isinstance(value, dict) or set(value) != set(ACOUSTIC_KEYS):
+        return value  # unexpected shape: keep as is
+    return array("d", (float(value[k]) for k in ACOUSTIC_KEYS))
+
+
+def _features_out(value):
+    if not isinstance(value, array):
+        return value
+    return {k: int(v) if k == "pause_count" else v for k, v in zip(ACOUSTIC_KEYS, value)}
+
+
+def _rows_in(keys: Tuple[str, ...]):
+    def convert(value):
+        if not isinstance(value, list) or not all(isinstance(v, dict) and set(v) == set(keys) for v in value):
+            return value
+        return tuple(tuple(_text(v[k]) for k in keys) for v in value)
+    return convert
+
+
+def _rows_out(keys: Tuple[str, ...]):
+    def convert(value):
+        if not isinstance(value, tuple):
+            return value
+        return [dict(zip(keys, row)) for row in value]
+    return convert
+
+
+def _record_in(cls):
+    return lambda value: cls.from_dict(value) if isinstance(value, dict) else value
+
+
+def _record_out(value):
+    return value.to_dict() if isinstance(value, Record) else value
+
+
+CONVERTERS = {
+    "value": (lambda v: v, lambda v: v),
+    "text": (_text, lambda v: v),
+    "list": (lambda v: tuple(_text(x) for x in v) if isinstance(v, list) else v,
+             lambda v: list(v) if isinstance(v, tuple) else v),
+    "emotions": (lambda v: EmotionVector.from_dict(v) if EmotionVector.fits(v) else v,
+                 lambda v: v.to_dict() if isinstance(v, EmotionVector) else v),
+    "features": (_features_in, _features_out),
+}
+
+
+# =========================================
+# RECORDS
+# =========================================
+class Record:
+    """
+    Slotted result record. FIELDS maps each slot to its path in the API
+    dict; keys outside FIELDS are kept in `extra` (None when there are
+    none), so `from_dict(d).to_dict() == d`. Missing fields hold MISSING
+    and are left out again on the way back.
+    """
+
+    __slots__ = ("extra",)
+    FIELDS: Tuple[Tuple[str, Path, str], ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        rec = cls.__new__(cls)
+        flat = dict(_flatten(data))
+        for attr, path, kind in cls.FIELDS:
+            value = flat.pop(path, MISSING)
+            setattr(rec, attr, value if value is None or value is MISSING else cls._converter(kind)[0](value))
+        rec.extra = tuple(flat.items()) or None
+        return rec
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for attr, path, kind in self.FIELDS:
+            value = getattr(self, attr)
+            if value is not MISSING:
+                _assign(out, path, value if value is None else self._converter(kind)[1](value))
+        for path, value in self.extra or ():
+            _assign(out, path, value)
+        return out
+
+    @classmethod
+    def _converter(cls, kind: str):
+        return CONVERTERS[kind]
+
+
+def _flatten(data: Dict[str, Any], prefix: Path = ()):
+    for k, v in data.items():
+        path = prefix + (k,)
+        if isinstance(v, dict) and v and k not in ("emotional_spectrum", "acoustic_features", "audio_result"):
+            yield from _flatten(v, path)
+        else:
+            yield path, v
+
+
+def _assign(out: Dict[str, Any], path: Path, value):
+    for k in path[:-1]:
+        out = out.setdefault(k, {})
+    out[path[-1]] = value
+
+
+def _slots(fields) -> Tuple[str, ...]:
+    return tuple(attr for attr, _, _ in fields)
+
+
+TEXT_FIELDS = (
+    ("emotions", ("emotional_spectrum",), "emotions"),
+    ("truthfulness", ("lie_detection", "truthfulness_score"), "value"),
+    ("confidence", ("lie_detection", "confidence_score"), "value"),
+    ("flags", ("lie_detection", "flags"), "list"),
+    ("confidence_label", ("lie_detection", "confidence_label"), "text"),
+    ("personality_type", ("personality_profile", "type"), "text"),
+    ("personality_summary", ("personality_profile", "summary"), "text"),
+    ("hidden_meaning", ("hidden_meaning",), "text"),
+    ("suggested_replies", ("suggested_replies",), "list"),
+    ("better_version", ("better_version",), "text"),
+    ("language", ("language",), "text"),
+    ("short_circuit", ("short_circuit",), "text"),
+)
+
+
+class TextResult(Record):
+    __slots__ = _slots(TEXT_FIELDS)
+    FIELDS = TEXT_FIELDS
+
+
+MOOD_FIELDS = (
+    ("mood", ("mood_analysis",), "text"),
+    ("music", ("music",), "text"),
+    ("activity", ("activity",), "text"),
+    ("food", ("food",), "text"),
+    ("quote", ("quote",), "text"),
+    ("support", ("support",), "text"),
+    ("short_circuit", ("short_circuit",), "text"),
+)
+
+
+class MoodResult(Record):
+    __slots__ = _slots(MOOD_FIELDS)
+    FIELDS = MOOD_FIELDS
+
+
+AUDIO_FIELDS = (
+    ("tone", ("emotional_tone",), "text"),
+    ("speech_patterns", ("speech_patterns",), "text"),
+    ("status", ("truthfulness_indicator", "status"), "text"),
+    ("score", ("truthfulness_indicator", "score"), "value"),
+    ("reason", ("truthfulness_indicator", "reason"), "text"),
+    ("transcript", ("transcript",), "text"),
+    ("features", ("acoustic_features",), "features"),
+    ("offline", ("offline",), "value"),
+    ("short_circuit", ("short_circuit",), "text"),
+)
+
+
+class AudioResult(Record):
+    __slots__ = _slots(AUDIO_FIELDS)
+    FIELDS = AUDIO_FIELDS
+
+
+TIMELINE_KEYS = ("t", "primary_emotion", "score")
+IMAGE_FIELDS = (
+    ("primary_emotion", ("primary_emotion",), "text"),
+    ("micro_expressions", ("micro_expressions",), "text"),
+    ("status", ("truthfulness_indicator", "status"), "text"),
+    ("score", ("truthfulness_indicator", "score"), "value"),
+    ("reason", ("truthfulness_indicator", "reason"), "text"),
+    ("summary", ("mental_state_summary",), "text"),
+    ("timeline", ("timeline",), "timeline"),
+    ("frames_scanned", ("frames_scanned",), "value"),
+    ("audio_result", ("audio_result",), "audio"),
+    ("short_circuit", ("short_circuit",), "text"),
+)
+
+
+class ImageResult(Record):
+    """
+    Image scans and video scans (which add timeline, frames and a voice track).
+    """
+
+    __slots__ = _slots(IMAGE_FIELDS)
+    FIELDS = IMAGE_FIELDS
+
+    @classmethod
+    def _converter(cls, kind: str):
+        if kind == "timeline":
+            return _rows_in(TIMELINE_KEYS), _rows_out(TIMELINE_KEYS)
+        if kind == "audio":
+            return _record_in(AudioResult), _record_out
+        return CONVERTERS[kind]
+
+
+class MemoryEntry:
+    __slots__ = ("time", "text", "mood")
+
+    def __init__(self, text: str, mood: str):
+        self.time = time.strftime("%H:%M:%S")
+        self.text = text
+        self.mood = _text(mood)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"time": self.time, "text": self.text, "mood": self.mood}
+
+
+class HistoryEntry:
+    __slots__ = ("snippet", "truth", "mood")
+
+    def __init__(self, snippet: str, truth: int, mood: str):
+        self.snippet = snippet
+        self.truth = truth
+        self.mood = _text(mood)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"snippet": self.snippet, "truth": self.truth, "mood": self.mood}
+
+
+RECORD_TYPES = {
+    "text": TextResult,
+    "suggestions": MoodResult,
+    "mood": MoodResult,
+    "image": ImageResult,
+    "video": ImageResult,
+    "audio": AudioResult,
+}
+
+
+def to_record(kind: str, data: Dict[str, Any]):
+    """
+    Compact record for a successful result; errors and unknown kinds pass through.
+    """
+    cls = RECORD_TYPES.get(kind)
+    if cls is None or not isinstance(data, dict) or "error" in data:
+        return data
+    return cls.from_dict(data)
+
+
+# =========================================
+# SESSION ACCOUNTING
+# =========================================
+def deep_sizeof(obj, _seen=None) -> int:
+    """
+    Approximate retained bytes of a session value (containers, slots,
+    arrays, in-memory uploads). Interned labels are shared and not counted.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, str) and len(obj) <= INTERN_MAX_CHARS and sys.intern(obj) is obj:
+        return 0
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    elif hasattr(obj, "getbuffer"):  # BytesIO / Streamlit UploadedFile
+        with obj.getbuffer() as view:
+            size += view.nbytes
+    elif hasattr(type(obj), "__slots__") and not isinstance(obj, (str, bytes, array)):
+        for cls in type(obj).__mro__:
+            for attr in getattr(cls, "__slots__", ()):
+                size += deep_sizeof(getattr(obj, attr, None), seen)
+    return size
+
+
+def enforce_budget(state, keys: List[str], budget: int = SESSION_BUDGET_BYTES, caches=()) -> List[str]:
+    """
+    Bring the bytes held under `keys` below `budget`, evicting in key order
+    (put raw media and the oldest results first). A list/deque value is
+    trimmed in place, older half first, down to its newest entry.
+    `caches` (objects with cache_size() and drop_caches(), e.g. the
+    session's reader) count towards the budget and are dropped before any key.
+    Returns the keys that were trimmed or cleared ("caches" for the caches).
+    """
+    sizes = {k: deep_sizeof(state.get(k)) for k in keys}
+    cache_sizes = [c.cache_size() for c in caches]
+    total = sum(sizes.values()) + sum(cache_sizes)
+    evicted = []
+    for cache, size in zip(caches, cache_sizes):
+        if total <= budget:
+            break
+        if size:
+            cache.drop_caches()
+            total -= size
+            if "caches" not in evicted:
+                evicted.append("caches")
+    for key in keys:
+        if total <= budget:
+            break
+        value = state.get(key)
+        if value is None:
+            continue
+        evicted.append(key)
+        if isinstance(value, (list, deque)):  # trimmed in place, never replaced
+            while len(value) > 1 and total > budget:
+                for _ in range(len(value) // 2):
+                    value.popleft() if isinstance(value, deque) else value.pop(0)
+                size = deep_sizeof(value)
+                total -= sizes[key] - size
+                sizes[key] = size
+            continue
+        state[key] = None
+        total -= sizes[key]
+    return evicted
@@ -0,0 +1,238 @@
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+
+from .media import genai_upload
+from .utils import estimate_tokens
+
+# =========================================
+# CONSTANTS
+# =========================================
+TIERS = ("fast", "balanced", "capable")
+DEFAULT_MODEL = "models/gemini-1.5-flash"
+
+# First matching rule wins. Override with MINDREADER_ROUTES (same JSON shape).
+ROUTING_RULES = [
+    {"modality": "text", "max_chars": 4000, "tier": "fast"},
+    {"modality": "text", "tier": "balanced"},
+    {"modality": "image", "tier": "capable"},
+    {"modality": "audio", "tier": "capable"},
+    {"modality": "video", "tier": "capable"},
+]
+
+EWMA_ALPHA = 0.2
+ERROR_PENALTY = 4.0          # an always-failing model looks 5x slower
+UNHEALTHY_ERROR_RATE = 0.5   # above this a model drops behind every healthy one
+ERROR_HALF_LIFE_S = 60       # idle models recover so they get probed again
+ROUTE_ATTEMPTS = 2           # primary + one failover per request
+PRIOR_LATENCY_S = {"fast": 1.0, "balanced": 2.0, "capable": 4.0}
+SKIP_MODEL_WORDS = ("tts", "image-generation", "embedding", "live", "native-audio", "vision")
+
+# Explicit context caches need a minimum prompt size (API and model dependent);
+# smaller system instructions rely on the API's implicit prefix caching.
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("MINDREADER_CONTEXT_CACHE_MIN_TOKENS", "1024"))
+CONTEXT_CACHE_TTL_S = 3600
+MODEL_REFRESH_S = CONTEXT_CACHE_TTL_S - 300   # rebuilt before its cache expires
+
+
+def model_tier(name: str) -> str:
+    n = name.lower()
+    if "lite" in n or "8b" in n:
+        return "fast"
+    if "pro" in n:
+        return "capable"
+    return "balanced"
+
+
+def request_profile(prompt: str, parts=None) -> Tuple[str, int]:
+    """
+    (modality, size) of a request: media type of the first non-text part and
+    the prompt length plus media bytes.
+    """
+    modality = "text"
+    size = len(prompt or "")
+    for p in parts or []:
+        if isinstance(p, str):
+            continue
+        if isinstance(p, dict):
+            mime, nbytes = p.get("mime_type", ""), len(p.get("data", b""))
+        else:  # MediaPayload or uploaded file handle
+            mime, nbytes = getattr(p, "mime_type", ""), getattr(p, "size_bytes", 0)
+        size += nbytes
+        if modality == "text" and mime:
+            modality = mime.split("/", 1)[0]
+    return modality, size
+
+
+def genai_model(name: str, system_instruction: Optional[str] = None):
+    """
+    GenerativeModel carrying `system_instruction`, served from an explicit
+    context cache when the instruction is large enough to be cached.
+    """
+    if system_instruction and estimate_tokens(system_instruction) >= CONTEXT_CACHE_MIN_TOKENS:
+        try:
+            cache = genai.caching.CachedContent.create(
+                model=name,
+                system_instruction=system_instruction,
+                ttl=timedelta(seconds=CONTEXT_CACHE_TTL_S),
+            )
+            return genai.GenerativeModel.from_cached_content(cache)
+        except Exception:
+            pass  # model without caching support: plain system instruction
+    return genai.GenerativeModel(name, system_instruction=system_instruction)
+
+
+class _Stats:
+    __slots__ = ("latency", "_errors", "calls", "last")
+
+    def __init__(self, prior: float):
+        self.latency = prior
+        self._errors = 0.0
+        self.calls = 0
+        self.last = time.time()
+
+    @property
+    def errors(self) -> float:
+        return self._errors * 0.5 ** ((time.time() - self.last) / ERROR_HALF_LIFE_S)
+
+    def update(self, latency: float, ok: bool):
+        self._errors = self.errors + EWMA_ALPHA * ((0.0 if ok else 1.0) - self.errors)
+        if ok:  # a fast failure says nothing about how fast the model answers
+            self.latency += EWMA_ALPHA * (latency - self.latency)
+        self.calls += 1
+        self.last = time.time()
+
+
+class ModelRouter:
+    """
+    Picks a model per request from modality and size rules, then ranks the
+    tier's models by EWMA latency and error rate. Returns a primary and a
+    failover model; shared by every MindReader fork in the process.
+    `factory(name, system_instruction=...)` builds one model per name and
+    system instruction. `uploader` turns large media into a Files API handle
+    (None: always inline).
+    """
+
+    def __init__(self, tiers: Dict[str, List[str]], factory: Callable[..., Any], rules: List[Dict] = None,
+                 uploader: Callable = None):
+        self.tiers = {t: list(tiers.get(t, [])) for t in TIERS}
+        self.factory = factory
+        self.uploader = uploader
+        self.system_instructions = True  # False: callers send instructions inline
+        self.rules = rules or self._rules_from_env() or ROUTING_RULES
+        self._models: Dict[Tuple[str, Optional[str]], Tuple[Any, float]] = {}
+        self._stats: Dict[str, _Stats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _rules_from_env():
+        raw = os.getenv("MINDREADER_ROUTES")
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    @classmethod
+    def from_genai(cls, rules: List[Dict] = None) -> "ModelRouter":
+        tiers: Dict[str, List[str]] = {t: [] for t in TIERS}
+        try:
+            for m in genai.list_models():
+                name = m.name.lower()
+                if "generateContent" not in m.supported_generation_methods:
+                    continue
+                if ("flash" not in name and "pro" not in name) or any(w in name for w in SKIP_MODEL_WORDS):
+                    continue
+                tiers[model_tier(m.name)].append(m.name)
+        except Exception:
+            pass
+        if not any(tiers.values()):
+            tiers["balanced"] = [DEFAULT_MODEL]
+        return cls(tiers, genai_model, rules, uploader=genai_upload)
+
+    @classmethod
+    def single(cls, model) -> "ModelRouter":
+        """
+        Router around one pre-built model (tests, custom clients).
+        """
+        name = getattr(model, "model_name", "default")
+        router = cls({"balanced": [name]}, lambda *_, **__: model)
+        router.system_instructions = False
+        return router
+
+    # -------------------------------------
+    # MODELS
+    # -------------------------------------
+    def model(self, name: str, system: Optional[str] = None):
+        if not self.system_instructions:
+            system = None
+        now = time.time()
+        with self._lock:
+            entry = self._models.get((name, system))
+            if entry is None or entry[1] <= now:
+                entry = self._models[(name, system)] = (
+                    self.factory(name, system_instruction=system), now + MODEL_REFRESH_S
+                )
+            return entry[0]
+
+    def default_model(self):
+        return self.model(self.choose("text", 0)[0])
+
+    def _tier_for(self, modality: str, size: int) -> str:
+        for rule in self.rules:
+            if rule.get("modality", modality) != modality:
+                continue
+            if "max_chars" in rule and size > rule["max_chars"]:
+                continue
+            return rule["tier"]
+        return "balanced"
+
+    def _score(self, name: str, tier: str) -> float:
+        s = self._stats.get(name)
+        if s is None:
+            return PRIOR_LATENCY_S.get(tier, 2.0)
+        return s.latency * (1 + ERROR_PENALTY * s.errors)
+
+    def _unhealthy(self, name: str) -> bool:
+        s = self._stats.get(name)
+        return s is not None and s.errors > UNHEALTHY_ERROR_RATE
+
+    def choose(self, modality: str, size: int) -> List[str]:
+        """
+        [primary, failover] model names for a request.
+        """
+        tier = self._tier_for(modality, size)
+        # Preferred tier first, then the nearest other tiers
+        order = sorted(TIERS, key=lambda t: abs(TIERS.index(t) - TIERS.index(tier)))
+        with self._lock:
+            ranked = []
+            for t in order:
+                ranked += sorted(self.tiers[t], key=lambda n: self._score(n, t))
+            ranked.sort(key=self._unhealthy)  # stable: keeps tier order otherwise
+        primary = ranked[:1]
+        secondary = [n for n in ranked[1:] if n not in primary][:ROUTE_ATTEMPTS - 1]
+        return primary + secondary
+
+    def _prior(self, name: str) -> float:
+        tier = next((t for t in TIERS if name in self.tiers[t]), "balanced")
+        return PRIOR_LATENCY_S.get(tier, 2.0)
+
+    def record(self, name: str, latency: float, ok: bool):
+        with self._lock:
+            s = self._stats.get(name)
+            if s is None:
+                s = self._stats[name] = _Stats(latency if ok else self._prior(name))
+            s.update(latency, ok)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: {"latency_s": round(s.latency, 3), "error_rate": round(s.errors, 3), "calls": s.calls}
+                for name, s in self._stats.items()
+            }
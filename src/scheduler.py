@@ -0,0 +1,241 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# =========================================
+# CONSTANTS
+# =========================================
+PRIORITIES = ("interactive", "media", "bulk")   # highest first
+
+# Concurrent Gemini calls per process (split the key's quota across workers)
+MAX_CONCURRENT = int(os.getenv("MINDREADER_MAX_CONCURRENT", "8"))
+CLASS_LIMITS = {
+    "interactive": MAX_CONCURRENT,
+    "media": max(1, MAX_CONCURRENT * 3 // 4),
+    "bulk": max(1, MAX_CONCURRENT // 2),
+}
+# Free slots a class must leave behind, so a click never waits on a batch
+HEADROOM = {"interactive": 0, "media": 1, "bulk": 2}
+QUEUE_LIMITS = {"interactive": 64, "media": 32, "bulk": 256}
+MAX_WAIT_S = {"interactive": 15, "media": 45, "bulk": 300}
+
+SERVICE_PRIOR_S = 2.0   # per-call estimate until calls have been timed
+SERVICE_ALPHA = 0.2
+WAIT_WINDOW = 512       # recent waits kept per class for percentiles
+
+
+class Overloaded(RuntimeError):
+    """
+    Rejected by admission control, or queued past the class's max wait.
+    """
+
+
+class _Waiter:
+    __slots__ = ("finish", "seq", "session", "enqueued", "event", "granted", "cancelled")
+
+    def __init__(self, finish: float, seq: int, session: str):
+        self.finish = finish
+        self.seq = seq
+        self.session = session
+        self.enqueued = time.perf_counter()
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.finish, self.seq) < (other.finish, other.seq)
+
+
+class _Class:
+    """
+    One priority class: a weighted-fair queue across sessions (virtual
+    finish tags) plus its counters.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.heap: List[_Waiter] = []
+        self.queued = 0
+        self.running = 0
+        self.virtual_time = 0.0
+        self.last_finish: Dict[str, float] = {}
+        self.service_s = SERVICE_PRIOR_S
+        self.waits = deque(maxlen=WAIT_WINDOW)
+        self.counters = {"admitted": 0, "rejected": 0, "timed_out": 0, "completed": 0, "max_queued": 0}
+
+    def push(self, waiter: _Waiter):
+        heapq.heappush(self.heap, waiter)
+        self.queued += 1
+        self.counters["max_queued"] = max(self.counters["max_queued"], self.queued)
+
+    def pop(self) -> Optional[_Waiter]:
+        while self.heap:
+            waiter = heapq.heappop(self.heap)
+            if not waiter.cancelled:
+                self.queued -= 1
+                self.virtual_time = waiter.finish
+                return waiter
+        return None
+
+    def finish_tag(self, session: str, cost: float, weight: float) -> float:
+        finish = max(self.virtual_time, self.last_finish.get(session, 0.0)) + cost / weight
+        self.last_finish[session] = finish
+        if len(self.last_finish) > 4 * QUEUE_LIMITS.get(self.name, 64):
+            # Sessions at or behind virtual time gain nothing from their old tag
+            self.last_finish = {s: f for s, f in self.last_finish.items() if f > self.virtual_time}
+        return finish
+
+
+class Scheduler:
+    """
+    Shares one API quota between priority classes. Free slots go to the
+    highest class with work queued, within its concurrency limit and the
+    headroom it must leave for higher classes; inside a class, sessions
+    take turns by weighted fair queuing, so one big batch cannot crowd out
+    other sessions of the same class. Requests are rejected up front when
+    their class's queue is full or the expected wait exceeds its max wait.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT, class_limits: Dict[str, int] = None,
+                 headroom: Dict[str, int] = None, queue_limits: Dict[str, int] = None,
+                 max_wait_s: Dict[str, float] = None):
+        self.max_concurrent = max_concurrent
+        self.class_limits = class_limits or CLASS_LIMITS
+        self.headroom = headroom or HEADROOM
+        self.queue_limits = queue_limits or QUEUE_LIMITS
+        self.max_wait_s = max_wait_s or MAX_WAIT_S
+        self._classes = {p: _Class(p) for p in PRIORITIES}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _class(self, priority: str) -> _Class:
+        try:
+            return self._classes[priority]
+        except KeyError:
+            raise ValueError(f"Unknown priority: {priority}") from None
+
+    def _slots_for(self, priority: str) -> int:
+        return max(1, min(self.class_limits[priority], self.max_concurrent - self.headroom[priority]))
+
+    # -------------------------------------
+    # ADMISSION
+    # -------------------------------------
+    def admit(self, priority: str):
+        """
+        Raise Overloaded when a new request of this class should not queue.
+        """
+        with self._lock:
+            cls = self._class(priority)
+            if cls.queued >= self.queue_limits[priority]:
+                cls.counters["rejected"] += 1
+                raise Overloaded(f"Too many {priority} requests queued. Please try again shortly.")
+            # Everything queued at this class or above is served first
+            ahead = sum(c.queued for c in self._classes.values()
+                        if PRIORITIES.index(c.name) <= PRIORITIES.index(priority))
+            expected = (ahead + 1) * cls.service_s / self._slots_for(priority)
+            if cls.queued and expected > self.max_wait_s[priority]:
+                cls.counters["rejected"] += 1
+                raise Overloaded(f"Servers are busy (about {expected:.0f}s wait). Please try again shortly.")
+
+    # -------------------------------------
+    # SLOTS
+    # -------------------------------------
+    @contextmanager
+    def slot(self, priority: str, session: str = "", weight: float = 1.0, cost: float = 1.0):
+        """
+        Hold one API slot for the duration of the block.
+        """
+        with self._lock:
+            cls = self._class(priority)
+            waiter = _Waiter(cls.finish_tag(session, cost, weight), next(self._seq), session)
+            cls.push(waiter)
+            cls.counters["admitted"] += 1
+            self._dispatch()
+
+        if not waiter.event.wait(self.max_wait_s[priority]):
+            with self._lock:
+                if not waiter.granted:
+                    waiter.cancelled = True
+                    cls.queued -= 1
+                    cls.counters["timed_out"] += 1
+                    raise Overloaded(f"Timed out waiting for a free slot ({priority}). Please try again.")
+
+        started = time.perf_counter()
+        with self._lock:
+            cls.waits.append(started - waiter.enqueued)
+        try:
+            yield
+        finally:
+            with self._lock:
+                cls.running -= 1
+                cls.counters["completed"] += 1
+                cls.service_s += SERVICE_ALPHA * (time.perf_counter() - started - cls.service_s)
+                self._dispatch()
+
+    def _dispatch(self):
+        """
+        Grant free slots, highest class first (caller holds the lock).
+        """
+        running = sum(c.running for c in self._classes.values())
+        busy_above = False
+        for priority in PRIORITIES:
+            cls = self._classes[priority]
+            ceiling = self.max_concurrent - self.headroom[priority]
+            if not busy_above:
+                # Headroom only guards higher classes: alone, a class always gets a slot
+                ceiling = max(1, ceiling)
+            while cls.queued and cls.running < self.class_limits[priority] and running < ceiling:
+                waiter = cls.pop()
+                if waiter is None:
+                    break
+                waiter.granted = True
+                cls.running += 1
+                running += 1
+                waiter.event.set()
+            busy_above = busy_above or bool(cls.queued or cls.running)
+
+    # -------------------------------------
+    # METRICS
+    # -------------------------------------
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            out = {}
+            for priority, cls in self._classes.items():
+                waits = sorted(cls.waits)
+                out[priority] = {
+                    "queued": cls.queued,
+                    "running": cls.running,
+                    "limit": self.class_limits[priority],
+                    "wait_ms_p50": round(_percentile(waits, 50) * 1000, 1),
+                    "wait_ms_p95": round(_percentile(waits, 95) * 1000, 1),
+                    "wait_ms_max": round(waits[-1] * 1000, 1) if waits else 0.0,
+                    "service_ms_avg": round(cls.service_s * 1000, 1),
+                    **cls.counters,
+                }
+            return out
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """
+    Process-wide scheduler: every session and worker thread shares the quota.
+    """
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = Scheduler()
+        return _shared_scheduler
@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .router import ROUTE_ATTEMPTS
+from .scheduler import MAX_WAIT_S
+
+# =========================================
+# CONSTANTS
+# =========================================
+SINGLEFLIGHT_DIR = os.getenv("MINDREADER_SINGLEFLIGHT_DIR", os.path.join(".cache", "singleflight"))
+LEADER_TIMEOUT = 60       # seconds one API attempt may take
+# A leader may queue in the scheduler, then try every routed model in turn
+LEADER_WORST_CASE_S = max(MAX_WAIT_S.values()) + ROUTE_ATTEMPTS * LEADER_TIMEOUT
+FOLLOWER_TIMEOUT = LEADER_WORST_CASE_S + 15   # seconds a follower waits before calling on its own
+LOCK_STALE_S = 20         # a lock untouched this long belongs to a dead process
+RESULT_TTL = 30           # seconds a finished result stays visible to late followers
+SWEEP_INTERVAL_S = RESULT_TTL
+POLL_INTERVAL = 0.05
+
+
+def request_key(prompt: str, parts=None) -> str:
+    """
+    Hash of the whitespace-normalized prompt plus every media payload.
+    """
+    h = hashlib.sha256(" ".join(str(prompt).split()).encode("utf-8"))
+    for p in parts or []:
+        if hasattr(p, "sha256"):  # MediaPayload: hashed once when it was read
+            h.update(p.mime_type.encode())
+            h.update(p.sha256.encode())
+        elif isinstance(p, dict) and "data" in p:
+            h.update(p.get("mime_type", "").encode())
+            h.update(bytes(p["data"]))
+        elif isinstance(p, str):
+            h.update(b"\0" + " ".join(p.split()).encode("utf-8"))
+    return h.hexdigest()
+
+
+class _Call:
+    __slots__ = ("done", "payload")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.payload: Optional[str] = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent requests so only one reaches the API.
+
+    In-process callers (Streamlit sessions, threads) wait on an Event.
+    Across worker processes a lock file in `directory` elects the leader and
+    the result is published as a JSON file that followers poll for; errors
+    are never published, so a later caller retries instead of inheriting one.
+    A leader touches its lock every quarter of `lock_stale_s` however long
+    its call queues or fails over, so only locks of dead processes go stale.
+    Expired results, stale locks and temp files are swept from `directory`.
+    Results are handed out as fresh copies so callers can post-process freely.
+    """
+
+    def __init__(self, directory: str = SINGLEFLIGHT_DIR, leader_timeout: float = LEADER_TIMEOUT,
+                 follower_timeout: float = FOLLOWER_TIMEOUT, lock_stale_s: float = LOCK_STALE_S):
+        self.directory = directory
+        self.leader_timeout = leader_timeout
+        self.follower_timeout = follower_timeout
+        self.lock_stale_s = lock_stale_s
+        self._inflight: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._held = set()        # lock files this process leads
+        self._heartbeat = None
+        self._next_sweep = 0.0
+        self.counters = {
+            "leader_calls": 0,
+            "coalesced_local": 0,
+            "coalesced_remote": 0,
+            "follower_timeouts": 0,
+        }
+        if directory:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError:
+                self.directory = ""  # read-only: in-process coalescing only
+        if self.directory:
+            self._sweep()  # leftovers of earlier runs
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self.counters)
+        stats["coalesced"] = stats["coalesced_local"] + stats["coalesced_remote"]
+        return stats
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    # -------------------------------------
+    # ENTRY POINT
+    # -------------------------------------
+    def do(self, key: str, fn: Callable[[float], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run `fn(timeout)` once per key across all concurrent callers.
+        """
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+
+        if not leader:
+            if call.done.wait(self.follower_timeout):
+                self._count("coalesced_local")
+                return json.loads(call.payload)
+            # Leader is stuck: stop waiting and pay for our own call
+            self._count("follower_timeouts")
+            return self._run(fn)
+
+        try:
+            call.payload = self._lead(key, fn)
+        except Exception as e:
+            call.payload = json.dumps({"error": str(e)})
+        finally:
+            call.done.set()
+            with self._lock:
+                self._inflight.pop(key, None)
+        return json.loads(call.payload)
+
+    def _run(self, fn) -> Dict[str, Any]:
+        try:
+            return fn(self.leader_timeout)
+        except Exception as e:
+            return {"error": str(e)}
+
+    # -------------------------------------
+    # CROSS-PROCESS
+    # -------------------------------------
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return base + ".lock", base + ".json"
+
+    def _read_result(self, result_path: str) -> Optional[str]:
+        try:
+            if time.time() - os.path.getmtime(result_path) > RESULT_TTL:
+                return None
+            with open(result_path, "r", encoding="utf-8") as f:
+                return f.read()
+        except (OSError, ValueError):
+            return None
+
+    def _lead(self, key: str, fn) -> str:
+        if not self.directory:
+            self._count("leader_calls")
+            return json.dumps(self._run(fn))
+
+        lock_path, result_path = self._paths(key)
+        fresh = self._read_result(result_path)
+        if fresh is not None:
+            self._count("coalesced_remote")
+            return fresh
+
+        deadline = time.time() + self.follower_timeout
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                break  # we are the cross-process leader
+            except FileExistsError:
+                try:
+                    stale = time.time() - os.path.getmtime(lock_path) > self.lock_stale_s
+                except OSError:
+                    continue  # lock just released; retry
+                if stale:
+                    self._unlink(lock_path)
+                    continue
+                result = self._read_result(result_path)
+                if result is not None:
+                    self._count("coalesced_remote")
+                    return result
+                if time.time() > deadline:
+                    self._count("follower_timeouts")
+                    self._count("leader_calls")
+                    return json.dumps(self._run(fn))
+                time.sleep(POLL_INTERVAL)
+            except OSError:
+                self._count("leader_calls")
+                return json.dumps(self._run(fn))
+
+        self._hold(lock_path)
+        try:
+            # The previous leader may have published between our check and the lock
+            fresh = self._read_result(result_path)
+            if fresh is not None:
+                self._count("coalesced_remote")
+                return fresh
+            self._count("leader_calls")
+            result = self._run(fn)
+            payload = json.dumps(result)
+            if isinstance(result, dict) and "error" in result:
+                # Errors (rate limits, timeouts) reach only callers already waiting in memory
+                return payload
+            tmp = f"{result_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, result_path)
+            return payload
+        finally:
+            with self._lock:
+                self._held.discard(lock_path)
+            self._unlink(lock_path)
+            if time.time() >= self._next_sweep:
+                self._sweep()
+
+    def _hold(self, lock_path: str):
+        with self._lock:
+            self._held.add(lock_path)
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, name="mindreader-singleflight", daemon=True)
+                self._heartbeat.start()
+
+    def _beat(self):
+        """
+        Keep the locks of calls still running fresh, so no other process
+        takes them for a dead leader's.
+        """
+        while True:
+            time.sleep(self.lock_stale_s / 4)
+            with self._lock:
+                held = list(self._held)
+            for path in held:
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass  # released meanwhile
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _sweep(self):
+        """
+        Drop expired results and the locks and temp files of dead processes.
+        Runs at most every SWEEP_INTERVAL_S, after a leader call.
+        """
+        now = time.time()
+        self._next_sweep = now + SWEEP_INTERVAL_S
+        max_age = {".json": RESULT_TTL * 2, ".lock": self.lock_stale_s, ".tmp": self.lock_stale_s}
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    age = max_age.get(os.path.splitext(entry.name)[1])
+                    if age is not None and entry.stat().st_mtime < now - age:
+                        with self._lock:
+                            held = entry.path in self._held
+                        if not held:
+                            self._unlink(entry.path)
+        except OSError:
+            pass
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_singleflight() -> SingleFlight:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SingleFlight()
+        return _shared
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any
+
+# =========================================
+# CONSTANTS
+# =========================================
+STUB_LATENCY_MS = int(os.getenv("MINDREADER_STUB_LATENCY_MS", "300"))
+STUB_TIERS = {
+    "fast": ["models/stub-flash-lite"],
+    "balanced": ["models/stub-flash"],
+    "capable": ["models/stub-pro"],
+}
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubModel:
+    """
+    Offline stand-in for genai.GenerativeModel used for load tests and demos.
+
+    It reads the "Return JSON:" template from the system instruction (or the
+    prompt) and fills it with deterministic values derived from the input,
+    after a configurable delay, so every analysis path works without network
+    access.
+    """
+
+    def __init__(self, model_name: str = "models/stub-flash", latency_ms: int = STUB_LATENCY_MS,
+                 system_instruction: str = None):
+        self.model_name = model_name
+        self.latency_ms = latency_ms
+        self.system_instruction = system_instruction or ""
+
+    def generate_content(self, contents, **kwargs) -> StubResponse:
+        parts = contents if isinstance(contents, list) else [contents]
+        prompt = "\n".join(p for p in parts if isinstance(p, str))
+        media = [p for p in parts if not isinstance(p, str)]
+
+        digest = hashlib.sha256(prompt.encode("utf-8"))
+        for m in media:
+            digest.update(bytes(m.get("data", b"")) if isinstance(m, dict) else b"")
+        seed = int(digest.hexdigest()[:8], 16)
+
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        # Arrays of objects get one entry per media part or numbered "[n]" line
+        n_items = max(1, len(media), len(re.findall(r"^\[\d+\]", prompt, re.MULTILINE)))
+        template = self._template(self.system_instruction + "\n" + prompt)
+        return StubResponse(json.dumps(self._fill(template, seed, n_items)))
+
+    @staticmethod
+    def _template(prompt: str) -> Any:
+        match = re.search(r"Return JSON:\s*\{", prompt)
+        if not match:
+            return {}
+        try:
+            # Decode just the template object; the prompt may go on after it
+            return json.JSONDecoder().raw_decode(prompt, match.end() - 1)[0]
+        except ValueError:
+            return {}
+
+    def _fill(self, node: Any, seed: int, n_items: int) -> Any:
+        if isinstance(node, dict):
+            return {k: self._fill(v, seed + i * 7919, n_items) for i, (k, v) in enumerate(node.items())}
+        if isinstance(node, list):
+            if node and isinstance(node[0], dict):
+                items = [self._fill(node[0], seed + i * 104729, n_items) for i in range(n_items)]
+                for i, item in enumerate(items):
+                    if "n" in item:  # keep positional ids in order
+                        item["n"] = i
+                return items
+            return [self._fill(v, seed + i, n_items) for i, v in enumerate(node)]
+        if isinstance(node, bool):
+            return node
+        if isinstance(node, (int, float)):
+            return 20 + seed % 71
+        if isinstance(node, str):
+            options = [o.strip() for o in node.split("/")] if "/" in node else [node]
+            return options[seed % len(options)]
+        return node
@@ -28,6 +28,18 @@ CRISIS_WORDS = [
     "suicide",
     "i want to die",
     "i don't want to live",
+    # Hindi / Hinglish: checked on the original text, so they work even when translation is offline
+    "khudkushi",
+    "aatmahatya",
+    "marna chahta",
+    "marna chahti",
+    "jeena nahi chahta",
+    "jeena nahi chahti",
+    "आत्महत्या",
+    "मरना चाहता",
+    "मरना चाहती",
+    "जीना नहीं चाहता",
+    "जीना नहीं चाहती",
 ]
 
 # =========================================
@@ -40,6 +52,13 @@ def clamp(v):
         return 0
 
 
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token).
+    """
+    return len(text) // 4 + 1
+
+
 def safe_json_load(text: str) -> Dict[str, Any]:
     """
     Fix broken Gemini JSON
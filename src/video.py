@@ -0,0 +1,130 @@
+import shutil
+import subprocess
+import numpy as np
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .hashing import dhash, hamming
+
+try:
+    import cv2
+except ImportError:  # video support is optional
+    cv2 = None
+
+# =========================================
+# CONSTANTS
+# =========================================
+SAMPLE_FPS = 2.0          # frames decoded & scored per second of video
+MAX_KEYFRAMES = 12
+DUPLICATE_DISTANCE = 10   # dHash bits; closer frames count as the same shot
+MIN_KEYFRAME_GAP_S = 1.0
+KEYFRAME_MAX_SIDE = 512   # keyframes are re-encoded small before upload
+THUMB_SIZE = 64
+MAX_AUDIO_S = 600
+
+
+def video_supported() -> bool:
+    return cv2 is not None
+
+
+def iter_frames(path: str, sample_fps: float = SAMPLE_FPS) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Stream (timestamp, BGR frame) pairs at roughly `sample_fps`.
+    Skipped frames are only grabbed, never decoded into memory.
+    """
+    if cv2 is None:
+        raise RuntimeError("Video support needs opencv-python-headless")
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError("Could not open video")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        step = max(1, int(round(fps / sample_fps)))
+        idx = 0
+        while cap.grab():
+            if idx % step == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    yield idx / fps, frame
+            idx += 1
+    finally:
+        cap.release()
+
+
+def _encode_keyframe(frame: np.ndarray) -> bytes:
+    h, w = frame.shape[:2]
+    scale = KEYFRAME_MAX_SIDE / max(h, w)
+    if scale < 1:
+        frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return buf.tobytes()
+
+
+def select_keyframes(path: str, max_keyframes: int = MAX_KEYFRAMES) -> Dict[str, Any]:
+    """
+    Score every sampled frame for scene change + motion, drop near-duplicates
+    by perceptual hash and keep the best `max_keyframes` frames.
+
+    Only the kept keyframes (small JPEGs) and the previous thumbnail are
+    held in memory, so usage does not grow with video length.
+    """
+    kept: List[Dict[str, Any]] = []
+    prev_thumb = None
+    prev_hist = None
+    scanned = 0
+
+    for t, frame in iter_frames(path):
+        scanned += 1
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        thumb = cv2.resize(gray, (THUMB_SIZE, THUMB_SIZE), interpolation=cv2.INTER_AREA).astype(np.float32)
+        hist = np.histogram(thumb, bins=32, range=(0, 256))[0] / thumb.size
+
+        if prev_thumb is None:
+            score = 1.0  # always consider the opening frame
+        else:
+            motion = float(np.mean(np.abs(thumb - prev_thumb))) / 255
+            scene = float(np.abs(hist - prev_hist).sum()) / 2
+            score = scene + motion
+        prev_thumb, prev_hist = thumb, hist
+
+        h = dhash(thumb)
+        dups = [k for k in kept if hamming(k["hash"], h) <= DUPLICATE_DISTANCE
+                or abs(k["t"] - t) < MIN_KEYFRAME_GAP_S]
+        if dups:
+            if score <= max(k["score"] for k in dups):
+                continue
+            # Same shot, but this frame marks the change better
+            kept = [k for k in kept if k not in dups]
+
+        if len(kept) >= max_keyframes:
+            weakest = min(kept[1:], key=lambda k: k["score"])
+            if weakest["score"] >= score:
+                continue
+            kept.remove(weakest)
+
+        kept.append({"t": round(t, 2), "score": round(score, 3), "hash": h, "jpeg": _encode_keyframe(frame)})
+
+    kept.sort(key=lambda k: k["t"])
+    return {"keyframes": kept, "frames_scanned": scanned}
+
+
+def extract_audio_track(path: str, max_seconds: int = MAX_AUDIO_S) -> Optional[bytes]:
+    """
+    16 kHz mono WAV of the video's audio via ffmpeg, or None when ffmpeg
+    is missing or the video has no audio.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+    try:
+        proc = subprocess.run(
+            [ffmpeg, "-v", "error", "-i", path, "-t", str(max_seconds),
+             "-vn", "-ac", "1", "-ar", "16000", "-f", "wav", "pipe:1"],
+            capture_output=True,
+            timeout=120,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if proc.returncode != 0 or len(proc.stdout) <= 44:
+        return None
+    return proc.stdout
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+from src.chatlog import MAX_CHAT_WINDOWS, ChatMessage, analyze_chat
+from src.records import SESSION_BUDGET_BYTES, deep_sizeof
+
+SCORE = {"emotional_spectrum": {"joy": 10, "sadness": 20, "anger": 5, "fear": 1, "surprise": 2, "love": 3},
+         "truthfulness_score": 70, "flags": []}
+
+
+class FakeReader:
+    def analyze_messages(self, batch):
+        return [dict(SCORE) for _ in batch]
+
+
+def test_long_export_timeline_is_widened_within_budget():
+    # Two months of hourly messages: 1,344 one-hour windows before widening
+    t0 = datetime(2024, 1, 1)
+    messages = [ChatMessage(i, "AB"[i % 2], "hello there", t0 + timedelta(hours=i)) for i in range(1344)]
+    res = analyze_chat(FakeReader(), iter(messages), window_minutes=60)
+    assert len(res["windows"]) <= MAX_CHAT_WINDOWS
+    assert res["window_minutes"] > 60
+    assert sum(w["messages"] for w in res["windows"]) == 1344
+    assert deep_sizeof(res) < SESSION_BUDGET_BYTES
+
+
+def test_messages_the_model_skipped_are_left_out_of_the_aggregates(monkeypatch):
+    from src.analyzer import MindReader
+    from src.router import ModelRouter
+    from src.stub import STUB_TIERS, StubModel
+
+    reader = MindReader(router=ModelRouter(STUB_TIERS, StubModel))
+    skipped = {"messages": [{"n": 0, **SCORE}, {"n": 2, **SCORE}]}  # no [1]
+    monkeypatch.setattr(reader, "_call_gemini", lambda *args, **kwargs: skipped)
+
+    batch = [ChatMessage(i, "A", "hello there", datetime(2024, 1, 1)) for i in range(3)]
+    scored = reader.analyze_messages(batch)
+    assert scored[1] == {"unscored": True, "flags": []}
+
+    class SkippingReader:
+        def analyze_messages(self, batch):
+            return scored
+
+    res = analyze_chat(SkippingReader(), iter(batch))
+    assert res["messages"] == 2 and res["failed_messages"] == 1
+    assert res["speakers"]["A"]["avg_truthfulness"] == 70
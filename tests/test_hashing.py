@@ -0,0 +1,62 @@
+import io
+import json
+import random
+
+import numpy as np
+from PIL import Image
+
+from src.hashing import IMAGE_CACHE_DISTANCE, ImageScanCache, hamming, image_dhash
+
+RESULT = {"primary_emotion": "Calm", "emotional_spectrum": {"joy": 40}}
+
+
+def _photo(seed, size=(320, 240), quality=90):
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, (6, 8), dtype=np.uint8)  # coarse blocks: structure dHash can see
+    img = Image.fromarray(small).resize(size, Image.BILINEAR).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def test_dhash_matches_rescaled_recompressed_copies_only():
+    original = image_dhash(_photo(1))
+    assert hamming(original, image_dhash(_photo(1, size=(640, 480), quality=40))) <= IMAGE_CACHE_DISTANCE
+    assert hamming(original, image_dhash(_photo(2))) > IMAGE_CACHE_DISTANCE
+
+
+def test_cache_hits_within_distance_and_misses_beyond(tmp_path):
+    cache = ImageScanCache(str(tmp_path / "scans.jsonl"), max_distance=6)
+    h = 0x0123456789ABCDEF
+    cache.put(h, RESULT)
+    assert cache.get(h ^ 0b111) == (3, RESULT)
+    assert cache.get(h ^ 0xFFFFF) is None
+    assert cache.hit_rate == 0.5
+
+
+def test_returned_results_are_copies(tmp_path):
+    cache = ImageScanCache(str(tmp_path / "scans.jsonl"))
+    cache.put(1, RESULT)
+    cache.get(1)[1]["emotional_spectrum"]["joy"] = 0
+    assert cache.get(1)[1] == RESULT
+
+
+def test_size_bound_evicts_oldest_and_compacts_the_file(tmp_path):
+    path = tmp_path / "scans.jsonl"
+    cache = ImageScanCache(str(path), max_entries=10)
+    hashes = [random.Random(i).getrandbits(64) for i in range(25)]  # far apart
+    for i, h in enumerate(hashes):
+        cache.put(h, {"n": i})
+    assert len(cache.entries) <= 10
+    assert cache.get(hashes[0]) is None and cache.get(hashes[-1])[1] == {"n": 24}
+    lines = path.read_text().splitlines()
+    assert len(lines) <= 10
+    assert len(ImageScanCache(str(path), max_entries=10).entries) == len(lines)
+
+
+def test_expired_entries_are_dropped_on_load(tmp_path):
+    path = tmp_path / "scans.jsonl"
+    path.write_text(json.dumps({"hash": f"{5:016x}", "t": 0, "result": RESULT}) + "\n")
+    cache = ImageScanCache(str(path), ttl_s=3600)
+    assert cache.get(5) is None
+    assert path.read_text() == ""
@@ -0,0 +1,75 @@
+import pytest
+
+from src import incremental
+from src.incremental import Draft, SentenceCache, segment_text
+
+WORDS = ["apples", "rivers", "engines", "letters", "gardens", "windows", "candles", "bridges", "meadows", "pockets"]
+TEXT = " ".join(f"I really think the {w} were fine yesterday." for w in WORDS)
+FULL = {
+    "emotional_spectrum": {"joy": 60, "sadness": 10},
+    "lie_detection": {"truthfulness_score": 80, "confidence_score": 70},
+    "personality_profile": {"type": "Ambivert", "summary": "Old summary"},
+    "hidden_meaning": "About the old text",
+    "suggested_replies": ["Old reply"],
+    "better_version": "Rewrite of the old text",
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_sentence_cache(monkeypatch):
+    monkeypatch.setattr(incremental, "SENTENCES", SentenceCache())
+
+
+def edited(n, prefix="honestly"):
+    return " ".join(f"I really think the {w} were fine yesterday." if i >= n else
+                    f"I {prefix} think the {w} were broken yesterday." for i, w in enumerate(WORDS))
+
+
+def test_plan_rescoring_only_changed_sentences_below_the_threshold():
+    draft = Draft.from_full("calm", TEXT, FULL)
+    edit = draft.plan(edited(2), "calm")  # 20% of the text
+    assert edit.todo == [0, 1] and len(edit.known) == 8
+    assert draft.plan(edited(4), "calm") is None  # 40% > MAX_CHANGED_SHARE
+    assert draft.plan(edited(2), "blunt") is None  # other style: full pass
+
+
+def test_plan_runs_a_full_pass_once_edits_drift_too_far():
+    draft = Draft.from_full("calm", TEXT, FULL)
+    score = {"emotional_spectrum": {"joy": 0, "sadness": 90}, "truthfulness_score": 20, "confidence_score": 40}
+    for n in (2, 4):  # two small edits: 40% of the text now scored on its own
+        edit = draft.plan(edited(n), "calm")
+        draft, _ = draft.apply(edit, [score] * len(edit.todo))
+    assert draft.plan(edited(6), "calm") is None  # 60% > MAX_DRIFT_SHARE
+
+
+def test_apply_weights_scores_by_tokens_and_drops_stale_readings():
+    draft = Draft.from_full("calm", TEXT, FULL)
+    text = edited(1, prefix="honestly, truly and completely")
+    edit = draft.plan(text, "calm")
+    score = {"emotional_spectrum": {"joy": 0, "sadness": 90}, "truthfulness_score": 20, "confidence_score": 40}
+    _, data = draft.apply(edit, [score])
+
+    tokens = [s.tokens for s in segment_text(text)]
+    total = sum(tokens)
+    assert data["lie_detection"]["truthfulness_score"] == round((20 * tokens[0] + 80 * sum(tokens[1:])) / total)
+    assert data["emotional_spectrum"]["sadness"] == round((90 * tokens[0] + 10 * sum(tokens[1:])) / total)
+    assert data["incremental"] == {"rescored": 1, "sentences": 10, "readings": "stale"}
+    assert data["hidden_meaning"] == "" and data["better_version"] == "" and data["suggested_replies"] == []
+    assert FULL["hidden_meaning"] == "About the old text"  # the draft's source is not touched
+
+
+def test_reader_rereads_meaning_and_replies_after_an_edit():
+    from src.analyzer import MindReader
+    from src.router import ModelRouter
+    from src.stub import STUB_TIERS, StubModel
+
+    reader = MindReader(router=ModelRouter(STUB_TIERS, lambda name, **kw: StubModel(name, latency_ms=0, **kw)))
+    assert "incremental" not in reader.analyze_text(TEXT)
+    kinds = []
+    call = reader._call_gemini
+    reader._call_gemini = lambda kind, *a, **kw: kinds.append(kind) or call(kind, *a, **kw)
+
+    data = reader.analyze_text(edited(1))
+    assert data["incremental"]["readings"] == "fresh"
+    assert sorted(kinds) == ["text_readings", "text_sentences"]
+    assert data["better_version"]
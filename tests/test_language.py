@@ -0,0 +1,47 @@
+import time
+
+import deep_translator
+import pytest
+
+from src import language
+
+
+class IdentityTranslator:
+    calls = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    def translate(self, text):
+        self.calls.append(text)
+        if "devagar" in text:
+            time.sleep(5)
+        return text
+
+    def translate_batch(self, batch):
+        return batch
+
+
+@pytest.fixture
+def translator(monkeypatch, tmp_path):
+    IdentityTranslator.calls = []
+    monkeypatch.setattr(deep_translator, "GoogleTranslator", IdentityTranslator)
+    monkeypatch.setattr(language, "_cache", language.TranslationCache(str(tmp_path / "t.sqlite3")))
+    return IdentityTranslator
+
+
+def test_english_with_single_letter_words_is_not_portuguese():
+    assert language.detect_language("A cat, a dog and a bird.")[0] == "en"
+    assert language.detect_language("Eu não sei o que fazer, estou muito cansado")[0] == "pt"
+
+
+def test_identity_translations_are_cached(translator):
+    for _ in range(3):
+        language.normalize_text("Eu não sei o que fazer, estou muito cansado, Maria.")
+    assert len(translator.calls) == 1
+
+
+def test_stalled_translator_falls_back_to_original(translator):
+    started = time.monotonic()
+    assert language.translate_batch(["Eu estou muito devagar com você"], timeout=0.3) == [None]
+    assert time.monotonic() - started < 2
@@ -0,0 +1,23 @@
+from loadtest import run_level
+
+
+class ShedReader:
+    """Stands in for a client whose scheduler sheds every text call."""
+
+    def fork(self):
+        return self
+
+    def analyze_text(self, text):
+        return {"error": "Server busy, retry shortly", "overloaded": True}
+
+    def get_suggestions(self, text):
+        return {"mood_analysis": "Calm"}
+
+
+def test_overloaded_answers_are_counted_apart_from_successes_and_errors():
+    level = run_level("reader", ShedReader(), 2, 0.2, {"text": 1.0}, 0, 1)
+    assert level["requests"] > 0
+    assert level["overloaded"] == level["requests"]
+    assert level["errors"] == 0 and level["provisional"] == 0
+    assert level["degraded_rate"] == 1.0
+    assert level["flows"]["text"]["overloaded"] == level["requests"]
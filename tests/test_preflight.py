@@ -0,0 +1,24 @@
+import deep_translator
+
+from src.language import NormalizedText
+from src.preflight import CRISIS_ANALYSIS, Preflight
+
+
+class NoNetwork:
+    def __init__(self, **kwargs):
+        raise AssertionError("preflight must not reach the translator")
+
+
+def test_check_text_stays_local_for_non_english_text(monkeypatch):
+    monkeypatch.setattr(deep_translator, "GoogleTranslator", NoNetwork)
+    triage = Preflight().check_text("text", "Eu não sei o que fazer, estou muito cansado.", "calm",
+                                    crisis_response=CRISIS_ANALYSIS)
+    assert triage.response is None
+    assert triage.text == "Eu não sei o que fazer, estou muito cansado."
+
+
+def test_crisis_in_translation_is_caught_after_triage():
+    norm = NormalizedText("pt", "I want to die.", ["Eu quero morrer."])
+    res = Preflight().check_translation(norm, CRISIS_ANALYSIS)
+    assert res["short_circuit"] == "crisis" and res["language"] == "pt"
+    assert Preflight().check_translation(NormalizedText("en", "I want to die.", []), CRISIS_ANALYSIS) is None
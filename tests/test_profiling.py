@@ -0,0 +1,18 @@
+import time
+
+from src.profiling import SamplingProfiler
+from src.provisional import _executor
+
+
+def _spin(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        sum(range(1000))
+
+
+def test_budget_pool_started_earlier_is_sampled(tmp_path):
+    _executor().submit(lambda: None).result()  # pool thread predates the profiler
+    profiler = SamplingProfiler("budget", interval_ms=2, directory=str(tmp_path)).start()
+    _executor().submit(_spin, 0.2).result()
+    profiler.stop()
+    assert any(frame[0] == "_spin" for stack in profiler.stacks for frame in stack)
@@ -0,0 +1,48 @@
+from src.records import deep_sizeof, enforce_budget, to_record
+
+TEXT_RESULT = {
+    "emotional_spectrum": {"joy": 10, "sadness": 20, "anger": 5, "fear": 1, "surprise": 2, "love": 3},
+    "lie_detection": {"truthfulness_score": 70, "confidence_score": 60, "flags": []},
+    "hidden_meaning": "x" * 2000,
+}
+
+
+class FakeReader:
+    def __init__(self, nbytes):
+        self.draft = "d" * nbytes
+
+    def cache_size(self):
+        return deep_sizeof(self.draft)
+
+    def drop_caches(self):
+        self.draft = None
+
+
+def test_reader_caches_count_and_go_before_results():
+    state = {"text_result": to_record("text", TEXT_RESULT), "image_result": None}
+    records = deep_sizeof(state["text_result"])
+    reader = FakeReader(50_000)
+    evicted = enforce_budget(state, ["text_result"], budget=records + 1000, caches=[reader])
+    assert evicted == ["caches"]
+    assert reader.draft is None and state["text_result"] is not None
+
+
+def test_results_are_evicted_once_caches_are_not_enough():
+    state = {"text_result": to_record("text", TEXT_RESULT)}
+    reader = FakeReader(50_000)
+    assert enforce_budget(state, ["text_result"], budget=100, caches=[reader]) == ["caches", "text_result"]
+    assert state["text_result"] is None
+
+
+def test_reader_cache_size_covers_draft_and_preflight_memo():
+    from src.analyzer import MindReader
+    from src.router import ModelRouter
+    from src.stub import STUB_TIERS, StubModel
+
+    reader = MindReader(router=ModelRouter(STUB_TIERS, lambda name, **kw: StubModel(name, latency_ms=0, **kw)))
+    empty = reader.cache_size()
+    reader.analyze_text("I told them the report was finished, honestly. It was not quite done.")
+    assert reader.draft is not None and reader.preflight._last
+    assert reader.cache_size() >= deep_sizeof(reader.draft) > 0
+    reader.drop_caches()
+    assert reader.draft is None and not reader.preflight._last and reader.cache_size() == empty
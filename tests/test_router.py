@@ -0,0 +1,45 @@
+import time
+
+from src import router as router_mod
+from src.router import ModelRouter
+
+
+def make_router():
+    return ModelRouter({"fast": ["a-flash-lite", "b-flash-lite"], "balanced": ["c-flash"]}, lambda *_, **__: None)
+
+
+def test_fast_failures_do_not_make_a_model_primary():
+    router = make_router()
+    router.record("a-flash-lite", 1.0, True)
+    router.record("b-flash-lite", 1.2, True)
+    for _ in range(3):
+        router.record("a-flash-lite", 0.05, False)
+        assert router.choose("text", 100) == ["b-flash-lite", "a-flash-lite"]
+    assert router.stats()["a-flash-lite"]["latency_s"] == 1.0
+
+
+def test_first_call_failing_starts_from_the_tier_prior():
+    router = make_router()
+    router.record("a-flash-lite", 0.01, False)
+    assert router.stats()["a-flash-lite"]["latency_s"] == router_mod.PRIOR_LATENCY_S["fast"]
+    assert router.choose("text", 100)[0] == "b-flash-lite"
+
+
+def test_unhealthy_model_falls_behind_other_tiers():
+    router = make_router()
+    for _ in range(5):
+        router.record("a-flash-lite", 0.5, False)
+        router.record("b-flash-lite", 0.5, False)
+    assert router.choose("text", 100) == ["c-flash", "a-flash-lite"]
+
+
+def test_failed_model_recovers_once_its_errors_decay(monkeypatch):
+    router = make_router()
+    router.record("a-flash-lite", 0.5, True)
+    router.record("b-flash-lite", 0.8, True)
+    router.record("a-flash-lite", 0.5, False)
+    assert router.choose("text", 100)[0] == "b-flash-lite"
+
+    later = time.time() + 10 * router_mod.ERROR_HALF_LIFE_S
+    monkeypatch.setattr(router_mod.time, "time", lambda: later)
+    assert router.choose("text", 100) == ["a-flash-lite", "b-flash-lite"]
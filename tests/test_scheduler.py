@@ -0,0 +1,39 @@
+from contextlib import ExitStack
+
+import pytest
+
+from src.scheduler import PRIORITIES, Overloaded, Scheduler
+
+FAST_WAIT = {p: 0.2 for p in PRIORITIES}
+
+
+@pytest.mark.parametrize("max_concurrent", [1, 2])
+@pytest.mark.parametrize("priority", PRIORITIES)
+def test_idle_scheduler_grants_every_class_a_slot(max_concurrent, priority):
+    # Headroom must not starve a class when nothing above it is queued or running
+    sched = Scheduler(max_concurrent=max_concurrent, max_wait_s=FAST_WAIT)
+    with sched.slot(priority):
+        pass
+    assert sched.stats()[priority]["completed"] == 1
+
+
+def test_headroom_still_reserved_while_higher_class_runs():
+    sched = Scheduler(max_concurrent=8, max_wait_s=FAST_WAIT)
+    with ExitStack() as stack:
+        for _ in range(6):
+            stack.enter_context(sched.slot("interactive"))
+        with pytest.raises(Overloaded):
+            with sched.slot("bulk"):
+                pass
+        with sched.slot("media"):
+            pass
+
+
+def test_small_limit_lower_class_waits_for_higher():
+    sched = Scheduler(max_concurrent=2, max_wait_s=FAST_WAIT)
+    with sched.slot("interactive"):
+        with pytest.raises(Overloaded):
+            with sched.slot("bulk"):
+                pass
+    with sched.slot("bulk"):
+        pass
@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+
+from src.singleflight import SingleFlight
+
+
+def test_errors_are_not_served_to_later_callers(tmp_path):
+    flight = SingleFlight(directory=str(tmp_path))
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        return {"error": "429 Resource exhausted"} if len(calls) == 1 else {"ok": True}
+
+    assert flight.do("k", fn) == {"error": "429 Resource exhausted"}
+    assert flight.do("k", fn) == {"ok": True}
+    assert len(calls) == 2
+
+
+def test_successes_are_shared_within_ttl(tmp_path):
+    flight = SingleFlight(directory=str(tmp_path))
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        return {"ok": len(calls)}
+
+    assert flight.do("k", fn) == {"ok": 1}
+    # Another worker process sees the published file
+    assert SingleFlight(directory=str(tmp_path)).do("k", fn) == {"ok": 1}
+    assert len(calls) == 1
+
+
+def test_slow_leader_keeps_its_lock_across_processes(tmp_path):
+    # Two instances on one directory stand in for two worker processes
+    a = SingleFlight(directory=str(tmp_path), lock_stale_s=0.2)
+    b = SingleFlight(directory=str(tmp_path), lock_stale_s=0.2)
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        time.sleep(0.8)  # far past the stale cutoff: queued, then failed over
+        return {"ok": True}
+
+    leader = threading.Thread(target=a.do, args=("k", fn))
+    leader.start()
+    time.sleep(0.1)
+    assert b.do("k", fn) == {"ok": True}
+    leader.join()
+    assert len(calls) == 1
+
+
+def test_leftovers_of_dead_processes_are_swept(tmp_path):
+    old = time.time() - 3600
+    for name in ("dead.lock", "dead.json", "dead.json.123.tmp"):
+        path = tmp_path / name
+        path.write_text("{}")
+        os.utime(path, (old, old))
+    (tmp_path / "live.json").write_text("{}")
+    SingleFlight(directory=str(tmp_path))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["live.json"]